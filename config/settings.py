@@ -3,6 +3,8 @@ import os
 from typing import Dict, List, Any
 from datetime import datetime
 
+from logic.json_store import write_json
+
 class AppSettings:
     """Maneja la configuración y persistencia de datos de la aplicación."""
     
@@ -22,6 +24,16 @@ class AppSettings:
             "window_size": "1400x900",
             "sidebar_width": 280,
             "auto_save": True,
+            "update_delay_ms": 300,
+            "history_budget_kb": 512,
+            "file_watcher_polling": False,
+            "startup_report": False,
+            "backend_url": "http://127.0.0.1:7860",
+            "backend_kind": "a1111",
+            "backend_concurrency": 2,
+            "backend_queue_size": 32,
+            "backend_retries": 3,
+            "backend_workflow": "",
             "max_history": 100,
             "default_negative_prompt": "blurry, low quality, distorted, deformed, ugly, bad anatomy"
         }
@@ -46,8 +58,7 @@ class AppSettings:
     def save_settings(self, settings: Dict[str, Any]):
         """Guarda las configuraciones en el archivo."""
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(settings, f, indent=2, ensure_ascii=False)
+            write_json(self.config_file, settings)
         except Exception as e:
             print(f"Error guardando configuraciones: {e}")
     
@@ -74,8 +85,7 @@ class AppSettings:
     def save_characters(self, characters: List[Dict[str, Any]]):
         """Guarda la lista de personajes."""
         try:
-            with open(self.characters_file, 'w', encoding='utf-8') as f:
-                json.dump(characters, f, indent=2, ensure_ascii=False)
+            write_json(self.characters_file, characters)
         except Exception as e:
             print(f"Error guardando personajes: {e}")
     
@@ -93,8 +103,7 @@ class AppSettings:
     def save_scenes(self, scenes: List[Dict[str, Any]]):
         """Guarda la lista de escenas."""
         try:
-            with open(self.scenes_file, 'w', encoding='utf-8') as f:
-                json.dump(scenes, f, indent=2, ensure_ascii=False)
+            write_json(self.scenes_file, scenes)
         except Exception as e:
             print(f"Error guardando escenas: {e}")
     
@@ -120,8 +129,7 @@ class AppSettings:
             if len(history) > max_history:
                 history = history[-max_history:]
             
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(history, f, indent=2, ensure_ascii=False)
+            write_json(self.history_file, history)
         except Exception as e:
             print(f"Error guardando historial: {e}")
     
@@ -0,0 +1,21 @@
+from .characters import CharacterStore, category_key, category_values, CHARACTER_VERSION
+from .library import Library, get_library, DEFAULT_SEARCH_LIMIT
+from logic.presets_manager import PresetsManager
+from logic.prompt_generator import CompiledPrompt, PromptGenerator
+from logic.tag_store import TagStore
+from logic.variations_manager import VariationsManager
+
+__all__ = [
+    'CharacterStore',
+    'category_key',
+    'category_values',
+    'CHARACTER_VERSION',
+    'Library',
+    'get_library',
+    'DEFAULT_SEARCH_LIMIT',
+    'PresetsManager',
+    'CompiledPrompt',
+    'PromptGenerator',
+    'TagStore',
+    'VariationsManager'
+]
@@ -0,0 +1,334 @@
+import http.client
+import itertools
+import json
+import queue
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Backend por defecto (API de AUTOMATIC1111 en local)
+DEFAULT_BACKEND_URL = "http://127.0.0.1:7860"
+# Tipos de backend soportados: "a1111" (/sdapi/v1/txt2img) y "comfyui" (/prompt)
+BACKEND_KINDS = ("a1111", "comfyui")
+# Trabajos enviándose a la vez (también es el tamaño del pool de conexiones)
+DEFAULT_CONCURRENCY = 2
+# Trabajos en espera como máximo; al llenarse, submit bloquea o falla (contrapresión)
+DEFAULT_QUEUE_SIZE = 32
+# Reintentos por trabajo ante errores de conexión o respuestas 429/5xx
+DEFAULT_RETRIES = 3
+# Espera antes del primer reintento; se duplica en cada intento (con algo de azar)
+RETRY_BACKOFF_S = 0.5
+# Espera máxima entre reintentos
+MAX_BACKOFF_S = 10.0
+# Tiempo máximo de una petición (una generación puede tardar bastante)
+REQUEST_TIMEOUT_S = 300
+# Latencias que se conservan para las estadísticas
+LATENCY_WINDOW = 256
+
+# Estados de un trabajo
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+
+class BackendError(Exception):
+    """Error del backend de generación; retryable indica si tiene sentido reintentar"""
+
+    def __init__(self, message: str, status: int = None, retryable: bool = False):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+
+
+class GenerationJob:
+    """Un prompt enviado al backend con su estado, intentos y latencias"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, prompt: str, negative_prompt: str = "", params: Dict[str, Any] = None,
+                 on_done: Callable[["GenerationJob"], None] = None):
+        self.id = next(self._ids)
+        self.prompt = prompt
+        self.negative_prompt = negative_prompt
+        self.params = dict(params or {})
+        self.on_done = on_done
+        self.status = QUEUED
+        self.attempts = 0
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.perf_counter()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.latency_ms: Optional[float] = None  # duración de la petición que terminó el trabajo
+        self.done_event = threading.Event()
+
+    @property
+    def queued_ms(self) -> Optional[float]:
+        """Tiempo esperando en la cola"""
+        return (self.started_at - self.submitted_at) * 1000 if self.started_at else None
+
+    @property
+    def total_ms(self) -> Optional[float]:
+        """Desde que se encoló hasta que terminó (incluye reintentos y esperas)"""
+        return (self.finished_at - self.submitted_at) * 1000 if self.finished_at else None
+
+    def wait(self, timeout: float = None) -> bool:
+        return self.done_event.wait(timeout)
+
+    def __repr__(self):
+        return f"<GenerationJob {self.id} {self.status} intentos={self.attempts}>"
+
+
+class ConnectionPool:
+    """Conexiones HTTP persistentes a un mismo host; se reutilizan entre trabajos (keep-alive)"""
+
+    def __init__(self, url: str, size: int, timeout: float = REQUEST_TIMEOUT_S):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"URL de backend no soportada: {url}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+        self.created = 0
+
+    def _connect(self) -> http.client.HTTPConnection:
+        self.created += 1
+        connection_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method: str, path: str, body: bytes = None,
+                headers: Dict[str, str] = None) -> Tuple[int, bytes]:
+        """(estado, cuerpo); una conexión que falla se descarta en lugar de volver al pool"""
+        with self.slots:
+            while True:
+                try:
+                    connection, reused = self.idle.get_nowait(), True
+                except queue.Empty:
+                    connection, reused = self._connect(), False
+                try:
+                    connection.request(method, self.base_path + path, body=body, headers=headers or {})
+                    response = connection.getresponse()
+                    data = response.read()
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    connection.close()
+                    # El servidor cerró una conexión inactiva: se prueba con otra sin contar un reintento
+                    if reused:
+                        continue
+                    raise
+                except BaseException:
+                    connection.close()
+                    raise
+                if response.will_close:
+                    connection.close()
+                else:
+                    self.idle.put(connection)
+                return response.status, data
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class BackendClient:
+    """Cliente de un backend de generación estilo A1111/ComfyUI: cola acotada de trabajos,
+    concurrencia configurable sobre un pool de conexiones persistentes y reintentos con espera
+    exponencial. Los callbacks on_done se llaman desde los hilos del cliente"""
+
+    def __init__(self, url: str = DEFAULT_BACKEND_URL, kind: str = "a1111",
+                 concurrency: int = DEFAULT_CONCURRENCY, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 retries: int = DEFAULT_RETRIES, backoff: float = RETRY_BACKOFF_S,
+                 timeout: float = REQUEST_TIMEOUT_S, workflow: Dict[str, Any] = None):
+        if kind not in BACKEND_KINDS:
+            raise ValueError(f"Tipo de backend desconocido: {kind} (usar {', '.join(BACKEND_KINDS)})")
+        self.url = url
+        self.kind = kind
+        self.concurrency = max(1, concurrency)
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        # Flujo de ComfyUI en formato API; "$prompt" y "$negative_prompt" se reemplazan por trabajo
+        self.workflow = workflow
+        self.client_id = uuid.uuid4().hex
+        self.pool = ConnectionPool(url, self.concurrency, timeout)
+        self.jobs: "queue.Queue[Optional[GenerationJob]]" = queue.Queue(maxsize=max(1, queue_size))
+        self.workers: List[threading.Thread] = []
+        self.lock = threading.Lock()
+        self.accepting = True
+        self.closed = False
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.retried = 0
+        self.latencies: "deque[float]" = deque(maxlen=LATENCY_WINDOW)
+
+    # ------------------------------------------------------------------
+    # Envío
+    # ------------------------------------------------------------------
+    def submit(self, prompt: str, negative_prompt: str = "", params: Dict[str, Any] = None,
+               on_done: Callable[[GenerationJob], None] = None, block: bool = True,
+               timeout: float = None) -> GenerationJob:
+        """Encola un trabajo. Con la cola llena espera (block) o lanza queue.Full"""
+        if not self.accepting:
+            raise BackendError("El cliente del backend está cerrado")
+        self._ensure_workers()
+        job = GenerationJob(prompt, negative_prompt, params, on_done)
+        self.jobs.put(job, block=block, timeout=timeout)
+        return job
+
+    def submit_many(self, items: Iterable[Tuple[str, str, Dict[str, Any]]],
+                    on_done: Callable[[GenerationJob], None] = None) -> List[GenerationJob]:
+        """Encola un lote de (prompt, negative_prompt, params) a medida que hay sitio en la cola"""
+        return [self.submit(prompt, negative_prompt, params, on_done)
+                for prompt, negative_prompt, params in items]
+
+    def pending(self) -> int:
+        """Trabajos en cola más los que se están enviando"""
+        with self.lock:
+            return self.jobs.qsize() + self.running
+
+    def _ensure_workers(self):
+        with self.lock:
+            if self.workers:
+                return
+            for index in range(self.concurrency):
+                worker = threading.Thread(target=self._work, name=f"backend-{index}", daemon=True)
+                worker.start()
+                self.workers.append(worker)
+
+    def _work(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            with self.lock:
+                self.running += 1
+            try:
+                self._run(job)
+            except Exception as e:
+                job.status, job.error = FAILED, str(e)
+            finally:
+                with self.lock:
+                    self.running -= 1
+                self._finish(job)
+
+    def _run(self, job: GenerationJob):
+        job.status = RUNNING
+        job.started_at = time.perf_counter()
+        path, payload = self.build_request(job)
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        while True:
+            job.attempts += 1
+            started = time.perf_counter()
+            try:
+                status, data = self.pool.request("POST", path, body, headers)
+                job.latency_ms = (time.perf_counter() - started) * 1000
+                if status >= 400:
+                    raise BackendError(f"HTTP {status}: {data[:200].decode('utf-8', 'replace')}",
+                                       status, retryable=status == 429 or status >= 500)
+                job.result = json.loads(data) if data else None
+                job.status = DONE
+                return
+            except (OSError, http.client.HTTPException, BackendError, ValueError) as e:
+                retryable = getattr(e, "retryable", not isinstance(e, ValueError))
+                if self.closed or not retryable or job.attempts > self.retries:
+                    job.error = str(e) or e.__class__.__name__
+                    job.status = CANCELLED if self.closed else FAILED
+                    return
+                with self.lock:
+                    self.retried += 1
+                delay = min(MAX_BACKOFF_S, self.backoff * 2 ** (job.attempts - 1))
+                time.sleep(delay * random.uniform(0.8, 1.2))
+
+    def _finish(self, job: GenerationJob):
+        job.finished_at = time.perf_counter()
+        with self.lock:
+            if job.status == DONE:
+                self.completed += 1
+                self.latencies.append(job.latency_ms)
+            elif job.status == CANCELLED:
+                # Cancelado al cerrar: no es un fallo del backend
+                self.cancelled += 1
+            else:
+                self.failed += 1
+        job.done_event.set()
+        if job.on_done is not None:
+            try:
+                job.on_done(job)
+            except Exception as e:
+                print(f"Error en el callback del trabajo {job.id}: {e}")
+
+    def build_request(self, job: GenerationJob) -> Tuple[str, Dict[str, Any]]:
+        """(ruta, cuerpo JSON) de la API del backend para un trabajo"""
+        if self.kind == "a1111":
+            payload = {"prompt": job.prompt, "negative_prompt": job.negative_prompt}
+            payload.update(job.params)
+            return "/sdapi/v1/txt2img", payload
+
+        if not self.workflow:
+            raise BackendError("ComfyUI necesita un flujo en formato API (backend_workflow)")
+        replacements = {"$prompt": job.prompt, "$negative_prompt": job.negative_prompt}
+
+        def fill(value):
+            if isinstance(value, dict):
+                return {key: fill(item) for key, item in value.items()}
+            if isinstance(value, list):
+                return [fill(item) for item in value]
+            return replacements.get(value, value) if isinstance(value, str) else value
+
+        return "/prompt", {"prompt": fill(self.workflow), "client_id": self.client_id}
+
+    # ------------------------------------------------------------------
+    # Estadísticas y cierre
+    # ------------------------------------------------------------------
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores y latencias (ms) de las últimas peticiones correctas"""
+        with self.lock:
+            latencies = sorted(self.latencies)
+            stats = {"pending": self.jobs.qsize() + self.running, "completed": self.completed,
+                     "failed": self.failed, "cancelled": self.cancelled, "retried": self.retried,
+                     "connections_opened": self.pool.created}
+        if latencies:
+            stats["latency_ms"] = {
+                "mean": sum(latencies) / len(latencies),
+                "p50": latencies[len(latencies) // 2],
+                "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                "max": latencies[-1],
+            }
+        return stats
+
+    def close(self, wait: bool = False):
+        """Deja de aceptar trabajos; con wait termina los encolados, si no los cancela sin bloquear"""
+        self.accepting = False
+        if wait:
+            for _ in self.workers:
+                self.jobs.put(None)
+            for worker in self.workers:
+                worker.join()
+        else:
+            # Los reintentos en curso también se cancelan
+            self.closed = True
+            while True:
+                try:
+                    job = self.jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not None:
+                    job.status, job.error = CANCELLED, "Cliente cerrado"
+                    self._finish(job)
+            try:
+                for _ in self.workers:
+                    self.jobs.put_nowait(None)
+            except queue.Full:
+                pass
+        self.closed = True
+        self.pool.close()
@@ -0,0 +1,116 @@
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# PNG transparente de 1x1 que se devuelve como "imagen generada"
+_BLANK_PNG = base64.b64encode(bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000005000103ce2fa600"
+    "00000049454e44ae426082"
+)).decode("ascii")
+
+
+class StubBackend:
+    """Servidor local que imita las rutas de A1111 (/sdapi/v1/txt2img) y ComfyUI (/prompt) para
+    probar el cliente sin GPU. Puede simular latencia y fallos 503 aleatorios"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, delay: float = 0.0,
+                 fail_rate: float = 0.0):
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.lock = threading.Lock()
+        self.requests = []       # cuerpos JSON recibidos, en orden
+        self.connections = 0     # conexiones TCP aceptadas (para comprobar el keep-alive)
+        self.failures = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubBackend":
+        self.thread = threading.Thread(target=self.server.serve_forever, name="backend-stub", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def respond(self, path: str, payload: dict):
+        """(estado, cuerpo) para una petición ya leída"""
+        with self.lock:
+            self.requests.append(payload)
+            fail = random.random() < self.fail_rate
+            if fail:
+                self.failures += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if fail:
+            return 503, {"error": "Backend simulado ocupado"}
+        if path == "/sdapi/v1/txt2img":
+            return 200, {"images": [_BLANK_PNG], "parameters": payload,
+                         "info": json.dumps({"prompt": payload.get("prompt", "")})}
+        if path == "/prompt":
+            return 200, {"prompt_id": uuid.uuid4().hex, "number": len(self.requests), "node_errors": {}}
+        return 404, {"error": f"Ruta no encontrada: {path}"}
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Cabeceras y cuerpo salen en escrituras separadas: sin esto Nagle suma ~40 ms por respuesta
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub.lock:
+                    stub.connections += 1
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0) or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    status, body = 400, {"error": "JSON inválido"}
+                else:
+                    status, body = stub.respond(self.path, payload)
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backend de generación simulado (A1111/ComfyUI)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7860)
+    parser.add_argument("--delay", type=float, default=0.0, help="Segundos de espera por petición")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fracción de respuestas 503")
+    args = parser.parse_args(argv)
+    stub = StubBackend(args.host, args.port, args.delay, args.fail_rate)
+    print(f"Backend simulado escuchando en {stub.url}")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        stub.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
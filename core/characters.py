@@ -0,0 +1,153 @@
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from logic.json_store import read_json, write_json
+
+# Versión del formato de los archivos de personaje
+CHARACTER_VERSION = "1.0"
+
+
+def category_key(name: str) -> str:
+    """Clave snake_case de una categoría ("Cabello forma" -> "cabello_forma")"""
+    return name.lower().replace(" ", "_")
+
+
+def category_values(categories: Dict[str, Any]) -> Dict[str, str]:
+    """{clave_snake_case: texto} de un diccionario de categorías con nombres o claves"""
+    return {category_key(name): value for name, value in categories.items() if isinstance(value, str)}
+
+
+class CharacterStore:
+    """Personajes en data/characters: carpeta <clave>/<clave>.json con metadatos y categorías,
+    o el formato antiguo <clave>.json con las categorías sueltas"""
+
+    def __init__(self, characters_dir: str = None, snapshot=None):
+        if characters_dir is None:
+            current_dir = os.path.dirname(os.path.dirname(__file__))
+            characters_dir = os.path.join(current_dir, "data", "characters")
+        self.characters_dir = characters_dir
+        # Con un StartupSnapshot los personajes sin cambios no se vuelven a parsear al arrancar
+        self.read = snapshot.read_json if snapshot is not None else read_json
+
+    # ------------------------------------------------------------------
+    # Rutas
+    # ------------------------------------------------------------------
+    def folder_name(self, name: str) -> str:
+        """Nombre de carpeta y archivo de un personaje ("Carol v1" -> "carol_v1")"""
+        return name.lower().replace(" ", "_")
+
+    def character_file(self, name: str) -> str:
+        """Ruta del archivo en la estructura de carpetas (exista o no)"""
+        folder = self.folder_name(name)
+        return os.path.join(self.characters_dir, folder, f"{folder}.json")
+
+    def legacy_file(self, name: str) -> str:
+        return os.path.join(self.characters_dir, f"{self.folder_name(name)}.json")
+
+    def resolve_file(self, name: str) -> Optional[str]:
+        """Archivo existente del personaje: primero la carpeta, luego el formato antiguo"""
+        for path in (self.character_file(name), self.legacy_file(name)):
+            if os.path.exists(path):
+                return path
+        return None
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(os.path.join(self.characters_dir, self.folder_name(name)))
+
+    def get_stamp(self, name: str) -> Optional[float]:
+        """Fecha de modificación del archivo del personaje (None si no existe)"""
+        path = self.resolve_file(name)
+        return os.path.getmtime(path) if path else None
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+    def list_characters(self) -> List[Dict[str, str]]:
+        """[{name, display_text}] de todos los personajes, ordenados por nombre"""
+        os.makedirs(self.characters_dir, exist_ok=True)
+        characters = []
+        for item in os.listdir(self.characters_dir):
+            item_path = os.path.join(self.characters_dir, item)
+            if os.path.isdir(item_path):
+                json_path = os.path.join(item_path, f"{item}.json")
+                if os.path.exists(json_path):
+                    characters.append(self._describe(item, json_path))
+            elif item.endswith('.json'):
+                # Formato antiguo: solo se lista si el archivo se puede leer
+                try:
+                    read_json(os.path.join(self.characters_dir, item), {})
+                except ValueError:
+                    continue
+                characters.append({
+                    'name': item[:-5].replace('_', ' ').title(),
+                    'display_text': f"{item[:-5].replace('_', ' ').title()} - Formato antiguo"
+                })
+        characters.sort(key=lambda x: x['name'])
+        return characters
+
+    def _describe(self, folder: str, json_path: str) -> Dict[str, str]:
+        """Nombre y texto de la lista para un personaje en carpeta"""
+        fallback = folder.replace('_', ' ').title()
+        try:
+            metadata = self.read(json_path, {}).get("metadata", {})
+        except ValueError:
+            return {'name': fallback, 'display_text': f"{fallback} - Error al cargar"}
+
+        if "character_name" not in metadata:
+            return {'name': fallback, 'display_text': f"{fallback} - Sin metadatos"}
+
+        name = metadata["character_name"]
+        if "created_date" not in metadata:
+            return {'name': name, 'display_text': f"{name} - Sin fecha"}
+        try:
+            created_date = datetime.fromisoformat(metadata["created_date"].replace('Z', '+00:00'))
+            return {'name': name, 'display_text': f"{name} - {created_date.strftime('%d/%m/%Y')}"}
+        except ValueError:
+            return {'name': name, 'display_text': f"{name} - Fecha inválida"}
+
+    def load_character(self, name: str) -> Optional[Dict[str, Any]]:
+        """Datos crudos del archivo del personaje (None si no existe)"""
+        path = self.resolve_file(name)
+        return read_json(path, {}) if path else None
+
+    def load_categories(self, name: str) -> Optional[Dict[str, Any]]:
+        """Categorías del personaje en cualquiera de los dos formatos (None si no existe)"""
+        data = self.load_character(name)
+        if data is None:
+            return None
+        if "metadata" in data and "categories" in data:
+            return data["categories"]
+        return data
+
+    def load_values(self, name: str) -> Dict[str, str]:
+        """Valores del personaje como {clave_snake_case: texto} (vacío si no existe o falla)"""
+        try:
+            return category_values(self.load_categories(name) or {})
+        except Exception as e:
+            print(f"Error cargando personaje {name}: {e}")
+            return {}
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+    def save_character(self, name: str, categories: Dict[str, str], description: str = None) -> str:
+        """Guarda el personaje en su carpeta con metadatos (claves en snake_case); devuelve la ruta"""
+        path = self.character_file(name)
+        now = datetime.now().isoformat()
+        existing = read_json(path, {}) if os.path.exists(path) else {}
+        created_date = existing.get("metadata", {}).get("created_date", now)
+        character_data = {
+            "metadata": {
+                "character_name": name,
+                "display_name": name,
+                "created_date": created_date,
+                "last_modified": now,
+                "version": CHARACTER_VERSION,
+                "type": "character",
+                "description": description or f"Personaje {name} creado desde la aplicación"
+            },
+            "categories": {category_key(category): value for category, value in categories.items()}
+        }
+        write_json(path, character_data)
+        return path
@@ -0,0 +1,161 @@
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from logic.json_store import read_json
+from logic.presets_manager import PresetsManager
+from logic.prompt_generator import CompiledPrompt, PromptGenerator
+from logic.startup_snapshot import get_startup_snapshot
+from logic.tag_store import TagStore
+from logic.variations_manager import VariationsManager
+from .characters import CharacterStore, category_values
+
+# Resultados por defecto de una búsqueda de tags
+DEFAULT_SEARCH_LIMIT = 50
+
+
+class Library:
+    """Biblioteca sin interfaz: personajes, variaciones, presets, vocabulario de tags y
+    compilación de prompts. La interfaz, los scripts y los servicios usan la misma instancia"""
+
+    def __init__(self, data_dir: str = None, snapshot=None):
+        if data_dir is None:
+            data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+        self.data_dir = data_dir
+        self.snapshot = snapshot
+        self.read = snapshot.read_json if snapshot is not None else read_json
+        self.categories_file = os.path.join(data_dir, "categories.json")
+
+        self.characters = CharacterStore(os.path.join(data_dir, "characters"), snapshot=snapshot)
+        self.variations = VariationsManager()
+        self.variations.characters_dir = self.characters.characters_dir
+        self.variations.manifest_file = os.path.join(data_dir, "cache", "variations_manifest.json")
+        self.presets = PresetsManager(snapshot=snapshot)
+        self.presets.presets_dir = os.path.join(data_dir, "presets")
+        # (carpeta, preset) -> (mtime_ns, tamaño, valores): render no relee presets sin cambios
+        self._preset_values: Dict[Tuple[str, str], tuple] = {}
+        self._tags = None
+        self._tags_guard = threading.Lock()
+
+        # Un generador propio (no el del editor) con su caché de compilados
+        self.generator = PromptGenerator()
+        self.render_lock = threading.Lock()
+
+    @property
+    def tags(self) -> TagStore:
+        """Vocabulario de tags por categoría (migra el tags.json único a shards la primera vez)"""
+        with self._tags_guard:
+            if self._tags is None:
+                self._tags = TagStore(os.path.join(self.data_dir, "tags"),
+                                      os.path.join(self.data_dir, "tags.json"), snapshot=self.snapshot)
+                self._tags.migrate()
+            return self._tags
+
+    # ------------------------------------------------------------------
+    # Listados
+    # ------------------------------------------------------------------
+    def list_categories(self) -> List[str]:
+        """Claves de las categorías en el orden de categories.json"""
+        return list(self.read(self.categories_file, {}).get("categorias", []))
+
+    def list_characters(self) -> List[Dict[str, str]]:
+        return self.characters.list_characters()
+
+    def list_variations(self, character_name: str) -> List[str]:
+        self.require_character(character_name)
+        return self.variations.get_variation_names(character_name)
+
+    def require_character(self, character_name: str):
+        """KeyError si el personaje no existe (evita crear archivos de variaciones vacíos)"""
+        if self.characters.resolve_file(character_name) is None:
+            raise KeyError(f"Personaje '{character_name}' no encontrado")
+
+    def list_presets(self) -> Dict[str, List[str]]:
+        """{carpeta: ids de presets}"""
+        return self.presets.read_folder_listings()[1]
+
+    def search_tags(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT,
+                    categories: Iterable[str] = None) -> List[Tuple[str, str]]:
+        """[(categoría, tag)] que contienen el texto; primero los que empiezan por él"""
+        query = query.strip().lower()
+        if not query:
+            return []
+        tags = self.tags.get_many(list(categories)) if categories else self.tags.get_all()
+        prefix, contains = [], []
+        for key, values in tags.items():
+            for tag in values:
+                lowered = tag.lower()
+                if lowered.startswith(query):
+                    prefix.append((key, tag))
+                elif query in lowered:
+                    contains.append((key, tag))
+        return (prefix + contains)[:limit]
+
+    # ------------------------------------------------------------------
+    # Compilación
+    # ------------------------------------------------------------------
+    def resolve_values(self, character: str = None, variation: str = None,
+                       presets: Iterable[Tuple[str, str]] = (),
+                       overrides: Dict[str, str] = None) -> Dict[str, str]:
+        """{clave: texto} de un personaje (o una de sus variaciones) con presets y valores
+        sueltos aplicados encima, en ese orden"""
+        values = {}
+        if character:
+            self.require_character(character)
+        if character and variation:
+            categories = self.variations.resolve_variation_categories(character, variation)
+            if not categories and variation not in self.variations.get_variation_names(character):
+                raise KeyError(f"Variación '{variation}' no encontrada para {character}")
+            values = category_values(categories)
+        elif character:
+            values = self.characters.load_values(character)
+        for folder, preset_id in presets:
+            values.update(self.preset_values(folder, preset_id))
+        if overrides:
+            values.update(category_values(overrides))
+        return values
+
+    def preset_values(self, folder: str, preset_id: str) -> Dict[str, str]:
+        """{clave: texto} de un preset; solo relee el archivo si cambió su fecha o tamaño"""
+        safe_name, path = self.presets.get_preset_file(folder, preset_id)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            raise KeyError(f"Preset '{folder}/{preset_id}' no encontrado")
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = self._preset_values.get((folder, safe_name))
+        if cached is not None and cached[0] == stamp:
+            return dict(cached[1])
+        preset = self.read(path, {}).get("presets", {}).get(safe_name)
+        if preset is None:
+            raise KeyError(f"Preset '{folder}/{preset_id}' no encontrado")
+        values = category_values(preset.get("categories", {}))
+        self._preset_values[(folder, safe_name)] = (stamp, values)
+        return dict(values)
+
+    def compile_values(self, values: Dict[str, str]) -> CompiledPrompt:
+        """Compila {clave: texto} con el caché de compilados compartido"""
+        with self.render_lock:
+            self.generator.clear_all()
+            for key, value in values.items():
+                self.generator.update_category(key, value)
+            return self.generator.compile()
+
+    def render(self, character: str = None, variation: str = None,
+               presets: Iterable[Tuple[str, str]] = (),
+               overrides: Dict[str, str] = None) -> CompiledPrompt:
+        """Prompt compilado de un personaje, variación y presets"""
+        return self.compile_values(self.resolve_values(character, variation, presets, overrides))
+
+
+_library: Optional[Library] = None
+_library_guard = threading.Lock()
+
+
+def get_library() -> Library:
+    """Biblioteca compartida (con el snapshot de arranque delante de las lecturas)"""
+    global _library
+    with _library_guard:
+        if _library is None:
+            _library = Library(snapshot=get_startup_snapshot())
+        return _library
@@ -0,0 +1,356 @@
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .library import Library, get_library, DEFAULT_SEARCH_LIMIT
+
+# Dirección por defecto (solo local)
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Segundos que una conexión keep-alive puede quedar inactiva antes de cerrarse
+KEEP_ALIVE_TIMEOUT = 30
+# Tamaño máximo del cuerpo de una petición (un lote de miles de renders cabe de sobra)
+MAX_BODY_BYTES = 16 * 1024 * 1024
+# Tamaño máximo de la línea de petición más cabeceras
+MAX_HEADER_BYTES = 64 * 1024
+# Llamadas máximas en un lote JSON-RPC
+MAX_BATCH_SIZE = 10000
+
+# Códigos de error de JSON-RPC 2.0
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+_REASONS = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class RpcError(Exception):
+    """Error con código JSON-RPC que se devuelve al cliente"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class HttpError(Exception):
+    """Petición HTTP mal formada: se responde con el estado y se cierra la conexión"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class PromptService:
+    """Métodos del servicio sobre la biblioteca en memoria (sin asyncio: se ejecutan en un hilo)"""
+
+    def __init__(self, library: Library):
+        self.library = library
+        self.started_at = time.time()
+        self.calls = 0
+        # call() corre en varios hilos del executor a la vez
+        self.calls_lock = threading.Lock()
+        self.methods = {
+            "render": self.render,
+            "search": self.search,
+            "list_characters": self.list_characters,
+            "list_variations": self.list_variations,
+            "list_presets": self.list_presets,
+            "list_categories": self.list_categories,
+            "stats": self.stats,
+        }
+
+    def render(self, character: str = None, variation: str = None, presets=(),
+               overrides: Dict[str, str] = None) -> Dict[str, Any]:
+        """Prompt compilado; presets es una lista de [carpeta, id]"""
+        try:
+            presets = [(folder, preset_id) for folder, preset_id in presets]
+        except (TypeError, ValueError):
+            raise RpcError(INVALID_PARAMS, "presets debe ser una lista de [carpeta, id]")
+        try:
+            compiled = self.library.render(character, variation, presets, overrides)
+        except KeyError as e:
+            raise RpcError(INVALID_PARAMS, str(e.args[0]))
+        return {
+            "prompt": compiled.prompt,
+            "terms": len(compiled.terms),
+            "tokens": compiled.total_tokens,
+            "chunks": len(compiled.chunk_boundaries),
+            "duplicates": compiled.duplicates,
+        }
+
+    def search(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT, categories=None):
+        if not isinstance(limit, int) or isinstance(limit, bool) or limit < 0:
+            raise RpcError(INVALID_PARAMS, "limit debe ser un entero no negativo")
+        return [{"category": key, "tag": tag}
+                for key, tag in self.library.search_tags(query, limit, categories)]
+
+    def list_characters(self):
+        return self.library.list_characters()
+
+    def list_variations(self, character: str):
+        try:
+            return self.library.list_variations(character)
+        except KeyError as e:
+            raise RpcError(INVALID_PARAMS, str(e.args[0]))
+
+    def list_presets(self):
+        return self.library.list_presets()
+
+    def list_categories(self):
+        return self.library.list_categories()
+
+    def stats(self):
+        return {
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "calls": self.calls,
+            "compile_cache": self.library.generator.get_cache_stats(),
+            "snapshot": self.library.snapshot.get_stats() if self.library.snapshot else None,
+        }
+
+    # ------------------------------------------------------------------
+    # JSON-RPC
+    # ------------------------------------------------------------------
+    def call(self, method: str, params: Any) -> Any:
+        handler = self.methods.get(method)
+        if handler is None:
+            raise RpcError(METHOD_NOT_FOUND, f"Método no encontrado: {method}")
+        with self.calls_lock:
+            self.calls += 1
+        try:
+            if isinstance(params, dict):
+                return handler(**params)
+            return handler(*(params or ()))
+        except TypeError as e:
+            raise RpcError(INVALID_PARAMS, str(e))
+
+    def handle_one(self, request: Any) -> Optional[Dict[str, Any]]:
+        """Respuesta a una llamada (None si es una notificación sin id)"""
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return _rpc_error(None, INVALID_REQUEST, "Petición inválida")
+        request_id = request.get("id")
+        try:
+            result = self.call(request["method"], request.get("params"))
+        except RpcError as e:
+            response = _rpc_error(request_id, e.code, e.message)
+        except Exception as e:
+            print(f"Servicio de prompts: error en {request['method']}: {e}")
+            response = _rpc_error(request_id, INTERNAL_ERROR, str(e))
+        else:
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        return response if "id" in request else None
+
+    def handle_payload(self, payload: Any) -> Any:
+        """Una llamada o un lote (lista) de llamadas, resueltas en orden"""
+        if isinstance(payload, list):
+            if not payload:
+                return _rpc_error(None, INVALID_REQUEST, "Lote vacío")
+            if len(payload) > MAX_BATCH_SIZE:
+                return _rpc_error(None, INVALID_REQUEST, f"Lote mayor que {MAX_BATCH_SIZE} llamadas")
+            responses = [self.handle_one(request) for request in payload]
+            return [response for response in responses if response is not None] or None
+        return self.handle_one(payload)
+
+    def handle_get(self, path: str, query: Dict[str, list]) -> Any:
+        """Atajos GET de solo lectura (para curl y el navegador)"""
+        parts = [unquote(part) for part in path.strip("/").split("/") if part]
+
+        def first(name, default=None):
+            return query.get(name, [default])[0]
+
+        if parts == ["health"]:
+            return {"status": "ok"}
+        if parts == ["stats"]:
+            return self.stats()
+        if parts == ["characters"]:
+            return self.list_characters()
+        if len(parts) == 3 and parts[0] == "characters" and parts[2] == "variations":
+            return self.list_variations(parts[1])
+        if parts == ["presets"]:
+            return self.list_presets()
+        if parts == ["categories"]:
+            return self.list_categories()
+        if parts == ["search"]:
+            try:
+                limit = int(first("limit", DEFAULT_SEARCH_LIMIT))
+            except ValueError:
+                raise RpcError(INVALID_PARAMS, "limit debe ser un entero no negativo")
+            return self.search(first("q", ""), limit)
+        if parts == ["render"]:
+            presets = [tuple(value.split("/", 1)) for value in query.get("preset", [])]
+            return self.render(first("character"), first("variation"), presets)
+        raise RpcError(METHOD_NOT_FOUND, f"Ruta no encontrada: /{'/'.join(parts)}")
+
+
+def _rpc_error(request_id, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class PromptServer:
+    """Servidor HTTP/1.1 mínimo con keep-alive: POST /rpc recibe JSON-RPC 2.0 (una llamada o un
+    lote) y las rutas GET son atajos de solo lectura. Todos los clientes comparten la biblioteca"""
+
+    def __init__(self, library: Library = None, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 unix_path: str = None):
+        self.service = PromptService(library or get_library())
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.server = None
+        self.connections = 0
+
+    async def start(self):
+        if self.unix_path:
+            if os.path.exists(self.unix_path):
+                os.remove(self.unix_path)
+            self.server = await asyncio.start_unix_server(self.handle_connection, path=self.unix_path,
+                                                          limit=MAX_HEADER_BYTES)
+            print(f"Servicio de prompts escuchando en {self.unix_path}")
+        else:
+            self.server = await asyncio.start_server(self.handle_connection, self.host, self.port,
+                                                     limit=MAX_HEADER_BYTES)
+            self.port = self.server.sockets[0].getsockname()[1]
+            print(f"Servicio de prompts escuchando en http://{self.host}:{self.port}")
+        return self
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.unix_path and os.path.exists(self.unix_path):
+            os.remove(self.unix_path)
+        # El próximo arranque (del servicio o de la aplicación) parte del caché caliente
+        if self.service.library.snapshot is not None:
+            self.service.library.snapshot.save()
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self.read_request(reader), KEEP_ALIVE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except HttpError as e:
+                    # Sin un largo fiable no se sabe dónde empieza la siguiente petición
+                    self.write_response(writer, e.status, {"error": e.message}, False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                status, body, keep_alive = await self.dispatch(*request)
+                self.write_response(writer, status, body, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple]:
+        """(método, ruta, cabeceras, cuerpo, versión) o None si el cliente cerró la conexión"""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:
+                return None
+            raise
+        except asyncio.LimitOverrunError:
+            raise ConnectionError("Cabeceras demasiado grandes")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise ConnectionError("Línea de petición inválida")
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", "0") or 0)
+        except ValueError:
+            raise HttpError(400, "Content-Length inválido")
+        if length < 0:
+            raise HttpError(400, "Content-Length inválido")
+        if length > MAX_BODY_BYTES:
+            return method, target, headers, None, version
+        body = await reader.readexactly(length) if length else b""
+        return method, target, headers, body, version
+
+    async def dispatch(self, method: str, target: str, headers: Dict[str, str],
+                       body: Optional[bytes], version: str) -> Tuple[int, Any, bool]:
+        """(estado HTTP, cuerpo JSON, mantener la conexión)"""
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        url = urlsplit(target)
+        loop = asyncio.get_running_loop()
+
+        if body is None:
+            return 413, _rpc_error(None, INVALID_REQUEST, "Cuerpo demasiado grande"), False
+        if method == "POST" and url.path == "/rpc":
+            try:
+                payload = json.loads(body)
+            except ValueError as e:
+                return 200, _rpc_error(None, PARSE_ERROR, str(e)), keep_alive
+            # El lote entero en un solo salto al hilo: la biblioteca no bloquea el bucle de eventos
+            result = await loop.run_in_executor(None, self.service.handle_payload, payload)
+            return (200 if result is not None else 204), result, keep_alive
+        if method == "GET":
+            try:
+                result = await loop.run_in_executor(None, self.service.handle_get, url.path,
+                                                    parse_qs(url.query))
+            except RpcError as e:
+                return 404 if e.code == METHOD_NOT_FOUND else 400, {"error": e.message}, keep_alive
+            except Exception as e:
+                return 500, {"error": str(e)}, keep_alive
+            return 200, result, keep_alive
+        return 405, {"error": f"Método HTTP no soportado: {method} {url.path}"}, keep_alive
+
+    def write_response(self, writer: asyncio.StreamWriter, status: int, body: Any, keep_alive: bool):
+        payload = b"" if status == 204 else json.dumps(body, ensure_ascii=False).encode("utf-8")
+        headers = [
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(payload)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + payload)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio local de prompts (JSON-RPC sobre HTTP)")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", dest="unix_path", help="Escuchar en un socket Unix en lugar de TCP")
+    args = parser.parse_args(argv)
+    server = PromptServer(host=args.host, port=args.port, unix_path=args.unix_path)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+from typing import Dict, Tuple
+
+
+class ChangeTracker:
+    """Registro de cambios por categoría: cada consumidor tiene su propio conjunto
+    pendiente de (valor_anterior, valor_nuevo) que vacía al consumirlo"""
+
+    def __init__(self):
+        self.pending: Dict[str, Dict[str, Tuple[str, str]]] = {}
+
+    def register(self, consumer: str):
+        """Registra un consumidor; solo ve los cambios posteriores al registro"""
+        self.pending.setdefault(consumer, {})
+
+    def record(self, category: str, old_value: str, new_value: str):
+        """Anota un cambio; varios cambios seguidos se funden en (primer anterior, último nuevo)"""
+        if old_value == new_value:
+            return
+        for changes in self.pending.values():
+            if category in changes:
+                first_old = changes[category][0]
+                if first_old == new_value:
+                    # Volvió al valor original: ya no hay cambio para este consumidor
+                    del changes[category]
+                else:
+                    changes[category] = (first_old, new_value)
+            else:
+                changes[category] = (old_value, new_value)
+
+    def rename(self, old_category: str, new_category: str):
+        """Mueve los cambios pendientes de una categoría renombrada"""
+        for changes in self.pending.values():
+            if old_category in changes:
+                changes[new_category] = changes.pop(old_category)
+
+    def has_changes(self, consumer: str) -> bool:
+        return bool(self.pending.get(consumer))
+
+    def peek(self, consumer: str) -> Dict[str, Tuple[str, str]]:
+        """Cambios pendientes de un consumidor, sin vaciarlos"""
+        return dict(self.pending.get(consumer, {}))
+
+    def consume(self, consumer: str) -> Dict[str, Tuple[str, str]]:
+        """Devuelve y vacía los cambios pendientes de un consumidor"""
+        changes = self.pending.get(consumer, {})
+        self.pending[consumer] = {}
+        return changes
+
+    def clear(self, consumer: str = None):
+        """Descarta los cambios pendientes (de un consumidor o de todos)"""
+        for name in ([consumer] if consumer else list(self.pending)):
+            if name in self.pending:
+                self.pending[name] = {}
@@ -0,0 +1,143 @@
+import sys
+from collections import deque
+from types import MappingProxyType
+from typing import Dict, Optional, Tuple
+
+# Cantidad de cubetas en que se reparte el estado; una edición solo copia la cubeta que toca
+BUCKET_COUNT = 16
+# Presupuesto de memoria por defecto del historial
+DEFAULT_HISTORY_BUDGET_KB = 512
+
+_EMPTY_BUCKET = MappingProxyType({})
+
+
+class Snapshot:
+    """Estado inmutable del grid ({clave_snake_case: valor}) repartido en cubetas.
+    Los snapshots sucesivos comparten las cubetas que no cambiaron"""
+
+    __slots__ = ("buckets", "cost", "label")
+
+    def __init__(self, buckets: Tuple[MappingProxyType, ...] = None, cost: int = 0, label: str = ""):
+        self.buckets = buckets or (_EMPTY_BUCKET,) * BUCKET_COUNT
+        self.cost = cost      # bytes propios (no compartidos con el snapshot anterior)
+        self.label = label
+
+    @staticmethod
+    def bucket_of(key: str) -> int:
+        return hash(key) % BUCKET_COUNT
+
+    def get(self, key: str, default: str = "") -> str:
+        return self.buckets[self.bucket_of(key)].get(key, default)
+
+    def to_dict(self) -> Dict[str, str]:
+        values = {}
+        for bucket in self.buckets:
+            values.update(bucket)
+        return values
+
+    def with_values(self, values: Dict[str, str], label: str = "") -> "Snapshot":
+        """Nuevo snapshot con estos valores; devuelve self si no cambia nada"""
+        grouped: Dict[int, Dict[str, str]] = {}
+        for key, value in values.items():
+            if self.get(key) != (value or ""):
+                grouped.setdefault(self.bucket_of(key), {})[key] = value or ""
+        if not grouped:
+            return self
+
+        buckets = list(self.buckets)
+        cost = sys.getsizeof(buckets)
+        for index, changes in grouped.items():
+            bucket = dict(buckets[index])
+            for key, value in changes.items():
+                # Un valor vacío equivale a que la categoría no tenga valor
+                if value:
+                    bucket[key] = value
+                    cost += sys.getsizeof(value)
+                else:
+                    bucket.pop(key, None)
+            buckets[index] = MappingProxyType(bucket)
+            cost += sys.getsizeof(bucket)
+        return Snapshot(tuple(buckets), cost, label)
+
+    def changes_to(self, other: "Snapshot") -> Dict[str, str]:
+        """Valores que hay que escribir para pasar de este snapshot a otro (sin mirar cubetas compartidas)"""
+        changes = {}
+        for mine, theirs in zip(self.buckets, other.buckets):
+            if mine is theirs:
+                continue
+            for key in mine.keys() | theirs.keys():
+                value = theirs.get(key, "")
+                if mine.get(key, "") != value:
+                    changes[key] = value
+        return changes
+
+
+class History:
+    """Deshacer/rehacer sobre snapshots inmutables, acotado por memoria en vez de por cantidad"""
+
+    def __init__(self, budget_bytes: int = DEFAULT_HISTORY_BUDGET_KB * 1024):
+        self.budget_bytes = budget_bytes
+        self.current = Snapshot()
+        self.undo_stack: deque = deque()
+        self.redo_stack = []
+        self.used_bytes = self.current.cost
+
+    def reset(self, values: Dict[str, str] = None):
+        """Descarta el historial y toma estos valores como estado inicial"""
+        self.current = Snapshot().with_values(values or {})
+        self.undo_stack.clear()
+        self.redo_stack = []
+        self.used_bytes = self.current.cost
+
+    def commit(self, values: Dict[str, str], label: str = "") -> bool:
+        """Registra un paso con los valores que cambiaron; False si no cambió nada"""
+        snapshot = self.current.with_values(values, label)
+        if snapshot is self.current:
+            return False
+        self.undo_stack.append(self.current)
+        self.current = snapshot
+        self.used_bytes += snapshot.cost
+        for dropped in self.redo_stack:
+            self.used_bytes -= dropped.cost
+        self.redo_stack = []
+        self.trim()
+        return True
+
+    def trim(self):
+        """Olvida los pasos más antiguos hasta volver a entrar en el presupuesto"""
+        while self.used_bytes > self.budget_bytes and self.undo_stack:
+            self.used_bytes -= self.undo_stack.popleft().cost
+
+    def can_undo(self) -> bool:
+        return bool(self.undo_stack)
+
+    def can_redo(self) -> bool:
+        return bool(self.redo_stack)
+
+    def undo(self) -> Optional[Dict[str, str]]:
+        """Retrocede un paso; devuelve los valores a escribir, o None si no hay historial"""
+        if not self.undo_stack:
+            return None
+        previous = self.undo_stack.pop()
+        changes = self.current.changes_to(previous)
+        self.redo_stack.append(self.current)
+        self.current = previous
+        return changes
+
+    def redo(self) -> Optional[Dict[str, str]]:
+        """Avanza un paso deshecho; devuelve los valores a escribir, o None"""
+        if not self.redo_stack:
+            return None
+        following = self.redo_stack.pop()
+        changes = self.current.changes_to(following)
+        self.undo_stack.append(self.current)
+        self.current = following
+        return changes
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "undo_steps": len(self.undo_stack),
+            "redo_steps": len(self.redo_stack),
+            "used_bytes": self.used_bytes,
+            "budget_bytes": self.budget_bytes,
+        }
@@ -0,0 +1,372 @@
+import json
+import os
+import hashlib
+import tempfile
+from typing import Dict, List, Optional, Any, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .json_store import write_json
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp')
+
+# Tamaño de las miniaturas en disco (se reutilizan para vistas previas)
+THUMBNAIL_SIZE = 160
+
+# Un hash de 64 bits se parte en 8 segmentos de 8 bits para los buckets.
+# Por el principio del palomar, dos hashes a distancia <= 7 comparten al
+# menos un segmento idéntico, así que la búsqueda por buckets es exacta
+# hasta esa distancia; por encima se recorre todo el índice vectorizado.
+HASH_SEGMENTS = 8
+SEGMENT_BITS = 8
+
+# Distancia máxima (en bits de pHash) para considerar dos imágenes casi idénticas
+DUPLICATE_DISTANCE = 4
+
+# Radio por defecto de la búsqueda por imagen: por debajo de HASH_SEGMENTS para que use los buckets
+SIMILAR_DISTANCE = HASH_SEGMENTS - 1
+
+# Versión del índice (cambiarla recalcula los hashes guardados)
+INDEX_VERSION = 2
+
+
+def _dct_matrix(size: int) -> np.ndarray:
+    """Matriz de la DCT-II ortonormal usada por el pHash"""
+    n = np.arange(size)
+    matrix = np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / (2 * size))
+    matrix[0, :] *= 1 / np.sqrt(2)
+    return matrix * np.sqrt(2 / size)
+
+
+_DCT_32 = _dct_matrix(32)
+
+
+def _pack_bits(bits: np.ndarray) -> np.ndarray:
+    """Empaqueta una matriz (N, 64) de booleanos en enteros uint64"""
+    packed = np.packbits(bits.reshape(len(bits), 64), axis=1)
+    return packed.view('>u8').reshape(-1).astype(np.uint64)
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    """Cuenta los bits activos de cada uint64"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values).astype(np.int64)
+    as_bytes = values.astype('>u8').view(np.uint8).reshape(-1, 8)
+    return np.unpackbits(as_bytes, axis=1).sum(axis=1).astype(np.int64)
+
+
+def compute_hashes(gray_images: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Calcula dHash y pHash para un lote (N, 32, 32) de imágenes en escala de grises"""
+    stack = gray_images.astype(np.float64)
+
+    # dHash: gradiente horizontal sobre una reducción 8x9 (promedio por bloques)
+    rows = np.linspace(0, 32, 9).astype(int)
+    cols = np.linspace(0, 32, 10).astype(int)
+    sums = np.add.reduceat(np.add.reduceat(stack, rows[:-1], axis=1), cols[:-1], axis=2)
+    # Los bloques miden 3 o 4 columnas: sin dividir por el área, los bits seguirían sus anchos
+    reduced = sums / np.outer(np.diff(rows), np.diff(cols))
+    dhash_bits = reduced[:, :, 1:] > reduced[:, :, :-1]
+
+    # pHash: DCT 2D de todo el lote y comparación con la mediana de baja frecuencia
+    dct = np.einsum('ij,njk,lk->nil', _DCT_32, stack, _DCT_32)
+    low = dct[:, :8, :8].reshape(len(stack), 64)
+    medians = np.median(low[:, 1:], axis=1)
+    phash_bits = low > medians[:, None]
+
+    return _pack_bits(dhash_bits), _pack_bits(phash_bits)
+
+
+class ThumbnailCache:
+    """Caché en disco de miniaturas, indexadas por ruta, tamaño y fecha de modificación"""
+
+    def __init__(self, cache_dir: str, size: int = THUMBNAIL_SIZE):
+        self.cache_dir = cache_dir
+        self.size = size
+
+    def get_cache_key(self, image_path: str) -> Optional[str]:
+        """Genera la clave de caché de una imagen (cambia si el archivo cambia)"""
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            return None
+        raw = f"{os.path.abspath(image_path)}|{stat.st_size}|{stat.st_mtime_ns}|{self.size}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get_thumbnail_path(self, image_path: str) -> Optional[str]:
+        """Devuelve la ruta de la miniatura, generándola si no existe"""
+        key = self.get_cache_key(image_path)
+        if key is None:
+            return None
+
+        thumb_path = os.path.join(self.cache_dir, key[:2], f"{key}.png")
+        if os.path.exists(thumb_path):
+            return thumb_path
+
+        temp_path = None
+        try:
+            os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+            with Image.open(image_path) as image:
+                image.draft('RGB', (self.size, self.size))
+                image = image.convert('RGB')
+                image.thumbnail((self.size, self.size), Image.Resampling.LANCZOS)
+                # Temporal + os.replace: otro hilo que genere la misma miniatura nunca lee un PNG a medias
+                fd, temp_path = tempfile.mkstemp(prefix=f".{key}.", suffix=".tmp", dir=os.path.dirname(thumb_path))
+                with os.fdopen(fd, 'wb') as f:
+                    image.save(f, format='PNG')
+            os.replace(temp_path, thumb_path)
+            return thumb_path
+        except Exception as e:
+            print(f"Error generando miniatura de {image_path}: {e}")
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+            return None
+
+    def load_gray(self, image_path: str, size: int = 32) -> Optional[np.ndarray]:
+        """Carga la miniatura de una imagen reducida a escala de grises size x size"""
+        thumb_path = self.get_thumbnail_path(image_path)
+        if not thumb_path:
+            return None
+        try:
+            with Image.open(thumb_path) as image:
+                gray = image.convert('L').resize((size, size), Image.Resampling.BILINEAR)
+                return np.asarray(gray, dtype=np.uint8)
+        except Exception as e:
+            print(f"Error leyendo miniatura de {image_path}: {e}")
+            return None
+
+
+class ImageHashIndex:
+    """Índice de hashes perceptuales (dHash/pHash) de imágenes de presets y referencias"""
+
+    def __init__(self):
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        self.data_dir = os.path.join(base_dir, "data")
+        self.presets_dir = os.path.join(self.data_dir, "presets")
+        self.references_dir = os.path.join(self.data_dir, "sugeprompt", "references")
+        self.cache_dir = os.path.join(self.data_dir, "cache")
+        self.index_path = os.path.join(self.cache_dir, "image_hashes.json")
+        self.thumbnails = ThumbnailCache(os.path.join(self.cache_dir, "thumbnails"))
+
+        # Ruta relativa a data/ -> {"size", "mtime", "dhash", "phash", "source"}
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+        # Estructuras de búsqueda (se reconstruyen tras cada cambio)
+        self._keys: List[str] = []
+        self._dhashes = np.zeros(0, dtype=np.uint64)
+        self._phashes = np.zeros(0, dtype=np.uint64)
+        self._buckets: List[Dict[int, List[int]]] = []
+
+        self.load_index()
+
+    # ------------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------------
+    def load_index(self):
+        """Carga el índice guardado junto a la caché de miniaturas"""
+        try:
+            if os.path.exists(self.index_path):
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == INDEX_VERSION:
+                    self.entries = data.get('entries', {})
+        except Exception as e:
+            print(f"Error cargando índice de imágenes: {e}")
+            self.entries = {}
+        self._rebuild_lookup()
+
+    def save_index(self) -> bool:
+        """Guarda el índice en disco"""
+        try:
+            write_json(self.index_path, {"version": INDEX_VERSION, "entries": self.entries}, indent=None)
+            return True
+        except Exception as e:
+            print(f"Error guardando índice de imágenes: {e}")
+            return False
+
+    # ------------------------------------------------------------------
+    # Indexado
+    # ------------------------------------------------------------------
+    def scan_images(self) -> Dict[str, Dict[str, Any]]:
+        """Recorre las carpetas de presets y referencias y devuelve las imágenes encontradas"""
+        found = {}
+        for root_dir in (self.presets_dir, self.references_dir):
+            if not os.path.isdir(root_dir):
+                continue
+            for current_dir, _, files in os.walk(root_dir):
+                for file_name in files:
+                    if not file_name.lower().endswith(IMAGE_EXTENSIONS):
+                        continue
+                    full_path = os.path.join(current_dir, file_name)
+                    rel_path = os.path.relpath(full_path, self.data_dir).replace(os.sep, '/')
+                    try:
+                        stat = os.stat(full_path)
+                    except OSError:
+                        continue
+                    found[rel_path] = {
+                        "size": stat.st_size,
+                        "mtime": stat.st_mtime_ns,
+                        "source": self.describe_source(rel_path)
+                    }
+        return found
+
+    def describe_source(self, rel_path: str) -> Dict[str, str]:
+        """Identifica a qué preset o referencia pertenece una imagen"""
+        parts = rel_path.split('/')
+        # presets/<carpeta>/<preset>_images/<imagen>
+        if len(parts) == 4 and parts[0] == 'presets' and parts[2].endswith('_images'):
+            return {"type": "preset", "category_id": parts[1], "preset_id": parts[2][:-len('_images')]}
+        # sugeprompt/references/<categoría>/<imagen>
+        if len(parts) >= 4 and parts[0] == 'sugeprompt' and parts[1] == 'references':
+            return {"type": "reference", "category_id": parts[2],
+                    "name": os.path.splitext(parts[-1])[0]}
+        return {"type": "other"}
+
+    def refresh(self) -> int:
+        """Actualiza el índice con imágenes nuevas o modificadas; devuelve cuántas se recalcularon"""
+        found = self.scan_images()
+        pending = []
+        for rel_path, info in found.items():
+            current = self.entries.get(rel_path)
+            if current and current.get('size') == info['size'] and current.get('mtime') == info['mtime']:
+                continue
+            pending.append(rel_path)
+
+        removed = [rel_path for rel_path in self.entries if rel_path not in found]
+        for rel_path in removed:
+            del self.entries[rel_path]
+
+        if pending:
+            paths = [os.path.join(self.data_dir, rel_path) for rel_path in pending]
+            hashes = self.hash_files(paths)
+            for rel_path, result in zip(pending, hashes):
+                if result is None:
+                    continue
+                entry = dict(found[rel_path])
+                entry['dhash'] = f"{result[0]:016x}"
+                entry['phash'] = f"{result[1]:016x}"
+                self.entries[rel_path] = entry
+
+        if pending or removed:
+            self._rebuild_lookup()
+            self.save_index()
+        return len(pending)
+
+    def hash_files(self, paths: List[str]) -> List[Optional[Tuple[int, int]]]:
+        """Calcula (dHash, pHash) de varias imágenes en un solo lote vectorizado"""
+        grays = []
+        valid = []
+        for i, path in enumerate(paths):
+            gray = self.thumbnails.load_gray(path)
+            if gray is not None:
+                grays.append(gray)
+                valid.append(i)
+
+        results: List[Optional[Tuple[int, int]]] = [None] * len(paths)
+        if not grays:
+            return results
+
+        dhashes, phashes = compute_hashes(np.stack(grays))
+        for i, dhash, phash in zip(valid, dhashes, phashes):
+            results[i] = (int(dhash), int(phash))
+        return results
+
+    def _rebuild_lookup(self):
+        """Reconstruye los arreglos de hashes y los buckets por segmento"""
+        self._keys = [k for k, v in self.entries.items() if 'phash' in v and 'dhash' in v]
+        self._dhashes = np.array([int(self.entries[k]['dhash'], 16) for k in self._keys], dtype=np.uint64)
+        self._phashes = np.array([int(self.entries[k]['phash'], 16) for k in self._keys], dtype=np.uint64)
+
+        self._buckets = [{} for _ in range(HASH_SEGMENTS)]
+        for position, phash in enumerate(self._phashes.tolist()):
+            for segment, value in enumerate(self._segments(phash)):
+                self._buckets[segment].setdefault(value, []).append(position)
+
+    def _segments(self, value: int) -> List[int]:
+        """Divide un hash de 64 bits en segmentos (el primero es el prefijo)"""
+        mask = (1 << SEGMENT_BITS) - 1
+        return [(value >> (64 - SEGMENT_BITS * (i + 1))) & mask for i in range(HASH_SEGMENTS)]
+
+    def _candidates(self, phash: int, max_distance: int) -> np.ndarray:
+        """Posiciones candidatas para una consulta según los buckets de prefijos"""
+        if max_distance >= HASH_SEGMENTS:
+            return np.arange(len(self._keys))
+        positions = set()
+        for segment, value in enumerate(self._segments(phash)):
+            positions.update(self._buckets[segment].get(value, ()))
+        return np.fromiter(sorted(positions), dtype=np.int64, count=len(positions))
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    def search_hash(self, dhash: int, phash: int, max_distance: int = SIMILAR_DISTANCE,
+                    limit: int = 20, exclude: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Busca imágenes similares a un par de hashes por distancia de Hamming. Con max_distance
+        menor que HASH_SEGMENTS solo se comparan los candidatos de los buckets (resultado exacto);
+        con uno mayor se recorre todo el índice"""
+        if not self._keys:
+            return []
+
+        candidates = self._candidates(phash, max_distance)
+        if len(candidates) == 0:
+            return []
+
+        p_dist = _popcount(self._phashes[candidates] ^ np.uint64(phash))
+        d_dist = _popcount(self._dhashes[candidates] ^ np.uint64(dhash))
+        mask = p_dist <= max_distance
+        order = np.lexsort((d_dist[mask], p_dist[mask]))
+
+        results = []
+        for idx in order:
+            position = int(candidates[mask][idx])
+            key = self._keys[position]
+            if key == exclude:
+                continue
+            entry = self.entries[key]
+            results.append({
+                "path": os.path.join(self.data_dir, key),
+                "key": key,
+                "source": entry.get('source', {}),
+                "phash_distance": int(p_dist[mask][idx]),
+                "dhash_distance": int(d_dist[mask][idx]),
+                "duplicate": bool(p_dist[mask][idx] <= DUPLICATE_DISTANCE)
+            })
+            if len(results) >= limit:
+                break
+        return results
+
+    def search_similar(self, image_path: str, max_distance: int = SIMILAR_DISTANCE,
+                       limit: int = 20) -> List[Dict[str, Any]]:
+        """Busca presets/referencias visualmente parecidas a una imagen cualquiera
+        (exacto y por buckets hasta SIMILAR_DISTANCE bits de pHash)"""
+        hashes = self.hash_files([image_path])[0]
+        if hashes is None:
+            return []
+        exclude = None
+        if os.path.abspath(image_path).startswith(os.path.abspath(self.data_dir) + os.sep):
+            exclude = os.path.relpath(image_path, self.data_dir).replace(os.sep, '/')
+        return self.search_hash(hashes[0], hashes[1], max_distance, limit, exclude)
+
+    def find_duplicates_for(self, image_paths: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Marca qué imágenes (p. ej. adjuntos de un preset nuevo) ya existen casi idénticas"""
+        duplicates = {}
+        for path, hashes in zip(image_paths, self.hash_files(image_paths)):
+            if hashes is None:
+                continue
+            matches = self.search_hash(hashes[0], hashes[1], DUPLICATE_DISTANCE, limit=5)
+            if matches:
+                duplicates[path] = matches
+        return duplicates
+
+    def find_near_duplicates(self, max_distance: int = DUPLICATE_DISTANCE) -> List[Tuple[str, str, int]]:
+        """Devuelve los pares de imágenes del índice que son casi idénticas"""
+        pairs = []
+        for position, phash in enumerate(self._phashes.tolist()):
+            candidates = self._candidates(phash, max_distance)
+            candidates = candidates[candidates > position]
+            if len(candidates) == 0:
+                continue
+            distances = _popcount(self._phashes[candidates] ^ np.uint64(phash))
+            for other, distance in zip(candidates[distances <= max_distance], distances[distances <= max_distance]):
+                pairs.append((self._keys[position], self._keys[int(other)], int(distance)))
+        return pairs
@@ -0,0 +1,134 @@
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos, solo entre hilos
+    fcntl = None
+
+# Un candado por archivo dentro del proceso (fcntl solo protege entre procesos)
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+# Un único hilo de escritura conserva el orden de los guardados en segundo plano
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="json-writer")
+
+
+def _thread_lock(path: str) -> threading.RLock:
+    with _thread_locks_guard:
+        return _thread_locks.setdefault(path, threading.RLock())
+
+
+def _lock_path(path: str) -> str:
+    """Archivo de bloqueo junto al archivo (el original se reemplaza al guardar y cambia de inodo)"""
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.lock")
+
+
+@contextmanager
+def locked(path: str, exclusive: bool = True):
+    """Bloqueo consultivo de un archivo JSON: compartido para leer, exclusivo para escribir.
+    Solo los escritores crean el archivo de bloqueo: un lector sin él no tiene con quién competir"""
+    path = os.path.abspath(path)
+    with _thread_lock(path):
+        if fcntl is None:
+            yield
+            return
+        if exclusive:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            lock_file = open(_lock_path(path), "a")
+        else:
+            try:
+                lock_file = open(_lock_path(path), "r")
+            except FileNotFoundError:
+                lock_file = None
+        if lock_file is None:
+            # Nunca se escribió con bloqueo; las escrituras usan os.replace, así que el lector ve
+            # el archivo viejo o el nuevo, nunca uno a medias
+            yield
+            return
+        with lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _read(path: str, default: Any) -> Any:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+    except FileNotFoundError:
+        return default
+    return json.loads(content) if content.strip() else default
+
+
+def _write(path: str, data: Any, indent: int):
+    """Escribe a un temporal en la misma carpeta, fsync y os.replace (nunca deja el archivo a medias)"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        # Que el cambio de nombre también sobreviva a un corte de luz
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def read_json(path: str, default: Any = None) -> Any:
+    """Lee un JSON con bloqueo compartido; devuelve default si no existe o está vacío"""
+    with locked(path, exclusive=False):
+        return _read(path, default)
+
+
+def write_json(path: str, data: Any, indent: int = 2):
+    """Guarda un JSON de forma atómica y con bloqueo exclusivo"""
+    with locked(path):
+        _write(path, data, indent)
+
+
+def update_json(path: str, mutate: Callable[[Any], Any], default: Any = None, indent: int = 2) -> Any:
+    """Lee-modifica-escribe bajo un mismo bloqueo exclusivo.
+    mutate recibe los datos y puede modificarlos en sitio o devolver otros; si devuelve False no se guarda"""
+    with locked(path):
+        data = _read(path, default)
+        result = mutate(data)
+        if result is False:
+            return data
+        if result is not None and result is not True:
+            data = result
+        _write(path, data, indent)
+        return data
+
+
+def write_json_async(path: str, data: Any, indent: int = 2) -> Future:
+    """Guarda en el hilo de escritura (en orden); para cachés y manifiestos que no bloquean la interfaz"""
+    return _writer.submit(write_json, path, data, indent)
+
+
+def update_json_async(path: str, mutate: Callable[[Any], Any], default: Any = None, indent: int = 2) -> Future:
+    """update_json en el hilo de escritura: el leer-modificar-escribir ve los guardados encolados antes"""
+    return _writer.submit(update_json, path, mutate, default, indent)
+
+
+def flush_writes():
+    """Espera a que terminen los guardados en segundo plano encolados hasta ahora"""
+    _writer.submit(lambda: None).result()
@@ -0,0 +1,100 @@
+import copy
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Elementos precargados que se conservan (los menos usados se descartan)
+PREFETCH_CACHE_SIZE = 32
+# Hilos de lectura en segundo plano
+PREFETCH_WORKERS = 2
+
+
+class Prefetcher:
+    """Carga en segundo plano el contenido de un elemento al pasar el cursor o la selección
+    por encima, y lo guarda en un caché LRU acotado para que aplicarlo no toque el disco"""
+
+    def __init__(self, max_entries: int = PREFETCH_CACHE_SIZE, workers: int = PREFETCH_WORKERS):
+        self.max_entries = max_entries
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self.lock = threading.Lock()
+        self.cache: "OrderedDict[Hashable, tuple]" = OrderedDict()  # clave -> (sello, valor)
+        self.in_flight: Dict[Hashable, Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def prefetch(self, key: Hashable, loader: Callable[[], Any], stamp: Callable[[], Any] = None):
+        """Encola la carga de un elemento si no está ya en caché o cargándose"""
+        current = stamp() if stamp else None
+        with self.lock:
+            cached = self.cache.get(key)
+            if cached is not None and cached[0] == current:
+                self.cache.move_to_end(key)
+                return
+            if key in self.in_flight:
+                return
+            future = self.executor.submit(loader)
+            self.in_flight[key] = future
+        future.add_done_callback(lambda done: self._store(key, current, done))
+
+    def _store(self, key: Hashable, current: Any, future: Future):
+        with self.lock:
+            if self.in_flight.get(key) is future:
+                del self.in_flight[key]
+            if future.cancelled() or future.exception() is not None:
+                return
+            self._put(key, current, future.result())
+
+    def _put(self, key: Hashable, current: Any, value: Any):
+        if value is None:
+            return
+        self.cache[key] = (current, value)
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+
+    def get(self, key: Hashable, loader: Callable[[], Any], stamp: Callable[[], Any] = None) -> Optional[Any]:
+        """Devuelve una copia del elemento: del caché, esperando su carga en curso o cargándolo ahora"""
+        current = stamp() if stamp else None
+        with self.lock:
+            cached = self.cache.get(key)
+            if cached is not None and cached[0] == current:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(cached[1])
+            future = self.in_flight.get(key)
+
+        value = None
+        if future is not None:
+            try:
+                value = future.result()
+            except Exception:
+                value = None
+        if value is None:
+            value = loader()
+        with self.lock:
+            self.misses += 1
+            self._put(key, current, value)
+        return copy.deepcopy(value)
+
+    def invalidate(self, key: Hashable = None):
+        """Descarta un elemento (o todo el caché) tras guardarlo o eliminarlo"""
+        with self.lock:
+            if key is None:
+                self.cache.clear()
+            else:
+                self.cache.pop(key, None)
+
+    def invalidate_matching(self, predicate: Callable[[Hashable], bool]):
+        """Descarta los elementos cuya clave cumple una condición (p. ej. un personaje)"""
+        with self.lock:
+            for key in [k for k in self.cache if predicate(k)]:
+                del self.cache[key]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {"size": len(self.cache), "in_flight": len(self.in_flight),
+                    "hits": self.hits, "misses": self.misses}
@@ -1,16 +1,24 @@
-import json
 import os
 import re
 import shutil  # ← AGREGAR ESTE IMPORT
-from typing import Dict, Any
+from typing import Dict, List, Optional, Any
 from datetime import datetime  # ← AGREGAR ESTE IMPORT
 
+from .json_store import read_json, write_json
+
 class PresetsManager:
     """Gestor de presets organizados por categorías"""
     
-    def __init__(self):
+    def __init__(self, snapshot=None):
         current_dir = os.path.dirname(os.path.dirname(__file__))
         self.presets_dir = os.path.join(current_dir, "data", "presets")
+        # Con un StartupSnapshot los presets sin cambios no se vuelven a parsear al arrancar
+        self.read = snapshot.read_json if snapshot is not None else read_json
+        
+        # Cachés ligeras: listado de ids por carpeta y resumen por preset
+        self._listing_cache: Dict[str, tuple] = {}
+        self._summary_cache: Dict[tuple, tuple] = {}
+        
         self.ensure_base_directory()  # ← Cambiar nombre del método
     
     def ensure_base_directory(self):
@@ -66,8 +74,7 @@ class PresetsManager:
         
         example_data = examples.get(category, {"presets": {}})
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(example_data, f, indent=2, ensure_ascii=False)
+        write_json(file_path, example_data)
     
     def get_presets_by_category(self, category_id: str) -> Dict[str, Any]:
         """Obtiene todos los presets de una categoría"""
@@ -79,15 +86,69 @@ class PresetsManager:
                 if file_name.endswith('.json'):
                     file_path = os.path.join(category_dir, file_name)
                     try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                            presets = data.get('presets', {})
-                            all_presets.update(presets)
+                        all_presets.update(self.read(file_path, {}).get('presets', {}))
                     except Exception as e:
                         print(f"Error cargando {file_path}: {e}")
         
         return all_presets
     
+    def list_preset_ids(self, category_id: str) -> List[str]:
+        """Lista los ids de los presets de una carpeta sin leer su contenido"""
+        category_dir = os.path.join(self.presets_dir, category_id)
+        try:
+            mtime = os.stat(category_dir).st_mtime_ns
+        except OSError:
+            return []
+        
+        cached = self._listing_cache.get(category_id)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        
+        preset_ids = sorted(
+            entry.name[:-len('.json')]
+            for entry in os.scandir(category_dir)
+            if entry.is_file() and entry.name.endswith('.json')
+        )
+        self._listing_cache[category_id] = (mtime, preset_ids)
+        return preset_ids
+    
+    def get_preset_summary(self, category_id: str, preset_id: str) -> Optional[Dict[str, Any]]:
+        """Obtiene nombre y conteos de un preset (cacheado hasta que cambie el archivo)"""
+        file_path = os.path.join(self.presets_dir, category_id, f"{preset_id}.json")
+        try:
+            mtime = os.stat(file_path).st_mtime_ns
+        except OSError:
+            return None
+        
+        key = (category_id, preset_id)
+        cached = self._summary_cache.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        
+        try:
+            preset = self.read(file_path, {}).get('presets', {}).get(preset_id, {})
+            summary = {
+                "name": preset.get('name', preset_id),
+                "categories_count": len(preset.get('categories', {})),
+                "images_count": len(preset.get('images', []))
+            }
+        except Exception as e:
+            print(f"Error leyendo resumen de {file_path}: {e}")
+            return None
+        
+        self._summary_cache[key] = (mtime, summary)
+        return summary
+    
+    def invalidate_cache(self, category_id: Optional[str] = None):
+        """Descarta las cachés de una carpeta (o de todas)"""
+        if category_id is None:
+            self._listing_cache.clear()
+            self._summary_cache.clear()
+            return
+        self._listing_cache.pop(category_id, None)
+        for key in [k for k in self._summary_cache if k[0] == category_id]:
+            del self._summary_cache[key]
+    
     def save_preset(self, preset_type, preset_name, preset_data):
         """Guarda un preset con las categorías seleccionadas y las imágenes"""
         # Crear directorio si no existe
@@ -128,9 +189,9 @@ class PresetsManager:
         
         # Guardar archivo JSON
         file_path = os.path.join(category_dir, f"{safe_filename}.json")
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(preset_structure, f, indent=2, ensure_ascii=False)
+        write_json(file_path, preset_structure)
         
+        self.invalidate_cache(preset_type)
         return True
     
     def get_all_preset_folders(self):
@@ -150,6 +211,29 @@ class PresetsManager:
     
         return custom_folders
     
+    def read_folder_listings(self):
+        """(carpetas, {carpeta: ids de presets}) leyendo solo nombres de archivo"""
+        folder_info = self.get_all_preset_folders()
+        listings = {folder_id: self.list_preset_ids(folder_id) for folder_id in folder_info}
+        return folder_info, listings
+    
+    def read_preset_names(self, listings: Dict[str, List[str]]) -> Dict[str, Dict[str, str]]:
+        """{carpeta: {preset_id: nombre visible}} de los listados dados (usa el caché de resúmenes)"""
+        names = {}
+        for folder_id, preset_ids in listings.items():
+            folder_names = {}
+            for preset_id in preset_ids:
+                summary = self.get_preset_summary(folder_id, preset_id)
+                if summary:
+                    folder_names[preset_id] = summary['name']
+            names[folder_id] = folder_names
+        return names
+    
+    def read_folder_index(self):
+        """(carpetas, listados, nombres visibles) para llenar el árbol y su búsqueda en segundo plano"""
+        folder_info, listings = self.read_folder_listings()
+        return folder_info, listings, self.read_preset_names(listings)
+    
     def create_custom_folder(self, folder_name):
         """Crea una nueva carpeta personalizada de presets"""
         try:
@@ -182,22 +266,30 @@ class PresetsManager:
         sanitized = re.sub(r'_+', '_', sanitized)  # Múltiples guiones bajos a uno solo
         return sanitized.strip('_')  # Quitar guiones bajos al inicio/final
     
+    def get_preset_file(self, preset_type, preset_name):
+        """Devuelve (nombre seguro, ruta del archivo) de un preset"""
+        safe_filename = re.sub(r'[^\w\s-]', '', preset_name).strip()
+        safe_filename = re.sub(r'[-\s]+', '_', safe_filename).lower()
+        return safe_filename, os.path.join(self.presets_dir, preset_type, f"{safe_filename}.json")
+    
+    def get_preset_stamp(self, preset_type, preset_name):
+        """Fecha de modificación del archivo de un preset (None si no existe)"""
+        try:
+            return os.stat(self.get_preset_file(preset_type, preset_name)[1]).st_mtime_ns
+        except OSError:
+            return None
+    
     def load_preset(self, preset_type, preset_name):
         """Carga un preset específico"""
         # Generar nombre de archivo seguro
-        safe_filename = re.sub(r'[^\w\s-]', '', preset_name).strip()
-        safe_filename = re.sub(r'[-\s]+', '_', safe_filename).lower()
-        
-        file_path = os.path.join(self.presets_dir, preset_type, f"{safe_filename}.json")
+        safe_filename, file_path = self.get_preset_file(preset_type, preset_name)
         
         if not os.path.exists(file_path):
             return None
             
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-            preset_data = data.get('presets', {}).get(safe_filename, {})
+            # El snapshot devuelve una copia: se pueden reescribir las rutas de imágenes
+            preset_data = self.read(file_path, {}).get('presets', {}).get(safe_filename, {})
             
             # Cargar rutas completas de imágenes
             if preset_data.get('images'):
@@ -0,0 +1,196 @@
+import difflib
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# Factor de énfasis por cada nivel de () (y su inverso por cada nivel de [])
+EMPHASIS_FACTOR = 1.1
+# Diferencia mínima para considerar que un término cambió de peso
+WEIGHT_EPSILON = 1e-3
+
+_EXPLICIT_WEIGHT = re.compile(r"^(.*?):\s*([-+]?\d*\.?\d+)$")
+_LORA = re.compile(r"^<\s*(lora|lyco|hypernet)\s*:\s*([^:>]+?)\s*(?::\s*([-+]?\d*\.?\d+))?\s*>$", re.IGNORECASE)
+
+
+class PromptToken:
+    """Término de un prompt con su texto original, clave normalizada y peso efectivo"""
+
+    __slots__ = ("text", "term", "key", "weight")
+
+    def __init__(self, text: str, term: str, weight: float):
+        self.text = text
+        self.term = term
+        self.key = " ".join(term.lower().split())
+        self.weight = weight
+
+    def __repr__(self):
+        return f"PromptToken({self.term!r}, {self.weight:.2f})"
+
+
+def split_terms(text: str) -> List[str]:
+    """Divide un prompt por comas de primer nivel (respeta (), [] y <>)"""
+    terms, current, depth = [], [], 0
+    for char in text or "":
+        if char in "([<{":
+            depth += 1
+        elif char in ")]>}":
+            depth = max(0, depth - 1)
+        if char == "," and depth == 0:
+            terms.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    terms.append("".join(current))
+    return [term.strip() for term in terms if term.strip()]
+
+
+def parse_token(text: str) -> PromptToken:
+    """Interpreta énfasis (), atenuación [], pesos explícitos (term:1.2) y LoRAs <lora:x:0.8>"""
+    raw = text.strip()
+
+    lora = _LORA.match(raw)
+    if lora:
+        weight = float(lora.group(3)) if lora.group(3) else 1.0
+        return PromptToken(raw, f"<{lora.group(1).lower()}:{lora.group(2)}>", weight)
+
+    body, weight = raw, 1.0
+    while len(body) >= 2 and ((body[0] == "(" and body[-1] == ")") or (body[0] == "[" and body[-1] == "]")):
+        if body[0] == "(":
+            inner = body[1:-1].strip()
+            explicit = _EXPLICIT_WEIGHT.match(inner)
+            if explicit and "(" not in explicit.group(1):
+                weight *= float(explicit.group(2))
+                body = explicit.group(1).strip()
+                continue
+            weight *= EMPHASIS_FACTOR
+        else:
+            weight /= EMPHASIS_FACTOR
+        body = body[1:-1].strip()
+
+    # Paréntesis sueltos sin cerrar (p. ej. "((term") no cambian el término
+    term = body.strip("()[] ") or raw
+    return PromptToken(raw, term, weight)
+
+
+def parse_prompt(text: str) -> List[PromptToken]:
+    """Convierte el texto de una categoría en su lista de términos"""
+    return [parse_token(term) for term in split_terms(text)]
+
+
+def diff_tokens(original: List[PromptToken], current: List[PromptToken]) -> Dict[str, list]:
+    """Compara dos listas de términos conservando orden, pesos y duplicados"""
+    result = {"added": [], "removed": [], "reweighted": [], "reordered": []}
+
+    original_counts = Counter(token.key for token in original)
+    current_counts = Counter(token.key for token in current)
+
+    # Duplicados: cada aparición extra cuenta como agregada o eliminada
+    seen = Counter()
+    for token in current:
+        seen[token.key] += 1
+        if seen[token.key] > original_counts[token.key]:
+            result["added"].append(token.text)
+    seen = Counter()
+    for token in original:
+        seen[token.key] += 1
+        if seen[token.key] > current_counts[token.key]:
+            result["removed"].append(token.text)
+
+    # Cambios de peso entre apariciones emparejadas en orden
+    original_by_key: Dict[str, List[PromptToken]] = {}
+    for token in original:
+        original_by_key.setdefault(token.key, []).append(token)
+    used = Counter()
+    for token in current:
+        candidates = original_by_key.get(token.key)
+        if not candidates or used[token.key] >= len(candidates):
+            continue
+        before = candidates[used[token.key]]
+        used[token.key] += 1
+        if abs(before.weight - token.weight) > WEIGHT_EPSILON:
+            result["reweighted"].append((token.term, before.weight, token.weight))
+
+    # Reordenados: términos comunes que quedan fuera de la subsecuencia común más larga
+    common = original_counts & current_counts
+    original_order = _common_sequence(original, common)
+    current_order = _common_sequence(current, common)
+    if original_order != current_order:
+        matcher = difflib.SequenceMatcher(None, original_order, current_order, autojunk=False)
+        in_place = Counter()
+        for block in matcher.get_matching_blocks():
+            in_place.update(current_order[block.b:block.b + block.size])
+        moved = Counter(current_order) - in_place
+        terms = {token.key: token.term for token in current}
+        for key in current_order:
+            if moved[key] > 0:
+                moved[key] -= 1
+                result["reordered"].append(terms[key])
+
+    return result
+
+
+def _common_sequence(tokens: List[PromptToken], common: Counter) -> List[str]:
+    """Claves de los términos presentes en ambas listas, en su orden de aparición"""
+    remaining = Counter(common)
+    sequence = []
+    for token in tokens:
+        if remaining[token.key] > 0:
+            remaining[token.key] -= 1
+            sequence.append(token.key)
+    return sequence
+
+
+def has_changes(diff: Dict[str, list]) -> bool:
+    return any(diff.values())
+
+
+class PromptDiffEngine:
+    """Diff por categoría contra una base cacheada; solo recalcula las categorías marcadas"""
+
+    def __init__(self):
+        self.baseline_id: Optional[Tuple] = None
+        self.baseline: Dict[str, List[PromptToken]] = {}
+        self.current_text: Dict[str, str] = {}
+        self.results: Dict[str, Dict[str, list]] = {}
+        self.dirty = set()
+        self._parse_cache: Dict[str, List[PromptToken]] = {}
+
+    def has_baseline(self, baseline_id) -> bool:
+        """Indica si la base cacheada corresponde a este identificador (p. ej. personaje+mtime)"""
+        return self.baseline_id == baseline_id
+
+    def set_baseline(self, baseline_id, values: Dict[str, str], current_values: Dict[str, str]):
+        """Fija la base y el estado actual completo; todas las categorías quedan por recalcular"""
+        self.baseline_id = baseline_id
+        self.baseline = {key: self.parse(text) for key, text in values.items()}
+        self.current_text = dict(current_values)
+        self.results = {}
+        self.dirty = set(self.baseline) | set(self.current_text)
+
+    def update(self, values: Dict[str, str]):
+        """Registra nuevos valores actuales y marca esas categorías como sucias"""
+        for key, text in values.items():
+            if self.current_text.get(key, "") != text:
+                self.current_text[key] = text
+                self.dirty.add(key)
+
+    def parse(self, text: str) -> List[PromptToken]:
+        """Parsea un texto reutilizando resultados anteriores"""
+        tokens = self._parse_cache.get(text)
+        if tokens is None:
+            if len(self._parse_cache) > 2048:
+                self._parse_cache.clear()
+            tokens = parse_prompt(text)
+            self._parse_cache[text] = tokens
+        return tokens
+
+    def diff(self) -> Dict[str, Dict[str, list]]:
+        """Devuelve {categoría: diff} solo de las categorías con cambios"""
+        for key in self.dirty:
+            diff = diff_tokens(self.baseline.get(key, []), self.parse(self.current_text.get(key, "")))
+            if has_changes(diff):
+                self.results[key] = diff
+            else:
+                self.results.pop(key, None)
+        self.dirty.clear()
+        return dict(self.results)
@@ -1,5 +1,40 @@
+import hashlib
 import re
-from typing import Dict, List, Set
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+# Cantidad de prompts compilados que se conservan (estados usados recientemente)
+COMPILE_CACHE_SIZE = 64
+# Tokens por bloque del codificador de texto (CLIP): los prompts largos se parten en bloques de 75
+CHUNK_TOKENS = 75
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimación de tokens sin tokenizador: palabras y signos cuentan uno cada uno"""
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def entry_hash(category: str, value: str) -> int:
+    """Hash de 64 bits de una entrada categoría/valor (se combinan con XOR)"""
+    digest = hashlib.blake2b(f"{category}\0{value}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class CompiledPrompt:
+    """Resultado de compilar un estado de categorías (inmutable y cacheable)"""
+
+    __slots__ = ("prompt", "terms", "total_tokens", "term_tokens", "chunk_boundaries", "duplicates")
+
+    def __init__(self, prompt: str, terms: List[str], term_tokens: List[int],
+                 chunk_boundaries: List[int], duplicates: List[Tuple[str, str]]):
+        self.prompt = prompt
+        self.terms = terms
+        self.term_tokens = term_tokens
+        self.total_tokens = sum(term_tokens) + max(0, len(terms) - 1)  # cada coma es un token
+        self.chunk_boundaries = chunk_boundaries  # índice del término con el que empieza cada bloque
+        self.duplicates = duplicates              # [(categoría, valor descartado)]
 
 class PromptGenerator:
     """Generador de prompts en tiempo real basado en categorías activas."""
@@ -55,20 +90,31 @@ class PromptGenerator:
         # Set para detectar términos duplicados
         self.duplicate_terms: Set[str] = set()
         
+        # Hash del estado (XOR de las entradas, se actualiza por categoría) y caché LRU de compilados
+        self.state_hash = 0
+        self.compile_cache: "OrderedDict[Tuple, CompiledPrompt]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.order_index = {category: i for i, category in enumerate(self.category_order)}
+        
     def update_category(self, category_name: str, value: str):
         """Actualiza el valor de una categoría."""
+        self.clear_category(category_name)
         if value and value.strip():
-            self.active_categories[category_name] = value.strip()
-        else:
-            self.active_categories.pop(category_name, None)
+            value = value.strip()
+            self.active_categories[category_name] = value
+            self.state_hash ^= entry_hash(category_name, value)
     
     def clear_category(self, category_name: str):
         """Limpia una categoría específica."""
-        self.active_categories.pop(category_name, None)
+        old_value = self.active_categories.pop(category_name, None)
+        if old_value is not None:
+            self.state_hash ^= entry_hash(category_name, old_value)
     
     def clear_all(self):
         """Limpia todas las categorías."""
         self.active_categories.clear()
+        self.state_hash = 0
     
     def validate_input(self, text: str) -> str:
         """Valida y limpia el input del usuario."""
@@ -97,42 +143,75 @@ class PromptGenerator:
         
         return unique_parts
     
+    def state_key(self) -> Tuple:
+        """Clave del estado actual: hash incremental + orden de las categorías fuera del orden lógico"""
+        extra = tuple(category for category in self.active_categories if category not in self.order_index)
+        return (self.state_hash, extra)
+    
+    def compile(self) -> CompiledPrompt:
+        """Compila el estado actual; si el estado se usó hace poco devuelve el resultado cacheado"""
+        key = self.state_key()
+        cached = self.compile_cache.get(key)
+        if cached is not None:
+            self.compile_cache.move_to_end(key)
+            self.cache_hits += 1
+            return cached
+        
+        self.cache_misses += 1
+        compiled = self._compile()
+        self.compile_cache[key] = compiled
+        if len(self.compile_cache) > COMPILE_CACHE_SIZE:
+            self.compile_cache.popitem(last=False)
+        return compiled
+    
+    def _compile(self) -> CompiledPrompt:
+        parts: List[Tuple[str, str]] = []
+        
+        # Procesar categorías en el orden lógico y luego las que no están en él
+        order = self.order_index
+        ordered = [c for c in self.category_order if c in self.active_categories]
+        ordered += [c for c in self.active_categories if c not in order]
+        for category in ordered:
+            value = self.active_categories[category]
+            # Quitar comas al final para evitar dobles comas
+            cleaned_value = value.rstrip(', ').strip()
+            if cleaned_value:
+                parts.append((category, cleaned_value))
+        
+        # Eliminar duplicados, anotando qué se descartó
+        unique_parts = self.remove_duplicates([value for _, value in parts])
+        duplicates = []
+        if len(unique_parts) != len(parts):
+            kept = iter(unique_parts)
+            next_kept = next(kept, None)
+            for category, value in parts:
+                if value is next_kept:
+                    next_kept = next(kept, None)
+                else:
+                    duplicates.append((category, value))
+        
+        # Unir con comas y espacios de forma consistente
+        final_prompt = re.sub(r'\s+', ' ', ", ".join(unique_parts)).strip()
+        
+        terms = [term.strip() for term in final_prompt.split(",") if term.strip()]
+        term_tokens = [estimate_tokens(term) for term in terms]
+        chunk_boundaries = [0] if terms else []
+        used = 0
+        for index, tokens in enumerate(term_tokens):
+            cost = tokens + (1 if used else 0)
+            if used and used + cost > CHUNK_TOKENS:
+                chunk_boundaries.append(index)
+                used = tokens
+            else:
+                used += cost
+        
+        return CompiledPrompt(final_prompt, terms, term_tokens, chunk_boundaries, duplicates)
+    
     def generate_prompt(self) -> str:
         """Genera el prompt final combinando todas las categorías activas."""
         if not self.active_categories:
             return ""
-        
-        prompt_parts = []
-        
-        # Procesar categorías en el orden lógico
-        for category in self.category_order:
-            if category in self.active_categories:
-                value = self.active_categories[category]
-                if value:
-                    # Quitar comas al final para evitar dobles comas
-                    cleaned_value = value.rstrip(', ').strip()
-                    if cleaned_value:
-                        prompt_parts.append(cleaned_value)
-        
-        # Agregar categorías que no están en el orden predefinido
-        for category, value in self.active_categories.items():
-            if category not in self.category_order and value:
-                # Quitar comas al final para evitar dobles comas
-                cleaned_value = value.rstrip(', ').strip()
-                if cleaned_value:
-                    prompt_parts.append(cleaned_value)
-        
-        # Eliminar duplicados
-        unique_parts = self.remove_duplicates(prompt_parts)
-        
-        # Unir con comas y espacios de forma consistente
-        final_prompt = ", ".join(unique_parts)
-        
-        # Limpiar espacios extra
-        final_prompt = re.sub(r'\s+', ' ', final_prompt)
-        final_prompt = final_prompt.strip()
-        
-        return final_prompt
+        return self.compile().prompt
     
     def get_category_value(self, category_name: str) -> str:
         """Obtiene el valor actual de una categoría."""
@@ -144,12 +223,17 @@ class PromptGenerator:
     
     def get_prompt_statistics(self) -> Dict[str, int]:
         """Obtiene estadísticas del prompt generado."""
-        prompt = self.generate_prompt()
-        if not prompt:
-            return {"total_terms": 0, "total_characters": 0}
+        compiled = self.compile()
+        if not compiled.prompt:
+            return {"total_terms": 0, "total_characters": 0, "estimated_tokens": 0, "chunks": 0}
         
-        terms = [term.strip() for term in prompt.split(",")]
         return {
-            "total_terms": len(terms),
-            "total_characters": len(prompt)
-        }
\ No newline at end of file
+            "total_terms": len(compiled.terms),
+            "total_characters": len(compiled.prompt),
+            "estimated_tokens": compiled.total_tokens,
+            "chunks": len(compiled.chunk_boundaries)
+        }
+    
+    def get_cache_stats(self) -> Dict[str, int]:
+        """Aciertos y fallos del caché de prompts compilados"""
+        return {"size": len(self.compile_cache), "hits": self.cache_hits, "misses": self.cache_misses}
@@ -0,0 +1,125 @@
+import json
+import os
+import queue
+import threading
+from typing import Dict, Optional
+
+# Deltas escritos antes de compactar el diario en un único snapshot
+COMPACT_EVERY = 500
+# Tamaño del diario (bytes) que también dispara la compactación
+COMPACT_SIZE = 256 * 1024
+
+_STOP = object()
+
+
+class SessionJournal:
+    """Diario de sesión a prueba de cierres inesperados: añade solo los deltas de categorías
+    desde un hilo de escritura y compacta periódicamente en un snapshot"""
+
+    def __init__(self, path: str = None):
+        if path is None:
+            current_dir = os.path.dirname(os.path.dirname(__file__))
+            path = os.path.join(current_dir, "data", "cache", "session_journal.jsonl")
+        self.path = path
+        self.queue: "queue.Queue" = queue.Queue()
+        self.thread: Optional[threading.Thread] = None
+        # Estado que refleja el diario; solo lo toca el hilo de escritura
+        self.state: Dict[str, str] = {}
+        self.deltas_since_compact = 0
+        self.file = None
+
+    def load(self) -> Dict[str, str]:
+        """Reconstruye el último estado guardado; ignora una última línea cortada por un cierre"""
+        state: Dict[str, str] = {}
+        if not os.path.exists(self.path):
+            return state
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if entry.get("type") == "snapshot":
+                        state = dict(entry.get("values", {}))
+                    else:
+                        state.update(entry.get("values", {}))
+        except OSError as e:
+            print(f"Error leyendo el diario de sesión: {e}")
+        return {key: value for key, value in state.items() if value}
+
+    def start(self, values: Dict[str, str] = None):
+        """Arranca el hilo de escritura partiendo de un estado (normalmente el restaurado)"""
+        if self.thread is not None:
+            return
+        self.state = {key: value for key, value in (values or {}).items() if value}
+        self.thread = threading.Thread(target=self._run, name="session-journal", daemon=True)
+        self.thread.start()
+
+    def append(self, values: Dict[str, str]):
+        """Encola un delta {clave_snake_case: valor}; no bloquea la interfaz"""
+        if values and self.thread is not None:
+            self.queue.put(dict(values))
+
+    def close(self):
+        """Escribe lo pendiente, compacta y detiene el hilo"""
+        if self.thread is None:
+            return
+        self.queue.put(_STOP)
+        self.thread.join()
+        self.thread = None
+
+    def _run(self):
+        try:
+            self._compact()
+            while True:
+                item = self.queue.get()
+                batch = [item]
+                # Agrupar todo lo encolado en una sola escritura + fsync
+                while item is not _STOP:
+                    try:
+                        item = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    batch.append(item)
+
+                stop = batch[-1] is _STOP
+                deltas = [delta for delta in batch if delta is not _STOP]
+                if deltas:
+                    self._write_deltas(deltas)
+                if stop:
+                    self._compact()
+                    break
+                if self.deltas_since_compact >= COMPACT_EVERY or self.file.tell() >= COMPACT_SIZE:
+                    self._compact()
+        except Exception as e:
+            print(f"Error en el diario de sesión: {e}")
+        finally:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def _write_deltas(self, deltas):
+        lines = []
+        for delta in deltas:
+            self.state.update(delta)
+            lines.append(json.dumps({"type": "delta", "values": delta}, ensure_ascii=False) + "\n")
+        self.file.write("".join(lines))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.deltas_since_compact += len(deltas)
+
+    def _compact(self):
+        """Reemplaza el diario por un único snapshot del estado (escritura atómica)"""
+        if self.file is not None:
+            self.file.close()
+        self.state = {key: value for key, value in self.state.items() if value}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"type": "snapshot", "values": self.state}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self.file = open(self.path, 'a', encoding='utf-8')
+        self.deltas_since_compact = 0
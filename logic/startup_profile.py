@@ -0,0 +1,55 @@
+import importlib
+import sys
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+# Mediciones menores a esto no aparecen en el reporte
+REPORT_MIN_MS = 0.5
+
+# Referencia de tiempo: el primer import de este módulo (main.py lo importa antes que nada)
+_started_at = time.perf_counter()
+_records: List[Tuple[str, str, float, float]] = []  # (tipo, nombre, ms, desde el inicio ms)
+
+
+def record(kind: str, name: str, elapsed_ms: float):
+    """Registra una medición ("import" o "construcción")"""
+    _records.append((kind, name, elapsed_ms, (time.perf_counter() - _started_at) * 1000))
+
+
+@contextmanager
+def measure(kind: str, name: str):
+    """Mide el bloque y lo registra en el reporte de arranque"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(kind, name, (time.perf_counter() - started) * 1000)
+
+
+def timed_import(module_name: str):
+    """Importa un módulo diferido (PIL, paneles secundarios) registrando cuánto tardó la primera vez"""
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    with measure("import", module_name):
+        return importlib.import_module(module_name)
+
+
+def get_records() -> List[Tuple[str, str, float, float]]:
+    return list(_records)
+
+
+def format_record(entry: Tuple[str, str, float, float]) -> str:
+    kind, name, elapsed_ms, at_ms = entry
+    return f"  {kind:<13} {name:<40} {elapsed_ms:8.1f} | {at_ms:8.1f}"
+
+
+def format_report() -> str:
+    """Reporte de imports y construcciones en orden cronológico"""
+    lines = ["Reporte de arranque (ms | desde el inicio ms):"]
+    lines.extend(format_record(entry) for entry in _records if entry[2] >= REPORT_MIN_MS)
+    return "\n".join(lines)
+
+
+def print_report():
+    print(format_report())
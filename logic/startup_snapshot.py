@@ -0,0 +1,101 @@
+import os
+import pickle
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+from .json_store import read_json
+
+# Versión del formato del snapshot (cambiarla descarta los snapshots anteriores)
+SNAPSHOT_VERSION = 1
+
+
+class StartupSnapshot:
+    """Snapshot binario de los JSON ya parseados de la biblioteca (categorías, shards de tags,
+    personajes), validado por archivo con su mtime y tamaño. En un arranque en caliente se carga
+    con una sola lectura y solo se vuelven a parsear los archivos que cambiaron"""
+
+    def __init__(self, path: str = None):
+        if path is None:
+            current_dir = os.path.dirname(os.path.dirname(__file__))
+            path = os.path.join(current_dir, "data", "cache", "startup_snapshot.pickle")
+        self.path = path
+        self.lock = threading.Lock()
+        # ruta absoluta -> (mtime_ns, tamaño, datos serializados con pickle)
+        self.entries: Dict[str, tuple] = {}
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        """Carga el snapshot; si falta, está corrupto o es de otra versión se empieza vacío"""
+        try:
+            with open(self.path, 'rb') as f:
+                data = pickle.load(f)
+            if data.get("version") == SNAPSHOT_VERSION:
+                self.entries = data.get("entries", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Snapshot de arranque descartado: {e}")
+            self.entries = {}
+
+    def save(self) -> bool:
+        """Guarda el snapshot si cambió (sin fsync: es un caché y se regenera si se pierde)"""
+        with self.lock:
+            if not self.dirty:
+                return False
+            entries = {path: entry for path, entry in self.entries.items() if os.path.exists(path)}
+            self.dirty = False
+        try:
+            directory = os.path.dirname(self.path)
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=".startup_snapshot.", suffix=".tmp", dir=directory)
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump({"version": SNAPSHOT_VERSION, "entries": entries}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.path)
+            return True
+        except Exception as e:
+            print(f"Error guardando snapshot de arranque: {e}")
+            return False
+
+    def read_json(self, path: str, default: Any = None) -> Any:
+        """read_json con el snapshot delante: si mtime y tamaño coinciden no se parsea el archivo.
+        Cada llamada devuelve una copia independiente"""
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return default
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[:2] == stamp:
+                self.hits += 1
+                return pickle.loads(entry[2])
+
+        data = read_json(path, default)
+        with self.lock:
+            self.misses += 1
+            self.entries[path] = stamp + (pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL),)
+            self.dirty = True
+        return data
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+_snapshot: Optional[StartupSnapshot] = None
+_snapshot_guard = threading.Lock()
+
+
+def get_startup_snapshot() -> StartupSnapshot:
+    """Snapshot compartido por los cargadores de la biblioteca"""
+    global _snapshot
+    with _snapshot_guard:
+        if _snapshot is None:
+            _snapshot = StartupSnapshot()
+        return _snapshot
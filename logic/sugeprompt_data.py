@@ -0,0 +1,45 @@
+import os
+
+from .startup_snapshot import get_startup_snapshot
+
+
+def read_sugeprompt_data():
+    """Lee (categorías, opciones) de data/sugeprompt a través del snapshot de arranque.
+    Solo disco: el StartupLoader la ejecuta en segundo plano para que abrir el diálogo no parsee nada"""
+    snapshot = get_startup_snapshot()
+    categories_data = {}
+    options_data = {}
+    try:
+        # Cargar categorías principales
+        categories_path = os.path.join("data", "sugeprompt", "prompt_categories.json")
+        categories_data = snapshot.read_json(categories_path, {})
+        
+        # Cargar opciones desde archivos individuales de categorías
+        categories_dir = os.path.join("data", "sugeprompt", "categories")
+        if os.path.exists(categories_dir):
+            for filename in sorted(os.listdir(categories_dir)):
+                if filename.endswith('.json'):
+                    category_file_path = os.path.join(categories_dir, filename)
+                    try:
+                        category_data = snapshot.read_json(category_file_path, {})
+                        # Agregar las opciones de esta categoría al diccionario global
+                        if 'options' in category_data:
+                            options_data.update(category_data['options'])
+                    except Exception as e:
+                        print(f"Error cargando archivo de categoría {filename}: {e}")
+        
+        # Fallback: cargar desde prompt_options.json si existe
+        options_path = os.path.join("data", "sugeprompt", "prompt_options.json")
+        if os.path.exists(options_path):
+            try:
+                fallback_options = snapshot.read_json(options_path, {})
+                # Agregar opciones que no estén ya cargadas
+                for key, value in fallback_options.items():
+                    if key not in options_data:
+                        options_data[key] = value
+            except Exception as e:
+                print(f"Error cargando opciones de fallback: {e}")
+                
+    except Exception as e:
+        print(f"Error cargando datos principales: {e}")
+    return categories_data, options_data
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from .json_store import locked, read_json, update_json, write_json
+
+# Versión del formato del manifiesto de shards
+TAG_STORE_VERSION = 1
+# Nombre del manifiesto dentro de la carpeta de shards
+MANIFEST_NAME = "manifest.json"
+
+
+class TagStore:
+    """Tags repartidos en un archivo por categoría (data/tags/<clave>.json) más un manifiesto.
+    Editar una categoría reescribe solo su shard; leer solo abre los shards que se piden"""
+
+    def __init__(self, tags_dir: str = None, legacy_file: str = None, snapshot=None):
+        current_dir = os.path.dirname(os.path.dirname(__file__))
+        self.tags_dir = tags_dir or os.path.join(current_dir, "data", "tags")
+        self.legacy_file = legacy_file or os.path.join(current_dir, "data", "tags.json")
+        self.manifest_file = os.path.join(self.tags_dir, MANIFEST_NAME)
+        # Con un StartupSnapshot los shards sin cambios no se vuelven a parsear al arrancar
+        self.read = snapshot.read_json if snapshot is not None else read_json
+        self.lock = threading.Lock()
+        # clave -> (mtime del shard, tags) para no releer shards sin cambios
+        self.cache: Dict[str, tuple] = {}
+
+    # ------------------------------------------------------------------
+    # Migración y manifiesto
+    # ------------------------------------------------------------------
+    def migrate(self) -> List[str]:
+        """Importa tags.json a los shards: la primera vez entero y después solo las categorías cuyo
+        contenido cambió en él (un script que lo edita con la app abierta). tags.json no se modifica
+        y lo editado en la app vive en los shards. Devuelve las claves importadas"""
+        stamp = self._legacy_stamp()
+        if stamp is None or self.read(self.manifest_file, {}).get("source", {}).get("stamp") == stamp:
+            return []
+        # Bloqueo exclusivo durante toda la importación: otro hilo o proceso que llegue a la vez
+        # espera aquí y, al entrar, ya encuentra el manifiesto al día
+        with locked(self.legacy_file):
+            stamp = self._legacy_stamp()
+            try:
+                # Lectura directa: read_json pediría un bloqueo compartido sobre el que ya tenemos
+                with open(self.legacy_file, "r", encoding="utf-8") as f:
+                    content = f.read()
+            except FileNotFoundError:
+                return []
+            legacy = json.loads(content) if content.strip() else {}
+            digests = {key: self._digest(tags) for key, tags in legacy.items()}
+            imported = []
+
+            def apply(manifest):
+                source = manifest.get("source")
+                if source and source.get("stamp") == stamp:
+                    return False
+                if manifest and source is None:
+                    # Manifiesto anterior al registro del origen: tags.json ya está importado
+                    known = digests
+                else:
+                    known = (source or {}).get("digests", {})
+                categories = manifest.setdefault("categories", {})
+                for key, tags in legacy.items():
+                    if known.get(key) == digests[key]:
+                        continue
+                    file_name = self.file_name(key)
+                    write_json(os.path.join(self.tags_dir, file_name), list(tags))
+                    categories[key] = {"file": file_name, "count": len(tags)}
+                    imported.append(key)
+                manifest["version"] = TAG_STORE_VERSION
+                # El origen se registra al final: si la importación se corta, se repite
+                manifest["source"] = {"file": os.path.basename(self.legacy_file), "stamp": stamp,
+                                      "digests": digests}
+
+            update_json(self.manifest_file, apply, default={})
+        if imported:
+            print(f"Tags de {len(imported)} categorías importados de tags.json a {self.tags_dir}")
+        return imported
+
+    def _legacy_stamp(self) -> Optional[List[int]]:
+        try:
+            stat = os.stat(self.legacy_file)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def _digest(self, tags: List[str]) -> str:
+        """Huella del contenido de una categoría de tags.json (para importar solo las que cambian)"""
+        return hashlib.sha1(json.dumps(list(tags), ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    def file_name(self, key: str) -> str:
+        """Nombre de archivo seguro para la clave de una categoría"""
+        return re.sub(r"[^\w\-]", "_", key) + ".json"
+
+    def load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """{clave: {file, count}} de todas las categorías con tags"""
+        return self.read(self.manifest_file, {}).get("categories", {})
+
+    def keys(self) -> List[str]:
+        return list(self.load_manifest())
+
+    def shard_path(self, key: str, manifest: Dict[str, Dict[str, Any]] = None) -> str:
+        entry = (manifest if manifest is not None else self.load_manifest()).get(key)
+        return os.path.join(self.tags_dir, entry["file"] if entry else self.file_name(key))
+
+    def _set_manifest_entry(self, key: str, tags: Optional[List[str]]):
+        def apply(manifest):
+            categories = manifest.setdefault("categories", {})
+            manifest["version"] = TAG_STORE_VERSION
+            if tags is None:
+                categories.pop(key, None)
+            else:
+                categories[key] = {"file": self.file_name(key), "count": len(tags)}
+        update_json(self.manifest_file, apply, default={})
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+    def _stamp(self, path: str):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def get_tags(self, key: str, path: str = None) -> List[str]:
+        """Tags de una categoría; solo relee el shard si cambió su fecha de modificación"""
+        path = path or self.shard_path(key)
+        stamp = self._stamp(path)
+        with self.lock:
+            cached = self.cache.get(key)
+            if cached is not None and cached[0] == stamp:
+                return list(cached[1])
+        tags = list(self.read(path, [])) if stamp is not None else []
+        with self.lock:
+            self.cache[key] = (stamp, tags)
+        return list(tags)
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[str]]:
+        """Tags de varias categorías leyendo el manifiesto una sola vez"""
+        manifest = self.load_manifest()
+        return {key: self.get_tags(key, self.shard_path(key, manifest)) for key in keys}
+
+    def get_all(self) -> Dict[str, List[str]]:
+        return self.get_many(self.keys())
+
+    def changed_keys(self, keys: List[str]) -> List[str]:
+        """Claves (de las ya leídas) cuyo shard cambió en disco desde la última lectura"""
+        manifest = self.load_manifest()
+        with self.lock:
+            cached = {key: self.cache[key][0] for key in keys if key in self.cache}
+        return [key for key, stamp in cached.items()
+                if self._stamp(self.shard_path(key, manifest)) != stamp]
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+    def set_tags(self, key: str, tags: List[str]):
+        """Reemplaza los tags de una categoría (solo se reescribe su shard)"""
+        self.update_tags(key, lambda current: list(tags))
+
+    def update_tags(self, key: str, mutate: Callable[[List[str]], Any]) -> List[str]:
+        """Lee-modifica-escribe el shard de una categoría (misma convención que update_json)"""
+        path = os.path.join(self.tags_dir, self.file_name(key))
+        known = os.path.exists(path)
+        tags = update_json(path, mutate, default=[])
+        with self.lock:
+            self.cache[key] = (self._stamp(path), list(tags))
+        if not os.path.exists(path):
+            return list(tags)
+        if not known or self.load_manifest().get(key, {}).get("count") != len(tags):
+            self._set_manifest_entry(key, tags)
+        return list(tags)
+
+    def rename(self, old_key: str, new_key: str):
+        """Renombra el shard de una categoría"""
+        old_path = self.shard_path(old_key)
+        if old_key == new_key or not os.path.exists(old_path):
+            return
+        tags = self.get_tags(old_key, old_path)
+        write_json(os.path.join(self.tags_dir, self.file_name(new_key)), tags)
+        os.remove(old_path)
+        with self.lock:
+            self.cache.pop(old_key, None)
+        self._set_manifest_entry(old_key, None)
+        self._set_manifest_entry(new_key, tags)
@@ -0,0 +1,196 @@
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+# Nodo del grafo: (carpeta del personaje, nombre de variación); None = personaje base
+Node = Tuple[str, Optional[str]]
+
+
+class VariationCycleError(ValueError):
+    """Cadena de herencia que vuelve sobre sí misma (A → B → A)"""
+
+    def __init__(self, chain: List[str]):
+        self.chain = chain
+        super().__init__("Ciclo de herencia: " + " → ".join(chain))
+
+
+class VariationResolver:
+    """Resuelve variación → variación padre → personaje base, cacheando el resultado aplanado
+    e invalidando solo el nodo que cambió y sus descendientes en el grafo de dependencias"""
+
+    def __init__(self, get_base_file: Callable[[str], str], get_variations_file: Callable[[str], str],
+                 load_variations: Callable[[str], dict]):
+        self.get_base_file = get_base_file
+        self.get_variations_file = get_variations_file
+        self.load_variations = load_variations
+
+        self.stamps: Dict[str, Tuple[Optional[int], Optional[int]]] = {}  # carpeta -> (mtime variaciones, mtime base)
+        self.base: Dict[str, Dict[str, str]] = {}
+        self.variations: Dict[str, Dict[str, dict]] = {}
+        self.fingerprints: Dict[str, Dict[str, str]] = {}
+        self.parents: Dict[Node, Node] = {}
+        self.children: Dict[Node, Set[Node]] = {}
+        self.cache: Dict[Node, Dict[str, str]] = {}
+        # Las variaciones también se resuelven desde hilos de precarga
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def folder(character_name: str) -> str:
+        return character_name.lower().replace(' ', '_')
+
+    @staticmethod
+    def _mtime(path: str) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def sync(self, character_name: str):
+        """Compara los mtime de los archivos del personaje e invalida solo lo que cambió"""
+        with self.lock:
+            folder = self.folder(character_name)
+            stamp = (self._mtime(self.get_variations_file(character_name)),
+                     self._mtime(self.get_base_file(character_name)))
+            previous = self.stamps.get(folder)
+            if previous == stamp:
+                return
+
+            if previous is None or previous[1] != stamp[1]:
+                self.base[folder] = self.read_base_categories(character_name)
+                self.invalidate((folder, None))
+            if previous is None or previous[0] != stamp[0]:
+                data = self.load_variations(character_name)
+                self.set_variations(folder, data.get("variations", {}))
+            self.stamps[folder] = stamp
+
+    def read_base_categories(self, character_name: str) -> Dict[str, str]:
+        """Categorías del personaje base con los nombres visibles que usan las variaciones"""
+        character_file = self.get_base_file(character_name)
+        if not os.path.exists(character_file):
+            return {}
+        try:
+            with open(character_file, 'r', encoding='utf-8') as f:
+                raw = json.load(f).get("categories", {})
+            # El personaje usa claves snake_case; las variaciones, el nombre visible
+            return {
+                key.replace("_", " ").capitalize(): value
+                for key, value in raw.items() if isinstance(value, str)
+            }
+        except Exception as e:
+            print(f"Error cargando personaje base {character_name}: {e}")
+            return {}
+
+    def set_variations(self, folder: str, variations: Dict[str, dict]):
+        """Reemplaza las variaciones de un personaje e invalida las que cambiaron de contenido"""
+        old_prints = self.fingerprints.get(folder, {})
+        new_prints = {
+            name: json.dumps(variation, sort_keys=True, ensure_ascii=False)
+            for name, variation in variations.items()
+        }
+        changed = [name for name in set(old_prints) | set(new_prints)
+                   if old_prints.get(name) != new_prints.get(name)]
+
+        # Invalidar con las aristas viejas y con las nuevas (el padre puede haber cambiado)
+        for name in changed:
+            self.invalidate((folder, name))
+        self.variations[folder] = variations
+        self.fingerprints[folder] = new_prints
+        self.rebuild_edges(folder)
+        for name in changed:
+            self.invalidate((folder, name))
+
+    def rebuild_edges(self, folder: str):
+        """Reconstruye las aristas hijo → padre de un personaje"""
+        for node in [n for n in self.parents if n[0] == folder]:
+            self.children.get(self.parents.pop(node), set()).discard(node)
+
+        variations = self.variations.get(folder, {})
+        for name, variation in variations.items():
+            parent_name = variation.get("inherit_from")
+            if not parent_name or parent_name not in variations or parent_name == name:
+                parent_name = None
+            node, parent = (folder, name), (folder, parent_name)
+            self.parents[node] = parent
+            self.children.setdefault(parent, set()).add(node)
+
+    def invalidate(self, node: Node):
+        """Descarta del caché un nodo y todos los que heredan de él"""
+        stack, seen = [node], set()
+        while stack:
+            current = stack.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            self.cache.pop(current, None)
+            stack.extend(self.children.get(current, ()))
+
+    def find_cycle(self, character_name: str, variation_name: str, parent_name: Optional[str]) -> Optional[List[str]]:
+        """Devuelve la cadena del ciclo que se formaría si variation_name heredara de parent_name"""
+        with self.lock:
+            self.sync(character_name)
+            variations = self.variations.get(self.folder(character_name), {})
+            chain = [variation_name]
+            current = parent_name
+            while current:
+                chain.append(current)
+                if current == variation_name:
+                    return chain
+                if current not in variations or len(chain) > len(variations) + 1:
+                    return None
+                current = variations[current].get("inherit_from")
+            return None
+
+    def get_base(self, character_name: str) -> Dict[str, str]:
+        with self.lock:
+            self.sync(character_name)
+            return self.base.get(self.folder(character_name), {})
+
+    def resolve(self, character_name: str, variation_name: str) -> Dict[str, str]:
+        """Categorías completas de una variación; un acierto de caché no recorre la cadena"""
+        with self.lock:
+            self.sync(character_name)
+            folder = self.folder(character_name)
+            cached = self.cache.get((folder, variation_name))
+            if cached is not None:
+                return dict(cached)
+            if variation_name not in self.variations.get(folder, {}):
+                return {}
+            return dict(self._resolve(folder, variation_name, []))
+
+    def _resolve(self, folder: str, variation_name: str, visiting: List[str]) -> Dict[str, str]:
+        node = (folder, variation_name)
+        cached = self.cache.get(node)
+        if cached is not None:
+            return cached
+
+        variation = self.variations[folder][variation_name]
+        if variation.get("storage") != "delta":
+            # Las variaciones completas ya contienen todas sus categorías
+            resolved = dict(variation.get("categories", {}))
+        else:
+            parent = self.parents.get(node, (folder, None))[1]
+            if parent in visiting or parent == variation_name:
+                print(f"Advertencia: {VariationCycleError(visiting + [variation_name, parent])}; se usa el personaje base")
+                parent = None
+            if parent:
+                base = self._resolve(folder, parent, visiting + [variation_name])
+            else:
+                base = self.base.get(folder, {})
+            resolved = dict(base)
+            for name in variation.get("removed_categories", []):
+                resolved.pop(name, None)
+            resolved.update(variation.get("categories", {}))
+
+        self.cache[node] = resolved
+        return resolved
+
+    def notify_saved(self, character_name: str, data: dict):
+        """Actualiza el grafo con lo que se acaba de guardar, sin releer el archivo"""
+        with self.lock:
+            folder = self.folder(character_name)
+            previous = self.stamps.get(folder)
+            if previous is None:
+                return
+            self.set_variations(folder, data.get("variations", {}))
+            self.stamps[folder] = (self._mtime(self.get_variations_file(character_name)), previous[1])
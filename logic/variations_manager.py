@@ -1,7 +1,10 @@
 import json
 import os
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+
+from .json_store import read_json, update_json, update_json_async, write_json, write_json_async
+from .variation_resolver import VariationResolver, VariationCycleError
 
 class VariationsManager:
     """Gestor de variaciones de prompts para personajes"""
@@ -10,6 +13,28 @@ class VariationsManager:
         # Ya no necesitamos un archivo global de variaciones
         current_dir = os.path.dirname(os.path.dirname(__file__))
         self.characters_dir = os.path.join(current_dir, "data", "characters")
+        # Manifiesto con los personajes que tienen variaciones (evita leer cada archivo al iniciar)
+        self.manifest_file = os.path.join(current_dir, "data", "cache", "variations_manifest.json")
+        # Modo delta: las variaciones guardan solo las categorías que difieren de su base
+        self.delta_mode = True
+        # Herencia variación → padre → base, con caché aplanado e invalidación por dependencias
+        self.resolver = VariationResolver(self.get_character_file, self.get_character_variations_file,
+                                          self.load_character_variations_data)
+    
+    def get_character_file(self, character_name: str) -> str:
+        """Obtiene la ruta del archivo base de un personaje"""
+        folder = character_name.lower().replace(' ', '_')
+        return os.path.join(self.characters_dir, folder, f"{folder}.json")
+    
+    def get_variation_stamp(self, character_name: str) -> Tuple[Optional[int], Optional[int]]:
+        """(mtime de variaciones, mtime del personaje base): cambia si cambia cualquier variación resuelta"""
+        stamps = []
+        for path in (self.get_character_variations_file(character_name), self.get_character_file(character_name)):
+            try:
+                stamps.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                stamps.append(None)
+        return tuple(stamps)
     
     def get_character_variations_file(self, character_name: str) -> str:
         """Obtiene la ruta del archivo de variaciones para un personaje específico"""
@@ -32,22 +57,16 @@ class VariationsManager:
                 }
             }
             
-            # Asegurar que la carpeta del personaje existe
-            os.makedirs(os.path.dirname(variations_file), exist_ok=True)
-            
-            with open(variations_file, 'w', encoding='utf-8') as f:
-                json.dump(initial_data, f, indent=2, ensure_ascii=False)
+            write_json(variations_file, initial_data)
     
     def load_character_variations_data(self, character_name: str) -> Dict[str, Any]:
         """Carga los datos de variaciones de un personaje específico"""
         variations_file = self.get_character_variations_file(character_name)
         
         try:
-            if os.path.exists(variations_file):
-                with open(variations_file, 'r', encoding='utf-8') as f:
-                    content = f.read().strip()
-                    if content:
-                        return json.loads(content)
+            data = read_json(variations_file)
+            if data:
+                return data
             
             # Si no existe el archivo, crear estructura inicial
             self.ensure_character_variations_file(character_name)
@@ -80,11 +99,89 @@ class VariationsManager:
         # Actualizar metadata
         data["metadata"]["last_modified"] = datetime.now().isoformat()
         
-        # Asegurar que la carpeta existe
-        os.makedirs(os.path.dirname(variations_file), exist_ok=True)
+        write_json(variations_file, data)
         
-        with open(variations_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        self.update_manifest_entry(character_name, data)
+        self.resolver.notify_saved(character_name, data)
+    
+    def load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Carga el manifiesto de variaciones desde disco"""
+        try:
+            return read_json(self.manifest_file, {}).get("characters", {})
+        except Exception as e:
+            print(f"Error cargando manifiesto de variaciones: {e}")
+        return {}
+    
+    def save_manifest(self, manifest: Dict[str, Dict[str, Any]]):
+        """Guarda el manifiesto de variaciones en el hilo de escritura (es un caché, no bloquea la interfaz)"""
+        future = write_json_async(self.manifest_file, {"characters": dict(manifest)})
+        future.add_done_callback(self._report_manifest_error)
+    
+    def _report_manifest_error(self, future):
+        if future.exception() is not None:
+            print(f"Error guardando manifiesto de variaciones: {future.exception()}")
+    
+    def _manifest_entry(self, character_name: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Construye la entrada del manifiesto para un archivo de variaciones"""
+        variations_file = self.get_character_variations_file(character_name)
+        return {
+            "character_name": data.get("character_name", character_name),
+            "count": len(data.get("variations", {})),
+            "mtime": os.stat(variations_file).st_mtime_ns
+        }
+    
+    def update_manifest_entry(self, character_name: str, data: Dict[str, Any]):
+        """Actualiza la entrada de un personaje en el manifiesto tras guardar"""
+        try:
+            folder = character_name.lower().replace(' ', '_')
+            entry = self._manifest_entry(character_name, data)
+            
+            def set_entry(manifest):
+                manifest.setdefault("characters", {})[folder] = entry
+            
+            # Leer-modificar-escribir en el hilo de escritura (después de los guardados ya encolados)
+            future = update_json_async(self.manifest_file, set_entry, default={})
+            future.add_done_callback(self._report_manifest_error)
+        except Exception as e:
+            print(f"Error actualizando manifiesto de variaciones: {e}")
+    
+    def get_variations_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Obtiene {carpeta: {character_name, count, mtime}} releyendo solo los archivos modificados"""
+        manifest = self.load_manifest()
+        changed = False
+        seen = set()
+        
+        try:
+            if os.path.exists(self.characters_dir):
+                for entry in os.scandir(self.characters_dir):
+                    if not entry.is_dir():
+                        continue
+                    variations_file = self.get_character_variations_file(entry.name)
+                    try:
+                        mtime = os.stat(variations_file).st_mtime_ns
+                    except OSError:
+                        continue
+                    seen.add(entry.name)
+                    cached = manifest.get(entry.name)
+                    if cached and cached.get("mtime") == mtime:
+                        continue
+                    data = self.load_character_variations_data(entry.name)
+                    manifest[entry.name] = self._manifest_entry(entry.name, data)
+                    changed = True
+        except Exception as e:
+            print(f"Error actualizando manifiesto de variaciones: {e}")
+        
+        for folder in [f for f in manifest if f not in seen]:
+            del manifest[folder]
+            changed = True
+        
+        if changed:
+            self.save_manifest(manifest)
+        return manifest
+    
+    def get_variation_names(self, character_name: str) -> List[str]:
+        """Obtiene solo los nombres de las variaciones de un personaje"""
+        return list(self.load_character_variations_data(character_name).get("variations", {}).keys())
     
     def get_character_variations(self, character_name: str) -> Dict[str, Any]:
         """Obtiene todas las variaciones de un personaje en el formato esperado por el panel"""
@@ -94,9 +191,35 @@ class VariationsManager:
             "metadata": data.get("metadata", {})
         }
     
+    def load_base_categories(self, character_name: str) -> Dict[str, str]:
+        """Categorías del personaje base con los nombres que usan las variaciones (cacheadas por mtime)"""
+        return dict(self.resolver.get_base(character_name))
+    
+    def encode_delta(self, categories: Dict[str, str], base: Dict[str, str]) -> Tuple[Dict[str, str], List[str]]:
+        """Devuelve (categorías que difieren de la base, categorías de la base que no están)"""
+        # Un "" explícito no equivale a una categoría ausente: al aplicar la variación debe limpiar la tarjeta
+        delta = {name: value for name, value in categories.items() if name not in base or base[name] != value}
+        removed = [name for name in base if name not in categories]
+        return delta, removed
+    
+    def resolve_variation_categories(self, character_name: str, variation_name: str) -> Dict[str, str]:
+        """Categorías completas de una variación, siguiendo su cadena de herencia"""
+        return self.resolver.resolve(character_name, variation_name)
+    
+    def get_inheritance_chain(self, character_name: str, variation_name: str) -> List[str]:
+        """Nombres desde la variación hasta su ancestro más lejano (sin el personaje base)"""
+        self.resolver.sync(character_name)
+        folder = self.resolver.folder(character_name)
+        chain = []
+        node = (folder, variation_name)
+        while node[1] is not None and node[1] not in chain:
+            chain.append(node[1])
+            node = self.resolver.parents.get(node, (folder, None))
+        return chain
+    
     def get_character_base_config(self, character_name: str) -> Dict[str, Any]:
-        """Obtiene la configuración base de un personaje (no implementado en esta versión)"""
-        return {}
+        """Obtiene la configuración base de un personaje ({categoría: valor})"""
+        return self.load_base_categories(character_name)
     
     def save_variation(self, character_name: str, variation_name: str, 
                       categories: Dict[str, str], description: str = "",
@@ -107,6 +230,20 @@ class VariationsManager:
         try:
             data = self.load_character_variations_data(character_name)
             
+            if inherit_from:
+                cycle = self.resolver.find_cycle(character_name, variation_name, inherit_from)
+                if cycle:
+                    raise VariationCycleError(cycle)
+            
+            removed = []
+            if self.delta_mode:
+                # Guardar solo lo que difiere del padre (inherit_from) o del personaje base
+                if inherit_from and inherit_from in data["variations"]:
+                    base = self.resolve_variation_categories(character_name, inherit_from)
+                else:
+                    base = self.load_base_categories(character_name)
+                categories, removed = self.encode_delta(categories, base)
+            
             # Crear la variación
             variation_data = {
                 "name": variation_name,
@@ -121,6 +258,10 @@ class VariationsManager:
             
             if inherit_from:
                 variation_data["inherit_from"] = inherit_from
+            if self.delta_mode:
+                variation_data["storage"] = "delta"
+                if removed:
+                    variation_data["removed_categories"] = removed
             
             # Guardar la variación
             data["variations"][variation_name] = variation_data
@@ -139,7 +280,11 @@ class VariationsManager:
             variations = data.get("variations", {})
             
             if variation_name in variations:
-                return variations[variation_name]
+                # Devolver siempre las categorías completas (resueltas si está en modo delta)
+                variation = {k: v for k, v in variations[variation_name].items()
+                             if k not in ("storage", "removed_categories")}
+                variation["categories"] = self.resolve_variation_categories(character_name, variation_name)
+                return variation
             else:
                 print(f"Variación '{variation_name}' no encontrada para {character_name}")
                 return None
@@ -273,10 +418,25 @@ class VariationsManager:
             print(f"Error exportando variación: {e}")
             return False
     
-    def update_base_config(self, character_name: str, categories: Dict[str, str]):
-        """Actualiza la configuración base de un personaje (no implementado en esta versión)"""
+    def update_base_config(self, character_name: str, categories: Dict[str, str]) -> bool:
+        """Actualiza las categorías del personaje base; las variaciones delta heredan el cambio"""
+        character_file = self.get_character_file(character_name)
         try:
-            # Esta funcionalidad se puede implementar más adelante si es necesaria
-            print(f"Actualización de configuración base para {character_name} - No implementado")
+            def apply(character_data):
+                stored = character_data.setdefault("categories", {})
+                # Conservar la clave existente (algunos personajes usan mayúscula inicial)
+                existing = {key.lower(): key for key in stored}
+                for name, value in categories.items():
+                    snake = name.lower().replace(" ", "_")
+                    stored[existing.get(snake, snake)] = value
+            
+            if not os.path.exists(character_file):
+                raise FileNotFoundError(character_file)
+            update_json(character_file, apply, default={})
+            
+            # El nodo base cambió: se invalidan todas sus variaciones descendientes
+            self.resolver.sync(character_name)
+            return True
         except Exception as e:
-            print(f"Error al actualizar configuración base: {e}")
\ No newline at end of file
+            print(f"Error al actualizar configuración base: {e}")
+            return False
@@ -0,0 +1,78 @@
+from typing import Dict, List, Optional
+
+from .history import History, Snapshot
+
+
+class Workspace:
+    """Espacio de trabajo: su propio historial, cuyo snapshot actual es el estado del grid.
+    Un espacio inactivo solo guarda snapshots inmutables (comparten cubetas con los demás)"""
+
+    __slots__ = ("name", "history")
+
+    def __init__(self, name: str, history: History):
+        self.name = name
+        self.history = history
+
+    @property
+    def snapshot(self) -> Snapshot:
+        return self.history.current
+
+
+class WorkspaceManager:
+    """Lista de espacios de trabajo y cuál está activo"""
+
+    def __init__(self, history: History, name: str = "Espacio 1"):
+        # El primer espacio adopta el historial que ya usa el grid
+        self.workspaces: List[Workspace] = [Workspace(name, history)]
+        self.active_index = 0
+        self.budget_bytes = history.budget_bytes
+        self._counter = 1
+
+    @property
+    def active(self) -> Workspace:
+        return self.workspaces[self.active_index]
+
+    def names(self) -> List[str]:
+        return [workspace.name for workspace in self.workspaces]
+
+    def next_name(self) -> str:
+        self._counter += 1
+        return f"Espacio {self._counter}"
+
+    def create(self, name: str = None, copy_active: bool = True) -> int:
+        """Crea un espacio; al copiar comparte el snapshot actual (copy-on-write, sin duplicar valores)"""
+        history = History(self.budget_bytes)
+        if copy_active:
+            history.current = self.active.snapshot
+        self.workspaces.append(Workspace(name or self.next_name(), history))
+        return len(self.workspaces) - 1
+
+    def switch(self, index: int) -> Optional[Dict[str, str]]:
+        """Activa otro espacio; devuelve solo los valores que difieren del estado actual"""
+        if index == self.active_index or not 0 <= index < len(self.workspaces):
+            return None
+        changes = self.active.snapshot.changes_to(self.workspaces[index].snapshot)
+        self.active_index = index
+        return changes
+
+    def remove(self, index: int) -> Optional[Dict[str, str]]:
+        """Elimina un espacio (siempre queda uno); si era el activo devuelve los cambios a aplicar"""
+        if len(self.workspaces) <= 1 or not 0 <= index < len(self.workspaces):
+            return None
+        changes = None
+        if index == self.active_index:
+            target = index - 1 if index > 0 else 1
+            changes = self.active.snapshot.changes_to(self.workspaces[target].snapshot)
+            self.active_index = target
+        del self.workspaces[index]
+        if self.active_index > index:
+            self.active_index -= 1
+        return changes
+
+    def rename_key(self, old_key: str, new_key: str):
+        """Mueve una categoría renombrada en todos los espacios (sus historiales empiezan de nuevo)"""
+        for workspace in self.workspaces:
+            values = workspace.snapshot.to_dict()
+            if old_key in values:
+                values[new_key] = values.pop(old_key)
+            workspace.history.reset(values)
@@ -1,10 +1,13 @@
 import sys
+from logic.startup_profile import measure
 from PyQt6.QtWidgets import QApplication
-from ui.main_window import MainWindow
+with measure("import", "ui.main_window"):
+    from ui.main_window import MainWindow
 
 def main():
     app = QApplication(sys.argv)
-    window = MainWindow()
+    with measure("construcción", "MainWindow"):
+        window = MainWindow()
     window.show()
     sys.exit(app.exec())
 
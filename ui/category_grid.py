@@ -4,20 +4,29 @@ import re
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, 
     QLineEdit, QScrollArea, QPushButton, QInputDialog, QMessageBox,
-    QDialog, QLabel, QTextEdit
+    QDialog, QLabel, QTextEdit, QTabBar
 )
 from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QFont
-from .components import CategoryCard, AddCategoryCard
+from PyQt6.QtGui import QFont, QKeySequence, QShortcut
+from .components import CategoryCard, AddCategoryCard, VirtualCardGrid
 from .utils.category_utils import (
     load_categories_and_tags, 
+    load_category_tags,
+    get_tag_store,
     normalize_category,
     update_categories_json,
     update_tags_json,
     rename_category_in_files,
     DEFAULT_CARD_COLOR
 )
+from .utils.update_scheduler import UpdateScheduler, DEFAULT_UPDATE_DELAY_MS
 from .save_manager import SaveManager
+from config.settings import AppSettings
+from logic.change_tracker import ChangeTracker
+from logic.prompt_diff import PromptDiffEngine
+from logic.history import History, DEFAULT_HISTORY_BUDGET_KB
+from logic.workspaces import WorkspaceManager
+from core import get_library
 
 class CategoryGridFrame(QWidget):
     prompt_updated = pyqtSignal(str)
@@ -600,21 +609,47 @@ class ImportDataDialog(QDialog):
 
 class CategoryGridFrame(QWidget):
     prompt_updated = pyqtSignal(str)
-    category_value_changed = pyqtSignal(str, str, str)  # (category_name, old_value, new_value)
+    category_values_changed = pyqtSignal(dict)  # {category_name: (old_value, new_value)}
     character_saved = pyqtSignal(str)  # Nueva señal: (character_name)
     
     def __init__(self, prompt_generator, main_window=None):
         super().__init__()
         self.prompt_generator = prompt_generator
         self.main_window = main_window  # ← AGREGAR REFERENCIA AL MAIN_WINDOW
-        self.cards = []
-        self.previous_values = {}
+        # Descriptores de categorías: {"name", "key", "tags" (None hasta leer su shard), "color"}.
+        # Los valores viven en el PromptGenerator; las tarjetas solo existen mientras se ven
+        self.categories = []
+        self.categories_by_key = {}
+        self.visible_categories = []
+        self.tag_click_counts = {}
+        # Cambios explícitos (categoría, anterior, nuevo); el grid los entrega al sidebar
+        self.change_tracker = ChangeTracker()
+        self.change_tracker.register("grid")
+        # Diff estructurado para el diálogo de variaciones (base del personaje cacheada)
+        self.change_tracker.register("variation_diff")
+        self.prompt_diff = PromptDiffEngine()
+        # Deshacer/rehacer con snapshots inmutables, acotado por memoria
+        self.change_tracker.register("history")
+        budget_kb = AppSettings().get_setting("history_budget_kb", DEFAULT_HISTORY_BUDGET_KB)
+        self.history = History(budget_kb * 1024)
+        self.restoring_history = False
+        # Espacios de trabajo en memoria: cada uno con su historial y su snapshot actual
+        self.workspaces = WorkspaceManager(self.history)
         self.previous_values_snapshot = {}
+        # Transacciones de aplicación en bloque (update_prompt se difiere hasta cerrar)
+        self.batch_depth = 0
+        self.batch_dirty = False
+        
+        # Planificador único de actualizaciones (reemplaza el debounce de cada tarjeta)
+        delay_ms = AppSettings().get_setting("update_delay_ms", DEFAULT_UPDATE_DELAY_MS)
+        self.scheduler = UpdateScheduler(delay_ms, self)
+        self.scheduler.flushed.connect(self.apply_scheduled_values)
         
         # Inicializar SaveManager con referencia a self
         self.save_manager = SaveManager(self, self)
         
         self.setup_ui()
+        self.setup_shortcuts()
         self.create_cards()
 
     def setup_ui(self):
@@ -623,6 +658,29 @@ class CategoryGridFrame(QWidget):
         self.main_layout.setContentsMargins(16, 0, 16, 16)
         self.main_layout.setSpacing(0)
         
+        # --- Pestañas de espacios de trabajo ---
+        workspace_layout = QHBoxLayout()
+        workspace_layout.setSpacing(8)
+        
+        self.workspace_tabs = QTabBar()
+        self.workspace_tabs.setTabsClosable(True)
+        self.workspace_tabs.setExpanding(False)
+        self.workspace_tabs.setDrawBase(False)
+        for name in self.workspaces.names():
+            self.workspace_tabs.addTab(name)
+        self.workspace_tabs.currentChanged.connect(self.switch_workspace)
+        self.workspace_tabs.tabCloseRequested.connect(self.close_workspace)
+        workspace_layout.addWidget(self.workspace_tabs)
+        
+        self.new_workspace_btn = QPushButton("+")
+        self.new_workspace_btn.setToolTip("Nuevo espacio (copia del actual)")
+        self.new_workspace_btn.setFixedWidth(32)
+        self.new_workspace_btn.clicked.connect(self.add_workspace)
+        workspace_layout.addWidget(self.new_workspace_btn)
+        workspace_layout.addStretch()
+        
+        self.main_layout.addLayout(workspace_layout)
+        
         # --- Layout horizontal para buscador y botones ---
         search_layout = QHBoxLayout()
         search_layout.setSpacing(8)
@@ -661,25 +719,18 @@ class CategoryGridFrame(QWidget):
         
         self.main_layout.addLayout(search_layout)
 
-        # Scroll area
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
-        
-        # Widget contenedor para el grid
-        self.grid_widget = QWidget()
-        self.grid_layout = QGridLayout(self.grid_widget)
-        self.grid_layout.setSpacing(8)
-        
-        # Hacer el grid responsivo
-        self.grid_layout.setColumnStretch(0, 1)
-        self.grid_layout.setColumnStretch(1, 1)
-        self.grid_layout.setColumnStretch(2, 1)
-        
-        self.scroll_area.setWidget(self.grid_widget)
+        # Grid virtualizado: solo se construyen las tarjetas visibles y se reciclan al hacer scroll
+        self.scroll_area = VirtualCardGrid(self.create_card_widget, self.bind_card_widget, columns=3, spacing=8)
+        self.add_card = AddCategoryCard(self.add_custom_category)
+        self.scroll_area.set_trailing_widget(self.add_card)
         self.main_layout.addWidget(self.scroll_area)
         
+    def setup_shortcuts(self):
+        """Atajos de deshacer/rehacer del grid"""
+        QShortcut(QKeySequence("Ctrl+Z"), self).activated.connect(self.undo)
+        QShortcut(QKeySequence("Ctrl+Y"), self).activated.connect(self.redo)
+        QShortcut(QKeySequence("Ctrl+Shift+Z"), self).activated.connect(self.redo)
+
     def setup_styles(self):
         """Configura los estilos del grid"""
         self.setStyleSheet("""
@@ -699,6 +750,19 @@ class CategoryGridFrame(QWidget):
                 border: none;
                 background-color: transparent;
             }
+            QTabBar::tab {
+                background-color: #252525;
+                color: #a0a0a0;
+                border: 1px solid #404040;
+                border-radius: 6px;
+                padding: 4px 12px;
+                margin-right: 4px;
+            }
+            QTabBar::tab:selected {
+                background-color: #312e81;
+                color: #ffffff;
+                border: 1px solid #6366f1;
+            }
             QPushButton {
                 background-color: #6366f1;
                 color: white;
@@ -753,83 +817,219 @@ class CategoryGridFrame(QWidget):
         return "#252525"  # Color por defecto
 
     def create_cards(self):
-        """Crea las tarjetas de categorías"""
-        categories = load_categories_and_tags()
-        
-        row, col = 0, 0
-        for category in categories:
-            # Obtener color grupal
-            group_color = self.get_category_group_color(category["name"])
-            
-            card = CategoryCard(
-                category["name"], 
-                category["icon"], 
-                category["tags"], 
-                self.prompt_generator,
-                bg_color=group_color  # ¡Agregar el color grupal!
-            )
-            card.request_rename.connect(self.handle_category_rename)
-            card.value_changed.connect(self.update_prompt)
-            
-            self.cards.append(card)
-            self.grid_layout.addWidget(card, row, col)
-            
-            col += 1
-            if col >= 3:
-                col = 0
-                row += 1
-        
-        # Tarjeta para añadir nueva categoría
-        add_card = AddCategoryCard(self.add_custom_category)
-        self.grid_layout.addWidget(add_card, row, col)
+        """Carga las categorías; las tarjetas se construyen al entrar en el viewport"""
+        self.categories = []
+        # Los tags se leen por shard cuando la tarjeta entra en el viewport
+        for category in load_categories_and_tags(load_tags=False):
+            self.categories.append({
+                "name": category["name"],
+                "key": category["name"].lower().replace(" ", "_"),
+                "tags": category["tags"],
+                "color": self.get_category_group_color(category["name"])  # ¡Color grupal!
+            })
+        self.categories_by_key = {c["key"]: c for c in self.categories}
+        self.filter_cards(self.search_box.text())
+
+    def reload_tags(self):
+        """Relee categories.json y solo los shards de tags ya cargados que cambiaron en disco
+        (antes importa las categorías que hayan cambiado en tags.json)"""
+        get_tag_store().migrate()
+        loaded = load_categories_and_tags(load_tags=False)
+        if [c["name"] for c in loaded] != [c["name"] for c in self.categories]:
+            # Se agregaron, quitaron o reordenaron categorías
+            self.create_cards()
+            return
+        loaded_keys = [c["key"] for c in self.categories if c["tags"] is not None]
+        changed = get_tag_store().changed_keys(loaded_keys)
+        for key in changed:
+            self.categories_by_key[key]["tags"] = load_category_tags(key)
+        if changed:
+            self.scroll_area.refresh_bound()
+
+    def get_category_tags(self, category):
+        """Tags de una categoría, leyendo su shard la primera vez que se necesitan"""
+        if category["tags"] is None:
+            category["tags"] = load_category_tags(category["key"])
+        return category["tags"]
+
+    def create_card_widget(self):
+        """Construye una tarjeta vacía para el pool del grid virtualizado"""
+        card = CategoryCard("", None, [], self.prompt_generator, scheduler=self.scheduler)
+        card.request_rename.connect(self.handle_category_rename)
+        card.value_changed.connect(self.update_prompt)
+        card.tags_changed.connect(self.handle_tags_changed)
+        return card
+
+    def bind_card_widget(self, card, category):
+        """Asocia una tarjeta del pool a una categoría, leyendo el valor del PromptGenerator"""
+        card.bind(
+            category["name"],
+            self.get_category_tags(category),
+            category["color"],
+            # Una edición aún no aplicada tiene prioridad sobre el valor del generador
+            self.scheduler.pending_value(category["key"], self.prompt_generator.get_category_value(category["key"])),
+            self.tag_click_counts.setdefault(category["key"], {})
+        )
+
+    def handle_tags_changed(self, category_name, tags):
+        """Guarda en el descriptor los tags editados para que sobrevivan al reciclado"""
+        category = self.find_category(category_name)
+        if category:
+            category["tags"] = list(tags)
+
+    @property
+    def cards(self):
+        """Tarjetas construidas actualmente (solo las visibles y su margen)"""
+        return self.scroll_area.bound_cards()
+
+    def find_category(self, name):
+        """Busca el descriptor de una categoría por nombre visible o clave"""
+        normalized = name.lower().replace(" ", "_")
+        for category in self.categories:
+            if category["name"] == name or category["key"] == normalized:
+                return category
+        return None
 
     def filter_cards(self, text):
         """Filtra las tarjetas según el texto de búsqueda"""
         text = text.lower()
-        for card in self.cards:
-            if hasattr(card, 'category_name'):
-                visible = text in card.category_name.lower()
-                card.setVisible(visible)
+        self.visible_categories = [c for c in self.categories if text in c["name"].lower()]
+        self.scroll_area.set_items(self.visible_categories)
+
+    def begin_batch(self):
+        """Abre una transacción: los cambios se acumulan sin regenerar el prompt"""
+        self.batch_depth += 1
+
+    def end_batch(self):
+        """Cierra una transacción; al cerrar la última se regenera el prompt una sola vez"""
+        self.batch_depth = max(0, self.batch_depth - 1)
+        if self.batch_depth == 0 and self.batch_dirty:
+            self.update_prompt()
+
+    def apply_values(self, values):
+        """Aplica {clave_snake_case: valor} en bloque: una escritura en el PromptGenerator,
+        un solo prompt_updated y un solo category_values_changed"""
+        self.begin_batch()
+        try:
+            # Ediciones pendientes del usuario entran en la misma transacción
+            self.scheduler.flush()
+            self.write_values(values)
+            # bind() carga los valores con las señales de los inputs bloqueadas
+            self.scroll_area.refresh_bound()
+            self.batch_dirty = True
+        finally:
+            self.end_batch()
+
+    def write_values(self, values):
+        """Escribe {clave_snake_case: valor} en el PromptGenerator registrando solo lo que cambió"""
+        for key, value in values.items():
+            category = self.categories_by_key.get(key)
+            name = category["name"] if category else key.replace("_", " ").capitalize()
+            old_value = self.prompt_generator.get_category_value(key)
+            self.prompt_generator.update_category(key, value)
+            self.change_tracker.record(name, old_value, self.prompt_generator.get_category_value(key))
+
+    def apply_scheduled_values(self, values):
+        """Recibe del planificador todas las categorías modificadas y actualiza el prompt una vez"""
+        self.write_values(values)
+        self.update_prompt()
 
     def update_prompt(self):
-        """Actualiza el prompt cuando cambian los valores de las tarjetas"""
-        # Crear mapeo inverso: formato capitalizado -> formato snake_case
-        with open("c:\\Users\\LENOVO\\Desktop\\AppPrompts\\data\\categories.json", "r", encoding="utf-8") as f:
-            original_categories = json.load(f)["categorias"]
-        
-        category_reverse_mapping = {}
-        for orig_cat in original_categories:
-            formatted_cat = orig_cat.replace("_", " ").capitalize()
-            category_reverse_mapping[formatted_cat] = orig_cat
-        
-        # Detectar qué categoría cambió y notificar al sidebar
-        current_values = self.get_current_values()
-        
-        for category_name, current_value in current_values.items():
-            previous_value = self.previous_values.get(category_name, "")
-            if previous_value != current_value:
-                # Emitir señal de cambio específico
-                self.category_value_changed.emit(category_name, previous_value, current_value)
-                
-                # Actualizar el prompt_generator con el nombre correcto
-                snake_case_name = category_reverse_mapping.get(category_name, category_name.lower().replace(" ", "_"))
-                if self.prompt_generator:
-                    self.prompt_generator.update_category(snake_case_name, current_value)
+        """Actualiza el prompt cuando cambian los valores de las categorías"""
+        if self.batch_depth:
+            self.batch_dirty = True
+            return
+        self.batch_dirty = False
         
-        # Actualizar valores anteriores
-        self.previous_values = current_values.copy()
+        # Notificar al sidebar solo las categorías que cambiaron, en un solo conjunto
+        changes = self.change_tracker.consume("grid")
+        if changes:
+            self.category_values_changed.emit(changes)
+        self.commit_history()
         
         # Usar el prompt_generator en lugar de generar el prompt manualmente
         prompt = self.prompt_generator.generate_prompt()
         self.prompt_updated.emit(prompt)
     
+    def commit_history(self):
+        """Convierte los cambios acumulados en un paso del historial"""
+        changes = self.change_tracker.consume("history")
+        if not changes or self.restoring_history:
+            return
+        self.history.commit(self.changes_to_values(changes))
+
+    def changes_to_values(self, changes):
+        """Convierte {categoría: (anterior, nuevo)} en {clave_snake_case: nuevo}"""
+        values = {}
+        for name, (_, new_value) in changes.items():
+            category = self.find_category(name)
+            values[category["key"] if category else name.lower().replace(" ", "_")] = new_value
+        return values
+
+    def restore_history(self, values):
+        """Escribe los valores de un paso de deshacer/rehacer sin registrarlo como paso nuevo"""
+        if values is None:
+            return
+        self.restoring_history = True
+        try:
+            self.apply_values(values)
+        finally:
+            self.restoring_history = False
+
+    def undo(self):
+        """Deshace el último cambio del grid (ediciones, presets, variaciones)"""
+        # Las ediciones pendientes forman su propio paso antes de deshacer
+        self.scheduler.flush()
+        self.restore_history(self.history.undo())
+
+    def redo(self):
+        """Rehace el último cambio deshecho"""
+        self.scheduler.flush()
+        self.restore_history(self.history.redo())
+
+    def add_workspace(self):
+        """Crea un espacio que comparte el estado actual y lo activa"""
+        self.scheduler.flush()
+        index = self.workspaces.create()
+        self.workspace_tabs.addTab(self.workspaces.workspaces[index].name)
+        self.workspace_tabs.setCurrentIndex(index)
+
+    def switch_workspace(self, index):
+        """Activa otro espacio aplicando solo las categorías que difieren (sin releer archivos)"""
+        if index < 0 or index == self.workspaces.active_index:
+            return
+        # Las ediciones pendientes pertenecen al espacio que se deja
+        self.scheduler.flush()
+        changes = self.workspaces.switch(index)
+        self.history = self.workspaces.active.history
+        self.restore_history(changes)
+
+    def close_workspace(self, index):
+        """Cierra un espacio (siempre queda al menos uno)"""
+        if len(self.workspaces.workspaces) <= 1:
+            return
+        self.scheduler.flush()
+        changes = self.workspaces.remove(index)
+        self.history = self.workspaces.active.history
+        self.workspace_tabs.blockSignals(True)
+        self.workspace_tabs.removeTab(index)
+        self.workspace_tabs.setCurrentIndex(self.workspaces.active_index)
+        self.workspace_tabs.blockSignals(False)
+        self.restore_history(changes)
+
+    def get_values_by_key(self):
+        """Valores actuales de todas las categorías por clave snake_case"""
+        return {
+            category["key"]: self.prompt_generator.get_category_value(category["key"])
+            for category in self.categories
+        }
+
     def get_current_values(self):
-        """Obtiene los valores actuales de todas las categorías"""
-        current_values = {}
-        for card in self.cards:
-            if hasattr(card, 'category_name') and hasattr(card, 'input_field'):
-                current_values[card.category_name] = card.input_field.text()
-        return current_values
+        """Obtiene los valores actuales de todas las categorías (desde el PromptGenerator)"""
+        return {
+            category["name"]: self.prompt_generator.get_category_value(category["key"])
+            for category in self.categories
+        }
     
     def set_previous_values_snapshot(self, values):
         """Establece el snapshot de valores previos"""
@@ -839,7 +1039,27 @@ class CategoryGridFrame(QWidget):
     def handle_category_rename(self, old_name, new_name):
         """Maneja el renombrado de categorías"""
         try:
-            rename_category_in_files(old_name, new_name)
+            category = self.find_category(old_name)
+            if category:
+                # Aplicar antes las ediciones pendientes con la clave anterior
+                self.scheduler.flush()
+                old_key = category["key"]
+                new_key = new_name.lower().replace(" ", "_")
+                rename_category_in_files(old_key, new_key)
+                
+                # Mover el estado de la categoría a la nueva clave
+                value = self.prompt_generator.get_category_value(old_key)
+                self.prompt_generator.clear_category(old_key)
+                self.prompt_generator.update_category(new_key, value)
+                self.tag_click_counts[new_key] = self.tag_click_counts.pop(old_key, {})
+                self.change_tracker.rename(old_name, new_name)
+                category["name"] = new_name
+                category["key"] = new_key
+                self.categories_by_key[new_key] = self.categories_by_key.pop(old_key)
+                # Los pasos anteriores usan la clave vieja: los historiales empiezan de nuevo
+                self.workspaces.rename_key(old_key, new_key)
+            else:
+                rename_category_in_files(old_name, new_name)
             QMessageBox.information(self, "Éxito", f"Categoría renombrada de '{old_name}' a '{new_name}'")
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Error al renombrar categoría: {str(e)}")
@@ -853,8 +1073,7 @@ class CategoryGridFrame(QWidget):
                 update_categories_json(normalized_name)
                 update_tags_json(normalized_name, [])
                 
-                # Recrear las tarjetas
-                self.clear_grid()
+                # Recargar las categorías (las tarjetas se reciclan)
                 self.create_cards()
                 
                 QMessageBox.information(self, "Éxito", f"Categoría '{name}' añadida correctamente")
@@ -862,16 +1081,8 @@ class CategoryGridFrame(QWidget):
                 QMessageBox.warning(self, "Error", f"Error al añadir categoría: {str(e)}")
 
     def clear_grid(self):
-        """Limpia el grid de tarjetas"""
-        for card in self.cards:
-            card.setParent(None)
-        self.cards.clear()
-        
-        # Limpiar el grid layout
-        while self.grid_layout.count():
-            item = self.grid_layout.takeAt(0)
-            if item.widget():
-                item.widget().setParent(None)
+        """Libera las tarjetas del grid (vuelven al pool)"""
+        self.scroll_area.set_items([])
 
     def show_save_options(self):
         """Muestra las opciones de guardado"""
@@ -914,12 +1125,8 @@ class CategoryGridFrame(QWidget):
         name = name.strip()
         
         # Verificar si ya existe
-        characters_dir = "data/characters"
-        if not os.path.exists(characters_dir):
-            os.makedirs(characters_dir)
-        
-        character_file = os.path.join(characters_dir, f"{name}.json")
-        if os.path.exists(character_file):
+        characters = get_library().characters
+        if characters.exists(name):
             reply = QMessageBox.question(
                 self,
                 "Personaje existente",
@@ -930,9 +1137,8 @@ class CategoryGridFrame(QWidget):
                 return
         
         try:
-            # Guardar archivo del personaje
-            with open(character_file, "w", encoding="utf-8") as f:
-                json.dump(variation_data, f, ensure_ascii=False, indent=2)
+            # Guardar el personaje en su carpeta con metadatos
+            characters.save_character(name, variation_data)
             
             # Emitir señal para actualizar el dropdown de personajes
             self.character_saved.emit(name)
@@ -963,15 +1169,9 @@ class CategoryGridFrame(QWidget):
         if not data:
             return
             
-        loaded_count = 0
-        for card in self.cards:
-            if hasattr(card, 'category_name') and hasattr(card, 'input_field'):
-                category_name = card.category_name.lower().replace(' ', '_')
-                if category_name in data:
-                    card.input_field.setText(data[category_name])
-                    loaded_count += 1
-        
-        self.update_prompt()
+        values = {c["key"]: data[c["key"]] for c in self.categories if c["key"] in data}
+        loaded_count = len(values)
+        self.apply_values(values)
         
         if loaded_count > 0:
             QMessageBox.information(
@@ -985,18 +1185,11 @@ class CategoryGridFrame(QWidget):
         if not character_data:
             return
             
-        loaded_count = 0
-        for card in self.cards:
-            if hasattr(card, 'category_name') and hasattr(card, 'input_field'):
-                # Normalizar el nombre de la categoría para buscar en los datos
-                category_name = card.category_name.lower().replace(' ', '_')
-                
-                if category_name in character_data:
-                    card.input_field.setText(character_data[category_name])
-                    loaded_count += 1
-        
-        # Actualizar el prompt después de cargar los datos
-        self.update_prompt()
+        # Los datos del personaje usan claves en snake_case (algunas con mayúsculas)
+        normalized_data = {k.lower().replace(" ", "_"): v for k, v in character_data.items()}
+        values = {c["key"]: normalized_data[c["key"]] for c in self.categories if c["key"] in normalized_data}
+        loaded_count = len(values)
+        self.apply_values(values)
         
         # Opcional: mostrar mensaje de confirmación
         if loaded_count > 0:
@@ -1017,19 +1210,10 @@ class CategoryGridFrame(QWidget):
         if not categories_data:
             return
         
-        loaded_count = 0
-        for card in self.cards:
-            if hasattr(card, 'category_name') and hasattr(card, 'input_field'):
-                # Buscar el valor de la categoría en los datos de la variación
-                category_name = card.category_name
-                
-                if category_name in categories_data:
-                    # Aplicar el valor a la tarjeta
-                    card.input_field.setText(categories_data[category_name])
-                    loaded_count += 1
-        
-        # Actualizar el prompt después de cargar los datos
-        self.update_prompt()
+        # Las variaciones usan el nombre visible de la categoría
+        values = {c["key"]: categories_data[c["name"]] for c in self.categories if c["name"] in categories_data}
+        loaded_count = len(values)
+        self.apply_values(values)
         
         # Mostrar mensaje de confirmación
         if loaded_count > 0:
@@ -1057,54 +1241,23 @@ class CategoryGridFrame(QWidget):
             # Usar el nombre pasado desde presets_panel o el del preset_data
             preset_name = preset_data.get('preset_display_name', preset_data.get('name', 'Preset'))
         
-        print(f"DEBUG: preset_categories = {preset_categories}")  # DEBUG
-        
         if not preset_categories:
             QMessageBox.information(self, "Preset vacío", "El preset no contiene categorías.")
             return
         
-        print(f"DEBUG: Número de cards disponibles: {len(self.cards)}")  # DEBUG
-        
-        applied_count = 0
-        
         # Aplicar valores del preset a las categorías correspondientes
-        for i, card in enumerate(self.cards):
-            if hasattr(card, 'category_name') and hasattr(card, 'input_field'):
-                card_name = card.category_name
-                print(f"DEBUG: Card {i} - nombre: '{card_name}'")  # DEBUG
-                
-                # Buscar coincidencia exacta primero
-                if card_name in preset_categories:
-                    preset_value = preset_categories[card_name]
-                    print(f"DEBUG: Coincidencia exacta encontrada para '{card_name}' -> '{preset_value}'")  # DEBUG
-                    card.input_field.setText(preset_value)
-                    applied_count += 1
-                else:
-                    # Buscar coincidencia normalizada (sin espacios, minúsculas)
-                    card_normalized = card_name.lower().replace(" ", "_")
-                    print(f"DEBUG: Buscando coincidencia normalizada para '{card_name}' -> '{card_normalized}'")  # DEBUG
-                    
-                    found_match = False
-                    for preset_key, preset_value in preset_categories.items():
-                        preset_normalized = preset_key.lower().replace(" ", "_")
-                        print(f"DEBUG: Comparando '{card_normalized}' con '{preset_normalized}'")  # DEBUG
-                        
-                        if card_normalized == preset_normalized:
-                            print(f"DEBUG: Coincidencia normalizada encontrada: '{card_name}' -> '{preset_value}'")  # DEBUG
-                            card.input_field.setText(preset_value)
-                            applied_count += 1
-                            found_match = True
-                            break
-                    
-                    if not found_match:
-                        print(f"DEBUG: No se encontró coincidencia para '{card_name}'")  # DEBUG
-            else:
-                print(f"DEBUG: Card {i} no tiene category_name o input_field")  # DEBUG
-        
-        print(f"DEBUG: Total aplicado: {applied_count} de {len(preset_categories)}")  # DEBUG
-        
-        # Actualizar el prompt después de aplicar los valores
-        self.update_prompt()
+        values = {}
+        normalized_preset = {k.lower().replace(" ", "_"): v for k, v in preset_categories.items()}
+        for category in self.categories:
+            # Buscar coincidencia exacta primero
+            if category["name"] in preset_categories:
+                values[category["key"]] = preset_categories[category["name"]]
+            # Buscar coincidencia normalizada (sin espacios, minúsculas)
+            elif category["key"] in normalized_preset:
+                values[category["key"]] = normalized_preset[category["key"]]
+        
+        applied_count = len(values)
+        self.apply_values(values)
         
         # Mostrar mensaje de confirmación
         if applied_count > 0:
@@ -1,4 +1,6 @@
-from .category_card import CategoryCard, TagButton
+from .category_card import CategoryCard
+from .tag_strip import TagStrip
 from .add_category_card import AddCategoryCard
+from .virtual_card_grid import VirtualCardGrid
 
-__all__ = ['CategoryCard', 'TagButton', 'AddCategoryCard']
\ No newline at end of file
+__all__ = ['CategoryCard', 'TagStrip', 'AddCategoryCard', 'VirtualCardGrid']
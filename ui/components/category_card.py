@@ -1,50 +1,26 @@
 import os
-import json
 import re
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                             QLineEdit, QFrame, QPushButton, QToolButton, QSizePolicy)
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+                             QLineEdit, QFrame, QToolButton, QSizePolicy)
+from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont, QPixmap, QIcon
+from .tag_strip import TagStrip
 
 # Constantes
 DEFAULT_CARD_COLOR = "#252525"
 ICON_EDIT = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "assets", "icons", "edit.png")
 ICON_SAVE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "assets", "icons", "save.png")
 
-class TagButton(QPushButton):
-    def __init__(self, tag, parent_card):
-        super().__init__(tag)
-        self.tag = tag
-        self.parent_card = parent_card
-        self.setStyleSheet("""
-            QPushButton {
-                background-color: #404040;
-                border: 1px solid #6366f1;
-                border-radius: 12px;
-                padding: 4px 8px;
-                color: #e0e0e0;
-                font-size: 10px;
-            }
-            QPushButton:hover {
-                background-color: #6366f1;
-                color: #fff;
-            }
-        """)
-        self.setCursor(Qt.CursorShape.PointingHandCursor)
-
-    def mousePressEvent(self, event):
-        if event.button() == Qt.MouseButton.LeftButton:
-            self.parent_card.modify_tag_importance(self.tag, increase=True)
-        elif event.button() == Qt.MouseButton.RightButton:
-            self.parent_card.modify_tag_importance(self.tag, increase=False)
-
 class CategoryCard(QFrame):
     request_rename = pyqtSignal(str, str)  # (old_name, new_name)
     value_changed = pyqtSignal()  # Nueva señal para cuando cambie el valor
+    tags_changed = pyqtSignal(str, list)  # (category_name, tags) tras editar los tags
 
-    def __init__(self, name, icon=None, tags=None, prompt_generator=None, bg_color=DEFAULT_CARD_COLOR):
+    def __init__(self, name, icon=None, tags=None, prompt_generator=None, bg_color=DEFAULT_CARD_COLOR, scheduler=None):
         super().__init__()
         self.prompt_generator = prompt_generator
+        # UpdateScheduler compartido; sin él, cada edición se aplica al instante
+        self.scheduler = scheduler
         self.category_name = name
         self.bg_color = bg_color
         self.icon = icon
@@ -53,7 +29,6 @@ class CategoryCard(QFrame):
         self.tags = tags or []
         self.setup_ui(name, tags)
         self.setup_styles()
-        self.setup_debounce()
 
     def setup_ui(self, name, tags):
         """Configura la interfaz de la tarjeta"""
@@ -103,83 +78,57 @@ class CategoryCard(QFrame):
         
         # Guardar los tags para poder actualizarlos después
         self.tags = tags or []
+        # Importancia por tag; en el grid virtualizado la comparte el grid por categoría
         self.tag_click_counts = {}
         
-        # Crear la interfaz de tags
+        # Fila de tags pintada (un solo widget, sin importar cuántos tags haya)
+        self.tag_strip = TagStrip(self)
+        self.tag_strip.tag_clicked.connect(self.modify_tag_importance)
+        self.tag_strip.more_clicked.connect(self.show_tags_dialog)
+        layout.addWidget(self.tag_strip)
         self.update_tags_ui()
 
     def update_tags_ui(self, tags=None):
-        """Actualiza la interfaz de los tags en la tarjeta"""
-        # Limpiar el layout de tags existente
-        layout = self.layout()
-        
-        # Buscar el layout de tags (último layout en la tarjeta)
-        # Pero asegurarse de no eliminar el layout del título
-        for i in reversed(range(layout.count())):
-            item = layout.itemAt(i)
-            # Solo eliminar el layout de tags, no el del título ni el input
-            if isinstance(item, QHBoxLayout) and i > 1:  # El título está en la posición 0, el input en 1
-                tags_layout = item
-                # Limpiar este layout
-                while tags_layout.count():
-                    widget_item = tags_layout.takeAt(0)
-                    if widget_item.widget():
-                        widget_item.widget().setParent(None)
-                # Eliminar el layout vacío
-                layout.removeItem(tags_layout)
-                break
-        
-        # Crear nuevo layout para los tags
-        tags_layout = QHBoxLayout()
-        tags_layout.setContentsMargins(0, 0, 0, 0)
-        tags_layout.setSpacing(6)
-        
+        """Actualiza los tags mostrados en la tarjeta"""
         # Si se proporcionan nuevos tags, actualizar la lista interna
         if tags is not None:
             self.tags = tags
-            
-        # Recrear los botones de tags
-        self.tag_click_counts = {}
-        if self.tags:
-            # Solo muestra los dos primeros tags
-            for tag in self.tags[:2]:
-                btn = TagButton(tag, self)
-                tags_layout.addWidget(btn)
-                self.tag_click_counts[tag] = 0
-    
-            # Botón "ver tags"
-            view_tags_btn = QPushButton("ver tags")
-            view_tags_btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #6366f1;
-                    color: #fff;
-                    border-radius: 10px;
-                    padding: 2px 10px;
-                    font-size: 10px;
-                }
-                QPushButton:hover {
-                    background-color: #4f46e5;
-                }
-            """)
-            view_tags_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-            view_tags_btn.clicked.connect(self.show_tags_dialog)
-            tags_layout.addWidget(view_tags_btn)
-    
-        tags_layout.addStretch()
-        layout.addLayout(tags_layout)
+        self.tag_strip.set_tags(self.tags, self.tag_click_counts)
+
+    def bind(self, name, tags, bg_color=DEFAULT_CARD_COLOR, value="", tag_click_counts=None):
+        """Reutiliza la tarjeta para otra categoría (grid virtualizado)"""
+        if self.is_editing:
+            self.cancel_edit_mode()
+        
+        self.category_name = name
+        self.title_label.setText(name)
+        self.title_edit.setText(name)
+        
+        if bg_color != self.bg_color:
+            self.bg_color = bg_color
+            self.setup_styles()
+        
+        # Cargar el valor sin marcar la categoría como modificada
+        if self.input_field.text() != value:
+            self.input_field.blockSignals(True)
+            self.input_field.setText(value)
+            self.input_field.blockSignals(False)
+        
+        self.tag_click_counts = tag_click_counts if tag_click_counts is not None else {}
+        self.update_tags_ui(tags)
 
     def show_tags_dialog(self):
         from ..tags_dialog import TagsDialog
 
-        TAGS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "tags.json")
+        from ..utils.category_utils import load_category_tags
+
         key = self.category_name.lower().replace(" ", "_")
-        with open(TAGS_PATH, "r", encoding="utf-8") as f:
-            tags_data = json.load(f)
-            tags = tags_data.get(key, [])
+        tags = load_category_tags(key)
         dlg = TagsDialog(self.category_name, tags, self)
         if dlg.exec():
             # Si el diálogo se cerró con aceptar, actualizar los tags en la UI
-            self.update_tags_ui(tags)
+            self.update_tags_ui(dlg.tags)
+            self.tags_changed.emit(self.category_name, dlg.tags)
 
     def setup_styles(self):
         """Configura los estilos de la tarjeta"""
@@ -205,15 +154,13 @@ class CategoryCard(QFrame):
             }}
         """)
 
-    def setup_debounce(self):
-        """Configura el debounce para el input"""
-        self.debounce_timer = QTimer()
-        self.debounce_timer.setSingleShot(True)
-        self.debounce_timer.timeout.connect(self.update_prompt)
-
     def on_input_change(self):
-        """Maneja cambios en el input con debounce"""
-        self.debounce_timer.start(500)  # 500ms debounce
+        """Marca la categoría como modificada; el planificador agrupa los cambios"""
+        if self.scheduler:
+            snake_case_name = self.category_name.lower().replace(" ", "_")
+            self.scheduler.mark_dirty(snake_case_name, self.input_field.text())
+        else:
+            self.update_prompt()
 
     def update_prompt(self):
         """Actualiza el prompt basado en el valor del input"""
@@ -222,11 +169,10 @@ class CategoryCard(QFrame):
         
         value = self.input_field.text()
         if self.prompt_generator:
-            validated_value = self.prompt_generator.validate_input(value)
-            # En el método donde se llama a update_category, agregar el mapeo:
-            # Convertir nombre de categoría al formato snake_case
+            # El PromptGenerator guarda el estado; la tarjeta solo lo refleja.
+            # Se guarda el texto tal cual (el grid ya lo hacía así al actualizar el prompt)
             snake_case_name = self.category_name.lower().replace(" ", "_")
-            self.prompt_generator.update_category(snake_case_name, validated_value)
+            self.prompt_generator.update_category(snake_case_name, value)
             self.value_changed.emit()  # Emitir señal cuando cambie el valor
 
     def toggle_edit_mode(self):
@@ -288,6 +234,7 @@ class CategoryCard(QFrame):
             count -= 1
         count = max(0, count)
         self.tag_click_counts[tag] = count
+        self.tag_strip.refresh_tag(tag)
     
         # Quita versiones anteriores del tag en el input_field
         current = self.input_field.text()
@@ -0,0 +1,177 @@
+from PyQt6.QtWidgets import QWidget, QSizePolicy, QToolTip
+from PyQt6.QtCore import Qt, QRect, QSize, QEvent, pyqtSignal
+from PyQt6.QtGui import QPainter, QColor, QPen, QFont, QFontMetrics
+
+# Colores de los chips (los mismos que usaban los botones de tag)
+CHIP_BG = "#404040"
+CHIP_ACTIVE_BG = "#312e81"
+CHIP_BORDER = "#6366f1"
+CHIP_HOVER_BG = "#6366f1"
+CHIP_TEXT = "#e0e0e0"
+MORE_BG = "#6366f1"
+MORE_HOVER_BG = "#4f46e5"
+MORE_TEXT = "ver tags"
+
+
+class TagStrip(QWidget):
+    """Fila de tags pintada en un solo widget: los chips se dibujan y se detectan por posición"""
+
+    tag_clicked = pyqtSignal(str, bool)  # (tag, aumentar)
+    more_clicked = pyqtSignal()
+
+    def __init__(self, parent=None, padding=8, spacing=6):
+        super().__init__(parent)
+        self.padding = padding
+        self.spacing = spacing
+        self.tags = []
+        self.counts = {}
+        self.chips = []          # [(tag, QRect)] de los chips que caben en el ancho actual
+        self.more_rect = None
+        self.hovered = None      # tag bajo el cursor, o MORE_TEXT
+
+        font = QFont(self.font())
+        font.setPixelSize(10)
+        self.setFont(font)
+        self.metrics = QFontMetrics(font)
+        self.chip_height = self.metrics.height() + 10
+
+        self.setMouseTracking(True)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+        self.setFixedHeight(self.chip_height + 2)
+
+    def set_tags(self, tags, counts=None):
+        """Reemplaza los tags y el diccionario de importancia (compartido con la tarjeta)"""
+        self.tags = list(tags or [])
+        self.counts = counts if counts is not None else {}
+        self.hovered = None
+        self.layout_chips()
+        self.update()
+
+    def refresh_tag(self, tag):
+        """Repinta solo el chip de un tag (p. ej. tras cambiar su importancia)"""
+        rect = self.chip_rect(tag)
+        if rect is not None:
+            self.update(rect.adjusted(-1, -1, 1, 1))
+
+    def chip_rect(self, tag):
+        """Rectángulo de un chip visible, o None si no cabe en la fila"""
+        if tag == MORE_TEXT:
+            return self.more_rect
+        for chip_tag, rect in self.chips:
+            if chip_tag == tag:
+                return rect
+        return None
+
+    def chip_width(self, text):
+        return self.metrics.horizontalAdvance(text) + 2 * self.padding
+
+    def layout_chips(self):
+        """Calcula qué chips caben en una fila, dejando sitio para 'ver tags'"""
+        self.chips = []
+        self.more_rect = None
+        if not self.tags:
+            return
+
+        top = 1
+        more_width = self.chip_width(MORE_TEXT)
+        available = self.width() - more_width - self.spacing
+        x = 0
+        for tag in self.tags:
+            width = self.chip_width(tag)
+            if x + width > available:
+                break
+            self.chips.append((tag, QRect(x, top, width, self.chip_height)))
+            x += width + self.spacing
+        self.more_rect = QRect(x, top, more_width, self.chip_height)
+
+    def hit_test(self, pos):
+        """Devuelve el tag (o MORE_TEXT) bajo una posición"""
+        if self.more_rect is not None and self.more_rect.contains(pos):
+            return MORE_TEXT
+        for tag, rect in self.chips:
+            if rect.contains(pos):
+                return tag
+        return None
+
+    def sizeHint(self):
+        return QSize(200, self.chip_height + 2)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.layout_chips()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        clip = event.rect()
+
+        for tag, rect in self.chips:
+            if not rect.intersects(clip):
+                continue
+            if tag == self.hovered:
+                background, text_color = CHIP_HOVER_BG, "#ffffff"
+            elif self.counts.get(tag, 0) > 0:
+                background, text_color = CHIP_ACTIVE_BG, "#ffffff"
+            else:
+                background, text_color = CHIP_BG, CHIP_TEXT
+            painter.setPen(QPen(QColor(CHIP_BORDER), 1))
+            painter.setBrush(QColor(background))
+            painter.drawRoundedRect(rect.adjusted(0, 0, -1, -1), 12, 12)
+            painter.setPen(QColor(text_color))
+            painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, tag)
+
+        if self.more_rect is not None and self.more_rect.intersects(clip):
+            background = MORE_HOVER_BG if self.hovered == MORE_TEXT else MORE_BG
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor(background))
+            painter.drawRoundedRect(self.more_rect, 10, 10)
+            painter.setPen(QColor("#ffffff"))
+            painter.drawText(self.more_rect, Qt.AlignmentFlag.AlignCenter, MORE_TEXT)
+
+        painter.end()
+
+    def set_hovered(self, target):
+        """Cambia el chip resaltado repintando solo los dos chips afectados"""
+        if target == self.hovered:
+            return
+        previous, self.hovered = self.hovered, target
+        for tag in (previous, target):
+            if tag is not None:
+                self.refresh_tag(tag)
+        if target is None:
+            self.unsetCursor()
+        else:
+            self.setCursor(Qt.CursorShape.PointingHandCursor)
+
+    def mouseMoveEvent(self, event):
+        self.set_hovered(self.hit_test(event.position().toPoint()))
+        super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        self.set_hovered(None)
+        super().leaveEvent(event)
+
+    def mousePressEvent(self, event):
+        target = self.hit_test(event.position().toPoint())
+        if target is None:
+            super().mousePressEvent(event)
+            return
+        if target == MORE_TEXT:
+            if event.button() == Qt.MouseButton.LeftButton:
+                self.more_clicked.emit()
+        elif event.button() == Qt.MouseButton.LeftButton:
+            self.tag_clicked.emit(target, True)
+        elif event.button() == Qt.MouseButton.RightButton:
+            self.tag_clicked.emit(target, False)
+        event.accept()
+
+    def event(self, event):
+        if event.type() == QEvent.Type.ToolTip:
+            target = self.hit_test(event.pos())
+            if target is not None and target != MORE_TEXT:
+                QToolTip.showText(event.globalPos(), f"{target} (importancia: {self.counts.get(target, 0)})", self)
+            else:
+                QToolTip.hideText()
+                event.ignore()
+            return True
+        return super().event(event)
@@ -0,0 +1,136 @@
+from PyQt6.QtWidgets import QScrollArea, QWidget
+from PyQt6.QtCore import Qt, QRect
+
+
+class VirtualCardGrid(QScrollArea):
+    """Grid con scroll que solo construye las tarjetas visibles (más un margen) y las recicla"""
+
+    def __init__(self, create_card, bind_card, columns=3, spacing=8, margin=8, overscan_rows=1, parent=None):
+        super().__init__(parent)
+        # create_card() -> QWidget nuevo; bind_card(card, item) lo asocia a un elemento
+        self.create_card = create_card
+        self.bind_card = bind_card
+        self.columns = columns
+        self.spacing = spacing
+        self.margin = margin
+        self.overscan_rows = overscan_rows
+
+        self.items = []
+        self.active = {}      # índice del elemento -> tarjeta asociada
+        self.pool = []        # tarjetas libres para reutilizar
+        self.row_height = None
+        self.trailing_widget = None
+
+        self.setWidgetResizable(True)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+
+        self.content = QWidget()
+        self.setWidget(self.content)
+        self.verticalScrollBar().valueChanged.connect(self.update_visible)
+
+    def set_trailing_widget(self, widget):
+        """Widget fijo que ocupa la celda siguiente al último elemento (p. ej. 'Añadir categoría')"""
+        self.trailing_widget = widget
+        widget.setParent(self.content)
+        self.relayout()
+
+    def set_items(self, items):
+        """Reemplaza los elementos del grid; las tarjetas en uso vuelven al pool"""
+        for card in self.active.values():
+            self.release(card)
+        self.active = {}
+        self.items = list(items)
+        self.relayout()
+
+    def refresh_bound(self):
+        """Vuelve a asociar las tarjetas visibles (tras cambiar el estado de fondo)"""
+        for index, card in self.active.items():
+            self.bind_card(card, self.items[index])
+
+    def bound_cards(self):
+        """Tarjetas construidas y asociadas actualmente"""
+        return list(self.active.values())
+
+    def release(self, card):
+        """Devuelve una tarjeta al pool"""
+        card.hide()
+        self.pool.append(card)
+
+    def acquire(self):
+        """Obtiene una tarjeta del pool o construye una nueva"""
+        if self.pool:
+            return self.pool.pop()
+        card = self.create_card()
+        card.setParent(self.content)
+        return card
+
+    def cell_count(self):
+        return len(self.items) + (1 if self.trailing_widget is not None else 0)
+
+    def row_stride(self):
+        return (self.row_height or 0) + self.spacing
+
+    def cell_rect(self, position):
+        """Rectángulo de una celda del grid en coordenadas del contenido"""
+        width = self.viewport().width() - 2 * self.margin
+        column_width = max(1, (width - self.spacing * (self.columns - 1)) // self.columns)
+        row, column = divmod(position, self.columns)
+        x = self.margin + column * (column_width + self.spacing)
+        y = self.margin + row * self.row_stride()
+        return QRect(x, y, column_width, self.row_height)
+
+    def measure_row_height(self):
+        """Calcula la altura de fila con una tarjeta de muestra (que queda en el pool)"""
+        if self.row_height is not None or not self.items:
+            return
+        card = self.acquire()
+        self.bind_card(card, self.items[0])
+        self.row_height = max(card.minimumHeight(), card.sizeHint().height())
+        self.release(card)
+
+    def relayout(self):
+        """Recalcula la altura total del contenido y las tarjetas visibles"""
+        self.measure_row_height()
+        if self.row_height is None:
+            if self.trailing_widget is not None:
+                self.row_height = self.trailing_widget.sizeHint().height()
+            else:
+                return
+        rows = (self.cell_count() + self.columns - 1) // self.columns
+        self.content.setMinimumHeight(2 * self.margin + rows * self.row_stride() - self.spacing)
+        self.update_visible()
+
+    def update_visible(self):
+        """Construye/recicla las tarjetas que intersectan el viewport más el margen de overscan"""
+        if self.row_height is None:
+            return
+
+        stride = self.row_stride()
+        top = self.verticalScrollBar().value()
+        bottom = top + self.viewport().height()
+        first_row = max(0, (top - self.margin) // stride - self.overscan_rows)
+        last_row = max(0, (bottom - self.margin) // stride + self.overscan_rows)
+        first = first_row * self.columns
+        last = min(len(self.items), (last_row + 1) * self.columns)
+        wanted = range(first, last)
+
+        for index in [i for i in self.active if i not in wanted]:
+            self.release(self.active.pop(index))
+
+        for index in wanted:
+            card = self.active.get(index)
+            if card is None:
+                card = self.acquire()
+                self.bind_card(card, self.items[index])
+                self.active[index] = card
+            card.setGeometry(self.cell_rect(index))
+            card.show()
+
+        if self.trailing_widget is not None:
+            self.trailing_widget.setGeometry(self.cell_rect(len(self.items)))
+            self.trailing_widget.show()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_visible()
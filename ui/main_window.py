@@ -1,3 +1,4 @@
+import os
 import sys
 from PyQt6.QtWidgets import QApplication, QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QSplitter
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal
@@ -5,12 +6,23 @@ from PyQt6.QtGui import QPalette, QColor, QFont
 from ui.sidebar import SidebarFrame
 from ui.category_grid import CategoryGridFrame
 from ui.prompt_section import PromptSectionFrame
+from ui.utils.data_watcher import DataWatcher
+from ui.utils.startup_loader import StartupLoader
+from logic.sugeprompt_data import read_sugeprompt_data
+from logic.startup_profile import measure, print_report
 from logic.prompt_generator import PromptGenerator
+from logic.session_journal import SessionJournal
+from logic.json_store import flush_writes
+from logic.startup_snapshot import get_startup_snapshot
+from config.settings import AppSettings
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         
+        # Reporte de tiempos de import y construcción al terminar el arranque
+        self.startup_report = AppSettings().get_setting("startup_report", False)
+        
         # Inicializar el generador de prompts
         self.prompt_generator = PromptGenerator()
         
@@ -23,10 +35,19 @@ class MainWindow(QMainWindow):
         # Conectar señales
         self.connect_signals()
         
+        # Restaurar la sesión anterior y empezar a registrar cambios
+        self.setup_session_journal()
+        
+        # Recargar en caliente lo que se edite en data/ mientras la app está abierta
+        self.setup_data_watcher()
+        
         # Configurar tema y tamaño
         self.set_dark_theme()
         self.setup_responsive_size()
         self.center_window()
+        
+        # Leer personajes, variaciones, presets y sugerencias en paralelo
+        self.setup_startup_loader()
     
     def setup_ui(self):
         """Configura la interfaz de usuario"""
@@ -40,7 +61,9 @@ class MainWindow(QMainWindow):
         main_layout.setSpacing(8)
         
         # Crear componentes principales
-        self.sidebar = SidebarFrame(self.prompt_generator, self)  # ← Pasar self (MainWindow)
+        # Las listas del sidebar se llenan desde el StartupLoader (la ventana se muestra antes)
+        with measure("construcción", "SidebarFrame"):
+            self.sidebar = SidebarFrame(self.prompt_generator, self, deferred_load=True)  # ← Pasar self (MainWindow)
         main_layout.addWidget(self.sidebar)
         
         # Contenedor principal para categorías y prompt
@@ -53,11 +76,13 @@ class MainWindow(QMainWindow):
         container_layout.setSpacing(8)
         
         # Sección de categorías
-        self.category_grid = CategoryGridFrame(self.prompt_generator, self)
+        with measure("construcción", "CategoryGridFrame"):
+            self.category_grid = CategoryGridFrame(self.prompt_generator, self)
         container_layout.addWidget(self.category_grid, 2)  # 2 = más espacio para categorías
         
         # Sección de prompt
-        self.prompt_section = PromptSectionFrame(self.prompt_generator)
+        with measure("construcción", "PromptSectionFrame"):
+            self.prompt_section = PromptSectionFrame(self.prompt_generator)
         container_layout.addWidget(self.prompt_section, 1)  # 1 = menos espacio para prompt
 
     def setup_responsive_size(self):
@@ -133,14 +158,81 @@ class MainWindow(QMainWindow):
         self.sidebar.variation_applied.connect(self.apply_variation)
         
         # Conectar señales de variaciones
-        self.category_grid.category_value_changed.connect(self.sidebar.track_category_change)
+        self.category_grid.category_values_changed.connect(self.sidebar.track_category_changes)
         
         # Conectar señal para actualizar dropdown de personajes
         self.category_grid.character_saved.connect(self.sidebar.add_character_to_dropdown)
-        
-        # Conectar señal de presets
-        self.sidebar.presets_panel.preset_loaded.connect(self.apply_preset)
+        # La señal de presets se conecta al construir su pestaña (SidebarFrame.create_presets_panel)
 
+    def setup_session_journal(self):
+        """Restaura el último estado del grid desde el diario si auto_save está activo"""
+        self.session_journal = None
+        if not AppSettings().get_setting("auto_save", True):
+            return
+        
+        self.session_journal = SessionJournal()
+        values = self.session_journal.load()
+        if values:
+            self.category_grid.apply_values(values)
+            # La restauración no es un paso deshacible
+            self.category_grid.history.reset(self.category_grid.get_values_by_key())
+        self.session_journal.start(values)
+        self.category_grid.category_values_changed.connect(self.journal_changes)
+    
+    def setup_data_watcher(self):
+        """Conecta cada tipo de cambio en data/ con la actualización mínima que le corresponde"""
+        data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+        polling = AppSettings().get_setting("file_watcher_polling", False)
+        self.data_watcher = DataWatcher(data_dir, polling=polling, parent=self)
+        
+        # Los paneles de presets y variaciones se construyen al abrir su pestaña: el sidebar reenvía
+        self.data_watcher.tags_changed.connect(self.category_grid.reload_tags)
+        self.data_watcher.preset_folder_changed.connect(self.sidebar.on_preset_folder_changed)
+        self.data_watcher.preset_folders_changed.connect(self.sidebar.on_preset_folders_changed)
+        self.data_watcher.variations_changed.connect(self.sidebar.on_variations_file_changed)
+        self.data_watcher.character_changed.connect(self.sidebar.on_character_file_changed)
+        self.data_watcher.characters_changed.connect(self.sidebar.refresh_characters)
+    
+    def setup_startup_loader(self):
+        """Lanza las lecturas del arranque en segundo plano; cada panel se llena al recibir sus datos"""
+        sidebar = self.sidebar
+        
+        self.startup_loader = StartupLoader(verbose=self.startup_report, parent=self)
+        self.startup_loader.add_stage(
+            "personajes", sidebar.read_characters,
+            lambda characters: sidebar.show_characters(characters) if characters is not None else sidebar.setup_data())
+        # Variaciones y presets se guardan en el sidebar hasta que se abra su pestaña
+        self.startup_loader.add_stage(
+            "variaciones", sidebar.variations_manager.get_variations_manifest,
+            lambda manifest: sidebar.apply_startup_data("variaciones", manifest))
+        self.startup_loader.add_stage(
+            "presets", sidebar.presets_manager.read_folder_index,
+            lambda folders: sidebar.apply_startup_data("presets", folders))
+        # Solo deja parseadas las opciones en el snapshot: el diálogo las lee al abrirse
+        self.startup_loader.add_stage("sugeprompt", read_sugeprompt_data, lambda data: None)
+        # El snapshot se guarda cuando ya se leyó todo lo del arranque
+        self.startup_loader.finished.connect(get_startup_snapshot().save)
+        if self.startup_report:
+            self.startup_loader.finished.connect(print_report)
+        self.startup_loader.start()
+    
+    def journal_changes(self, changes):
+        """Envía al diario solo las categorías que cambiaron"""
+        self.session_journal.append(self.category_grid.changes_to_values(changes))
+    
+    def closeEvent(self, event):
+        """Cierra el diario de sesión (escribe lo pendiente y compacta), cancela los envíos al backend
+        y las precargas de los paneles y espera los guardados en segundo plano"""
+        if self.session_journal is not None:
+            self.category_grid.scheduler.flush()
+            self.session_journal.close()
+        self.prompt_section.close_backend()
+        self.sidebar.shutdown()
+        flush_writes()
+        # Incluye los shards y personajes leídos durante la sesión
+        get_startup_snapshot().save()
+        super().closeEvent(event)
+    
     def apply_preset(self, preset_data):
         """Aplica un preset a las categorías"""
         if 'categories' in preset_data:
@@ -0,0 +1,4 @@
+from .presets_model import PresetsTreeModel, PresetsFilterProxy, PresetNameIndex
+from .variations_model import VariationsTreeModel
+
+__all__ = ['PresetsTreeModel', 'PresetsFilterProxy', 'PresetNameIndex', 'VariationsTreeModel']
@@ -0,0 +1,274 @@
+from PyQt6.QtCore import Qt, QAbstractItemModel, QModelIndex, QSortFilterProxyModel
+from typing import Dict, List, Optional, Set, Tuple
+
+# Cantidad de presets que se agregan al árbol en cada fetchMore
+FETCH_BATCH_SIZE = 500
+
+# Roles propios del modelo
+NODE_TYPE_ROLE = Qt.ItemDataRole.UserRole
+CATEGORY_ID_ROLE = Qt.ItemDataRole.UserRole + 1
+PRESET_ID_ROLE = Qt.ItemDataRole.UserRole + 2
+
+
+class PresetNameIndex:
+    """Índice de nombres de presets para filtrar sin recorrer el árbol"""
+
+    def __init__(self):
+        # carpeta -> {preset_id: texto buscable}
+        self.entries: Dict[str, Dict[str, str]] = {}
+        self.folder_names: Dict[str, str] = {}
+
+    def set_folder(self, category_id: str, display_name: str, preset_ids: List[str]):
+        """Registra (o reemplaza) los presets de una carpeta"""
+        self.folder_names[category_id] = display_name.lower()
+        self.entries[category_id] = {pid: pid.replace('_', ' ').lower() for pid in preset_ids}
+
+    def remove_folder(self, category_id: str):
+        """Quita una carpeta del índice"""
+        self.entries.pop(category_id, None)
+        self.folder_names.pop(category_id, None)
+
+    def add_name(self, category_id: str, preset_id: str, name: str):
+        """Agrega el nombre visible de un preset a su texto buscable"""
+        folder = self.entries.setdefault(category_id, {})
+        base = preset_id.replace('_', ' ').lower()
+        folder[preset_id] = f"{base}\n{name.lower()}"
+
+    def search(self, text: str) -> Tuple[Set[str], Dict[str, Set[str]]]:
+        """Devuelve (carpetas cuyo nombre coincide, presets que coinciden por carpeta)"""
+        folders = {cid for cid, name in self.folder_names.items() if text in name}
+        presets = {}
+        for category_id, folder in self.entries.items():
+            matches = {pid for pid, haystack in folder.items() if text in haystack}
+            if matches:
+                presets[category_id] = matches
+        return folders, presets
+
+
+class PresetsTreeModel(QAbstractItemModel):
+    """Modelo de carpetas y presets que carga los hijos bajo demanda y solo guarda ids"""
+
+    def __init__(self, presets_manager, parent=None):
+        super().__init__(parent)
+        self.presets_manager = presets_manager
+        self.name_index = PresetNameIndex()
+
+        self.folders: List[str] = []               # ids de carpetas, en orden
+        self.folder_info: Dict[str, dict] = {}     # id -> {"display_name", "is_custom"}
+        self.loaded: Dict[str, List[str]] = {}     # ids de presets ya insertados
+        self.available: Dict[str, List[str]] = {}  # ids de presets en disco
+
+    # ------------------------------------------------------------------
+    # Carga de datos
+    # ------------------------------------------------------------------
+    def read_folders(self) -> Tuple[Dict[str, dict], Dict[str, List[str]], Dict[str, Dict[str, str]]]:
+        """Lee carpetas, nombres de archivo y nombres visibles de presets (solo disco, para otro hilo)"""
+        return self.presets_manager.read_folder_index()
+
+    def reload(self, folders: Optional[Tuple[Dict[str, dict], Dict[str, List[str]], Dict[str, Dict[str, str]]]] = None):
+        """Vuelve a leer la lista de carpetas (los presets se cargan al expandir).
+        folders permite pasar el resultado de read_folders ya leído en segundo plano; sin él solo
+        se listan los archivos y los nombres visibles llegan después con set_names"""
+        if folders is not None:
+            folder_info, listings, names = folders
+        else:
+            (folder_info, listings), names = self.presets_manager.read_folder_listings(), {}
+        self.beginResetModel()
+        self.folder_info = folder_info
+        self.folders = sorted(self.folder_info)
+        self.loaded = {folder_id: [] for folder_id in self.folders}
+        self.available = {}
+        self.name_index = PresetNameIndex()
+        for folder_id in self.folders:
+            self.refresh_listing(folder_id, listings.get(folder_id))
+        self.set_names(names)
+        self.endResetModel()
+
+    def set_names(self, names: Dict[str, Dict[str, str]]):
+        """Agrega al índice de búsqueda los nombres visibles leídos con read_preset_names
+        (ignora los presets que ya no están en el listado)"""
+        for category_id, folder_names in names.items():
+            available = set(self.available.get(category_id, ()))
+            for preset_id, name in folder_names.items():
+                if preset_id in available:
+                    self.name_index.add_name(category_id, preset_id, name)
+
+    def refresh_listing(self, category_id: str, preset_ids: Optional[List[str]] = None):
+        """Actualiza el listado (solo nombres de archivo) de una carpeta"""
+        if preset_ids is None:
+            preset_ids = self.presets_manager.list_preset_ids(category_id)
+        self.available[category_id] = preset_ids
+        display = self.folder_info.get(category_id, {}).get('display_name', category_id)
+        self.name_index.set_folder(category_id, display, preset_ids)
+
+    def reload_folder(self, category_id: str):
+        """Recarga los presets de una sola carpeta sin reiniciar el modelo"""
+        if category_id not in self.folder_info:
+            self.reload()
+            return
+
+        row = self.folders.index(category_id)
+        parent = self.index(row, 0)
+        loaded = self.loaded.get(category_id, [])
+        if loaded:
+            self.beginRemoveRows(parent, 0, len(loaded) - 1)
+            self.loaded[category_id] = []
+            self.endRemoveRows()
+
+        self.presets_manager.invalidate_cache(category_id)
+        self.refresh_listing(category_id)
+        if loaded:
+            self.fetch_all(parent)
+
+    def fetch_all(self, parent: QModelIndex):
+        """Carga todos los presets pendientes de una carpeta"""
+        while self.canFetchMore(parent):
+            self.fetchMore(parent)
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        if not parent.isValid() or parent.internalId() != 0:
+            return False
+        category_id = self.folders[parent.row()]
+        return len(self.loaded[category_id]) < len(self.available.get(category_id, []))
+
+    def fetchMore(self, parent: QModelIndex):
+        if not parent.isValid() or parent.internalId() != 0:
+            return
+        category_id = self.folders[parent.row()]
+        loaded = self.loaded[category_id]
+        pending = self.available.get(category_id, [])[len(loaded):len(loaded) + FETCH_BATCH_SIZE]
+        if not pending:
+            return
+        self.beginInsertRows(parent, len(loaded), len(loaded) + len(pending) - 1)
+        loaded.extend(pending)
+        self.endInsertRows()
+
+    # ------------------------------------------------------------------
+    # API de QAbstractItemModel
+    # ------------------------------------------------------------------
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        if column != 0 or row < 0:
+            return QModelIndex()
+        if not parent.isValid():
+            if row < len(self.folders):
+                return self.createIndex(row, 0, 0)
+            return QModelIndex()
+        if parent.internalId() != 0:
+            return QModelIndex()
+        if row < len(self.loaded[self.folders[parent.row()]]):
+            # internalId = fila de la carpeta + 1 (0 identifica a las carpetas)
+            return self.createIndex(row, 0, parent.row() + 1)
+        return QModelIndex()
+
+    def parent(self, index: QModelIndex = QModelIndex()) -> QModelIndex:
+        if not index.isValid() or index.internalId() == 0:
+            return QModelIndex()
+        return self.createIndex(index.internalId() - 1, 0, 0)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if not parent.isValid():
+            return len(self.folders)
+        if parent.internalId() != 0:
+            return 0
+        return len(self.loaded[self.folders[parent.row()]])
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 1
+
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if not parent.isValid():
+            return bool(self.folders)
+        if parent.internalId() != 0:
+            return False
+        return bool(self.available.get(self.folders[parent.row()]))
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        if index.internalId() == 0:
+            category_id = self.folders[index.row()]
+            if role == Qt.ItemDataRole.DisplayRole:
+                return self.folder_info[category_id]['display_name']
+            if role == NODE_TYPE_ROLE:
+                return 'category'
+            if role == CATEGORY_ID_ROLE:
+                return category_id
+            return None
+
+        category_id, preset_id = self.get_ids(index)
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.get_preset_name(category_id, preset_id)
+        if role == NODE_TYPE_ROLE:
+            return 'preset'
+        if role == CATEGORY_ID_ROLE:
+            return category_id
+        if role == PRESET_ID_ROLE:
+            return preset_id
+        return None
+
+    # ------------------------------------------------------------------
+    # Utilidades
+    # ------------------------------------------------------------------
+    def get_ids(self, index: QModelIndex) -> Tuple[Optional[str], Optional[str]]:
+        """Devuelve (carpeta, preset) de un índice; preset es None para carpetas"""
+        if not index.isValid():
+            return None, None
+        if index.internalId() == 0:
+            return self.folders[index.row()], None
+        category_id = self.folders[index.internalId() - 1]
+        return category_id, self.loaded[category_id][index.row()]
+
+    def get_preset_name(self, category_id: str, preset_id: str) -> str:
+        """Nombre visible de un preset (se lee solo cuando la vista lo pinta)"""
+        summary = self.presets_manager.get_preset_summary(category_id, preset_id)
+        if not summary:
+            return preset_id.replace('_', ' ')
+        self.name_index.add_name(category_id, preset_id, summary['name'])
+        return summary['name']
+
+    def folder_index(self, category_id: str) -> QModelIndex:
+        """Índice de una carpeta por su id"""
+        if category_id not in self.folder_info:
+            return QModelIndex()
+        return self.index(self.folders.index(category_id), 0)
+
+
+class PresetsFilterProxy(QSortFilterProxyModel):
+    """Proxy que filtra presets consultando el índice de nombres del modelo"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.filter_text = ""
+        self.matching_folders: Set[str] = set()
+        self.matching_presets: Dict[str, Set[str]] = {}
+
+    def set_filter_text(self, text: str):
+        """Aplica un texto de búsqueda (una sola consulta al índice por cambio)"""
+        model = self.sourceModel()
+        self.filter_text = text.lower().strip()
+        if self.filter_text:
+            self.matching_folders, self.matching_presets = model.name_index.search(self.filter_text)
+            # Las carpetas con coincidencias deben tener sus filas cargadas
+            for category_id in self.matching_presets:
+                model.fetch_all(model.folder_index(category_id))
+        else:
+            self.matching_folders, self.matching_presets = set(), {}
+        self.invalidateFilter()
+
+    def matched_folder_ids(self) -> Set[str]:
+        """Carpetas que tienen presets coincidentes con el filtro"""
+        return set(self.matching_presets)
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        if not self.filter_text:
+            return True
+
+        model = self.sourceModel()
+        if not source_parent.isValid():
+            category_id = model.folders[source_row]
+            return category_id in self.matching_folders or category_id in self.matching_presets
+
+        category_id = model.folders[source_parent.row()]
+        preset_id = model.loaded[category_id][source_row]
+        return preset_id in self.matching_presets.get(category_id, ())
@@ -0,0 +1,252 @@
+from PyQt6.QtCore import Qt, QAbstractItemModel, QModelIndex
+from typing import Dict, List, Optional, Tuple
+
+# Roles propios del modelo
+NODE_TYPE_ROLE = Qt.ItemDataRole.UserRole
+CHARACTER_ROLE = Qt.ItemDataRole.UserRole + 1
+VARIATION_ROLE = Qt.ItemDataRole.UserRole + 2
+
+
+class VariationsTreeModel(QAbstractItemModel):
+    """Modelo de personajes y variaciones; los personajes salen del manifiesto y
+    las variaciones se leen solo al expandir cada personaje"""
+
+    def __init__(self, variations_manager, parent=None):
+        super().__init__(parent)
+        self.variations_manager = variations_manager
+
+        self.characters: List[str] = []                   # carpetas, en orden de visualización
+        self.manifest: Dict[str, dict] = {}               # carpeta -> entrada del manifiesto
+        self.children: Dict[str, Optional[List[str]]] = {}  # None = aún no cargado
+
+        # Ids estables por personaje (las filas cambian al insertar/eliminar personajes)
+        self._folder_ids: Dict[str, int] = {}
+        self._id_folders: Dict[int, str] = {}
+
+    # ------------------------------------------------------------------
+    # Carga de datos
+    # ------------------------------------------------------------------
+    def reload(self, character_name: Optional[str] = None, manifest: Optional[Dict[str, dict]] = None):
+        """Relee el manifiesto (opcionalmente filtrando por un personaje).
+        manifest permite pasar el manifiesto ya leído en segundo plano"""
+        if manifest is None:
+            manifest = self.variations_manager.get_variations_manifest()
+        self.beginResetModel()
+        self.manifest = {folder: entry for folder, entry in manifest.items() if entry.get("count")}
+        if character_name:
+            folder = self._folder(character_name)
+            self.manifest = {f: e for f, e in self.manifest.items() if f == folder}
+        self.characters = sorted(self.manifest, key=lambda f: self.manifest[f]["character_name"].lower())
+        self.children = {folder: None for folder in self.characters}
+        self.endResetModel()
+
+    def _folder_id(self, folder: str) -> int:
+        """Id interno estable de un personaje (0 queda reservado para los personajes)"""
+        if folder not in self._folder_ids:
+            new_id = len(self._folder_ids) + 1
+            self._folder_ids[folder] = new_id
+            self._id_folders[new_id] = folder
+        return self._folder_ids[folder]
+
+    def _parent_folder(self, index: QModelIndex) -> str:
+        """Carpeta del personaje padre de una variación"""
+        return self._id_folders[index.internalId()]
+
+    def _folder(self, character_name: str) -> str:
+        """Carpeta de un personaje (misma normalización que VariationsManager)"""
+        return character_name.lower().replace(' ', '_')
+
+    def _refresh_entry(self, folder: str):
+        """Toma del manifiesto (ya actualizado al guardar) la entrada de un personaje"""
+        entry = self.variations_manager.load_manifest().get(folder)
+        self.manifest[folder] = entry or dict(self.manifest[folder], count=0)
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        if not parent.isValid() or parent.internalId() != 0:
+            return False
+        return self.children[self.characters[parent.row()]] is None
+
+    def fetchMore(self, parent: QModelIndex):
+        if not self.canFetchMore(parent):
+            return
+        folder = self.characters[parent.row()]
+        names = self.variations_manager.get_variation_names(folder)
+        self.children[folder] = []
+        if names:
+            self.beginInsertRows(parent, 0, len(names) - 1)
+            self.children[folder] = names
+            self.endInsertRows()
+
+    # ------------------------------------------------------------------
+    # Actualizaciones puntuales
+    # ------------------------------------------------------------------
+    def upsert_variation(self, character_name: str, variation_name: str):
+        """Refleja el guardado de una variación modificando una sola fila"""
+        folder = self._folder(character_name)
+
+        if folder not in self.manifest:
+            entry = self.variations_manager.get_variations_manifest().get(folder)
+            if entry:
+                self._insert_character(folder, entry)
+            return
+
+        character_index = self.index(self.characters.index(folder), 0)
+        self._refresh_entry(folder)
+        children = self.children[folder]
+        if children is None:
+            # Todavía no se expandió: basta con avisar que el personaje cambió
+            self.dataChanged.emit(character_index, character_index)
+            return
+
+        if variation_name in children:
+            row = children.index(variation_name)
+            variation_index = self.index(row, 0, character_index)
+            self.dataChanged.emit(variation_index, variation_index)
+            return
+
+        row = len(children)
+        self.beginInsertRows(character_index, row, row)
+        children.append(variation_name)
+        self.endInsertRows()
+        self.dataChanged.emit(character_index, character_index)
+
+    def remove_variation(self, character_name: str, variation_name: str):
+        """Quita una sola fila tras eliminar una variación"""
+        folder = self._folder(character_name)
+        if folder not in self.manifest:
+            return
+
+        character_row = self.characters.index(folder)
+        character_index = self.index(character_row, 0)
+        self._refresh_entry(folder)
+
+        if self.manifest[folder]["count"] == 0:
+            self._remove_character(folder)
+            return
+
+        children = self.children[folder]
+        if children and variation_name in children:
+            row = children.index(variation_name)
+            self.beginRemoveRows(character_index, row, row)
+            del children[row]
+            self.endRemoveRows()
+        self.dataChanged.emit(character_index, character_index)
+
+    def _insert_character(self, folder: str, entry: dict):
+        """Inserta la fila de un personaje en su posición alfabética"""
+        names = sorted(self.characters + [folder],
+                       key=lambda f: (self.manifest.get(f) or entry)["character_name"].lower())
+        row = names.index(folder)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.manifest[folder] = entry
+        self.characters.insert(row, folder)
+        self.children[folder] = None
+        self.endInsertRows()
+
+    def _remove_character(self, folder: str):
+        row = self.characters.index(folder)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.characters[row]
+        del self.manifest[folder]
+        del self.children[folder]
+        self.endRemoveRows()
+
+    def refresh_character(self, folder: str):
+        """Relee las variaciones de un solo personaje (p. ej. tras editar su archivo fuera de la app)"""
+        entry = self.variations_manager.get_variations_manifest().get(folder)
+        has_variations = bool(entry and entry.get("count"))
+        if folder not in self.manifest:
+            if has_variations:
+                self._insert_character(folder, entry)
+            return
+        if not has_variations:
+            self._remove_character(folder)
+            return
+
+        character_index = self.index(self.characters.index(folder), 0)
+        self.manifest[folder] = entry
+        children = self.children[folder]
+        if children:
+            self.beginRemoveRows(character_index, 0, len(children) - 1)
+            self.children[folder] = []
+            self.endRemoveRows()
+        if children is not None:
+            # Ya estaba expandido: volver a listar solo este personaje
+            names = self.variations_manager.get_variation_names(folder)
+            if names:
+                self.beginInsertRows(character_index, 0, len(names) - 1)
+                self.children[folder] = names
+                self.endInsertRows()
+        self.dataChanged.emit(character_index, character_index)
+
+    # ------------------------------------------------------------------
+    # API de QAbstractItemModel
+    # ------------------------------------------------------------------
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        if column != 0 or row < 0:
+            return QModelIndex()
+        if not parent.isValid():
+            if row < len(self.characters):
+                return self.createIndex(row, 0, 0)
+            return QModelIndex()
+        if parent.internalId() != 0:
+            return QModelIndex()
+        folder = self.characters[parent.row()]
+        if row < len(self.children[folder] or []):
+            return self.createIndex(row, 0, self._folder_id(folder))
+        return QModelIndex()
+
+    def parent(self, index: QModelIndex = QModelIndex()) -> QModelIndex:
+        if not index.isValid() or index.internalId() == 0:
+            return QModelIndex()
+        return self.createIndex(self.characters.index(self._parent_folder(index)), 0, 0)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if not parent.isValid():
+            return len(self.characters)
+        if parent.internalId() != 0:
+            return 0
+        return len(self.children[self.characters[parent.row()]] or [])
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 1
+
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if not parent.isValid():
+            return bool(self.characters)
+        return parent.internalId() == 0
+
+    def headerData(self, section: int, orientation, role: int = Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return "Personaje/Variación"
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        character_name, variation_name = self.get_names(index)
+        if role == Qt.ItemDataRole.DisplayRole:
+            return variation_name if variation_name is not None else character_name
+        if role == Qt.ItemDataRole.ToolTipRole and variation_name is None:
+            return f"{self.manifest[self.characters[index.row()]].get('count', 0)} variaciones"
+        if role == NODE_TYPE_ROLE:
+            return 'character' if variation_name is None else 'variation'
+        if role == CHARACTER_ROLE:
+            return character_name
+        if role == VARIATION_ROLE:
+            return variation_name
+        return None
+
+    # ------------------------------------------------------------------
+    # Utilidades
+    # ------------------------------------------------------------------
+    def get_names(self, index: QModelIndex) -> Tuple[Optional[str], Optional[str]]:
+        """Devuelve (personaje, variación); variación es None para personajes"""
+        if not index.isValid():
+            return None, None
+        if index.internalId() == 0:
+            folder = self.characters[index.row()]
+            return self.manifest[folder]["character_name"], None
+        folder = self._parent_folder(index)
+        return self.manifest[folder]["character_name"], self.children[folder][index.row()]
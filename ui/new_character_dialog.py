@@ -4,10 +4,8 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, pyqtSignal  # Agregar pyqtSignal aquí
 from PyQt6.QtGui import QFont
-import os
-import json
 import re
-from datetime import datetime
+from core import get_library
 
 class NewCharacterDialog(QDialog):
     """Diálogo para crear un nuevo personaje"""
@@ -167,63 +165,15 @@ class NewCharacterDialog(QDialog):
     
     def save_character_data(self, name):
         """Guarda los datos del personaje en el archivo JSON"""
-        # Crear directorio de personajes si no existe
-        characters_dir = os.path.join("data", "characters")
-        os.makedirs(characters_dir, exist_ok=True)
-        
-        # Normalizar nombre para el archivo
-        normalized_name = name.lower().replace(" ", "_")
-        character_folder = os.path.join(characters_dir, normalized_name)
-        
-        # Crear carpeta del personaje
-        os.makedirs(character_folder, exist_ok=True)
-        
-        # Obtener valores actuales de las categorías
-        if self.category_grid:
-            current_values = self.category_grid.get_current_values()
-            
-            # Convertir nombres de categorías al formato snake_case
-            category_data = {}
-            for display_name, value in current_values.items():
-                # Convertir "Cabello forma" -> "cabello_forma"
-                snake_case_name = display_name.lower().replace(" ", "_")
-                category_data[snake_case_name] = value
-        else:
-            category_data = {}
-        
-        # Crear estructura de datos con metadatos
-        character_data = {
-            "metadata": {
-                "character_name": name,
-                "display_name": name,
-                "created_date": datetime.now().isoformat(),
-                "last_modified": datetime.now().isoformat(),
-                "version": "1.0",
-                "type": "character",
-                "description": f"Personaje {name} creado desde la aplicación"
-            },
-            "categories": category_data
-        }
-        
-        # Guardar archivo JSON en la carpeta del personaje
-        json_file_path = os.path.join(character_folder, f"{normalized_name}.json")
-        
-        with open(json_file_path, 'w', encoding='utf-8') as f:
-            json.dump(character_data, f, ensure_ascii=False, indent=2)
+        # Obtener valores actuales de las categorías (la biblioteca los guarda en snake_case)
+        category_data = self.category_grid.get_current_values() if self.category_grid else {}
+        json_file_path = get_library().characters.save_character(name, category_data)
         
         print(f"Personaje guardado en: {json_file_path}")
     
     def character_exists(self, name):
         """Verifica si ya existe un personaje con ese nombre"""
-        characters_dir = os.path.join("data", "characters")
-        if not os.path.exists(characters_dir):
-            return False
-        
-        # Normalizar nombre para comparación
-        normalized_name = name.lower().replace(" ", "_")
-        character_folder = os.path.join(characters_dir, normalized_name)
-        
-        return os.path.exists(character_folder)
+        return get_library().characters.exists(name)
     
     def get_character_name(self):
         """Retorna el nombre del personaje ingresado"""
@@ -1,28 +1,50 @@
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QTreeWidget, QTreeWidgetItem,
+    QWidget, QVBoxLayout, QHBoxLayout, QTreeView,
     QPushButton, QLineEdit, QLabel, QMessageBox, QInputDialog,
     QDialog, QComboBox, QCheckBox, QScrollArea, QTextEdit, QFileDialog, QGridLayout,
-    QToolTip, QFrame  # Mantener QToolTip y QFrame
+    QToolTip, QFrame, QListWidget, QListWidgetItem  # Mantener QToolTip y QFrame
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QBuffer, QPoint  # Remover QTimer
-from PyQt6.QtGui import QFont, QPixmap, QCursor
+from PyQt6.QtCore import Qt, pyqtSignal, QBuffer, QPoint, QSize  # Remover QTimer
+from PyQt6.QtGui import QFont, QPixmap, QCursor, QIcon
 from logic.presets_manager import PresetsManager
+from logic.prefetch import Prefetcher
+from logic.startup_profile import timed_import
+from ui.models import PresetsTreeModel, PresetsFilterProxy
 from datetime import datetime  # ← AGREGAR ESTE IMPORT
-from PIL import Image  # Agregar para redimensionar imágenes
+from concurrent.futures import ThreadPoolExecutor
 import os
 import base64
 import io
 
 class PresetsPanel(QWidget):
     preset_loaded = pyqtSignal(dict)  # Emite cuando se carga un preset
+    # Emitida desde el hilo del índice de imágenes: (callback, resultado, error)
+    image_task_finished = pyqtSignal(object, object, object)
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, deferred_load=False, presets_manager=None):
         super().__init__(parent)
         self.parent_widget = parent
-        self.presets_manager = PresetsManager()
+        self.presets_manager = presets_manager or PresetsManager()
+        self.image_index = None  # Se crea al primer uso (búsqueda por imagen)
+        # Un solo hilo usa el índice (y lee los nombres de presets): recorrer y hashear imágenes
+        # o abrir miles de JSON nunca bloquea la interfaz
+        self.image_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-index")
+        self.image_task_finished.connect(self.on_image_task_finished)
+        self.closing = False
+        # Precarga de presets (contenido + miniaturas) al pasar el cursor o la selección
+        self.prefetcher = Prefetcher()
+        # Se crea aquí (no al primer uso) porque varios hilos del prefetcher la comparten
+        from logic.image_index import ThumbnailCache
+        cache_dir = os.path.join(os.path.dirname(self.presets_manager.presets_dir), "cache", "thumbnails")
+        self.thumbnails = ThumbnailCache(cache_dir)
 
+        self.setAcceptDrops(True)
         self.setup_ui()
-        self.load_presets()
+        if deferred_load:
+            # Marcador hasta que el StartupLoader entregue las carpetas
+            self.search_box.setPlaceholderText("⏳ Cargando presets...")
+        else:
+            self.load_presets()
     
     def setup_ui(self):
         """Configura la interfaz del panel de presets"""
@@ -41,14 +63,24 @@ class PresetsPanel(QWidget):
         self.search_box.textChanged.connect(self.filter_presets)
         layout.addWidget(self.search_box)
         
-        # Árbol de presets (organizado por carpetas)
-        self.presets_tree = QTreeWidget()
+        # Árbol de presets (organizado por carpetas, hijos cargados al expandir)
+        self.presets_model = PresetsTreeModel(self.presets_manager, self)
+        self.presets_proxy = PresetsFilterProxy(self)
+        self.presets_proxy.setSourceModel(self.presets_model)
+        
+        self.presets_tree = QTreeView()
+        self.presets_tree.setModel(self.presets_proxy)
         self.presets_tree.setHeaderHidden(True)
+        self.presets_tree.setUniformRowHeights(True)
         # CAMBIO: Configurar para click derecho directo
         self.presets_tree.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.presets_tree.customContextMenuRequested.connect(self.show_preset_preview)
         # Conectar doble clic para cargar preset
-        self.presets_tree.itemDoubleClicked.connect(self.load_selected_preset)
+        self.presets_tree.doubleClicked.connect(self.load_selected_preset)
+        # Precargar el preset bajo el cursor o la selección del teclado
+        self.presets_tree.setMouseTracking(True)
+        self.presets_tree.entered.connect(self.prefetch_preset)
+        self.presets_tree.selectionModel().currentChanged.connect(lambda current, _: self.prefetch_preset(current))
         layout.addWidget(self.presets_tree)
         
         # Botones
@@ -100,50 +132,101 @@ class PresetsPanel(QWidget):
         """)
         buttons_layout.addWidget(save_btn)
         
+        # Botón Buscar por imagen (también se puede soltar una imagen sobre el panel)
+        similar_btn = QPushButton("🔎")
+        similar_btn.setToolTip("Buscar presets parecidos a una imagen")
+        similar_btn.clicked.connect(self.select_image_for_search)
+        similar_btn.setStyleSheet(new_folder_btn.styleSheet())
+        buttons_layout.addWidget(similar_btn)
+        
         # QUITAR EL BOTÓN "+" - ya no se incluye
         
         layout.addLayout(buttons_layout)
     
-    def load_presets(self):
-        """Carga los presets en el árbol"""
-        self.presets_tree.clear()
-        
-        # Obtener todas las carpetas disponibles (predefinidas + personalizadas)
-        all_folders = self.presets_manager.get_all_preset_folders()
-        
-        for folder_id, folder_info in all_folders.items():
-            # Crear nodo padre
-            category_item = QTreeWidgetItem(self.presets_tree)
-            category_item.setText(0, folder_info['display_name'])
-            category_item.setData(0, Qt.ItemDataRole.UserRole, {
-                'type': 'category',
-                'category_id': folder_id,
-                'is_custom': folder_info.get('is_custom', False)
-            })
-            
-            # Cargar presets de esta categoría
-            presets = self.presets_manager.get_presets_by_category(folder_id)
-            for preset_id, preset_data in presets.items():
-                preset_item = QTreeWidgetItem(category_item)
-                preset_item.setText(0, preset_data.get('name', preset_id))
-                preset_item.setData(0, Qt.ItemDataRole.UserRole, {
-                    'type': 'preset',
-                    'category_id': folder_id,
-                    'preset_id': preset_id,
-                    'preset_data': preset_data
-                })
-        
-        # Expandir todos los nodos
-        self.presets_tree.expandAll()
+    def load_presets(self, folders=None):
+        """Recarga las carpetas de presets (los presets se leen al expandir cada carpeta).
+        folders es el resultado de PresetsTreeModel.read_folders si ya se leyó en segundo plano"""
+        self.prefetcher.invalidate()
+        self.presets_model.reload(folders)
+        if folders is None:
+            self.index_preset_names()
+        self.search_box.setPlaceholderText("🔍 Buscar presets...")
+        if self.search_box.text().strip():
+            self.filter_presets(self.search_box.text())
+    
+    def on_preset_folder_changed(self, category_id):
+        """Una carpeta de presets cambió fuera de la app: recargar solo esa carpeta"""
+        self.prefetcher.invalidate_matching(lambda key: key[0] == category_id)
+        # Una carpeta nueva reinicia todo el modelo: hay que volver a leer todos los nombres
+        known = category_id in self.presets_model.folder_info
+        self.presets_model.reload_folder(category_id)
+        self.index_preset_names([category_id] if known else None)
+        if self.search_box.text().strip():
+            self.filter_presets(self.search_box.text())
+    
+    def index_preset_names(self, category_ids=None):
+        """Lee en segundo plano los nombres visibles de las carpetas (todas si no se indican) para que
+        el buscador encuentre presets que aún no se pintaron"""
+        available = self.presets_model.available
+        listings = {cid: list(available.get(cid, [])) for cid in (category_ids or list(available))}
+        self.run_image_task(lambda: self.presets_manager.read_preset_names(listings),
+                            self.on_preset_names_read)
     
-    def load_selected_preset(self, item, column):
+    def on_preset_names_read(self, names, error):
+        if error is not None:
+            print(f"Error leyendo nombres de presets: {error}")
+            return
+        self.presets_model.set_names(names)
+        if self.search_box.text().strip():
+            self.filter_presets(self.search_box.text())
+    
+    def get_preset_ids(self, index):
+        """Devuelve (carpeta, preset) para un índice de la vista; preset es None en carpetas"""
+        if not index.isValid():
+            return None, None
+        return self.presets_model.get_ids(self.presets_proxy.mapToSource(index))
+    
+    def load_preset_bundle(self, category_id, preset_id):
+        """Lee un preset y genera las miniaturas de sus primeras imágenes (se ejecuta en segundo plano)"""
+        preset_data = self.presets_manager.load_preset(category_id, preset_id)
+        if preset_data is None:
+            return None
+        
+        thumbnails = []
+        for image_path in preset_data.get('images', [])[:4]:
+            thumb_path = self.thumbnails.get_thumbnail_path(image_path)
+            if thumb_path:
+                with open(thumb_path, 'rb') as f:
+                    thumbnails.append(base64.b64encode(f.read()).decode())
+        return {'data': preset_data, 'thumbnails': thumbnails}
+    
+    def prefetch_preset(self, index):
+        """Precarga el preset de un índice de la vista (las carpetas se ignoran)"""
+        category_id, preset_id = self.get_preset_ids(index)
+        if preset_id is None:
+            return
+        self.prefetcher.prefetch(
+            (category_id, preset_id),
+            lambda: self.load_preset_bundle(category_id, preset_id),
+            lambda: self.presets_manager.get_preset_stamp(category_id, preset_id)
+        )
+    
+    def get_preset_bundle(self, category_id, preset_id):
+        """Contenido y miniaturas de un preset, desde la precarga si está disponible"""
+        return self.prefetcher.get(
+            (category_id, preset_id),
+            lambda: self.load_preset_bundle(category_id, preset_id),
+            lambda: self.presets_manager.get_preset_stamp(category_id, preset_id)
+        )
+    
+    def load_selected_preset(self, index):
         """Carga el preset seleccionado al hacer doble clic con confirmación"""
         # Verificar que es un preset (no una carpeta)
-        if item.parent() is None:
+        category_id, preset_id = self.get_preset_ids(index)
+        if preset_id is None:
             return  # Es una carpeta, no un preset
             
-        preset_name = item.text(0)
-        folder_name = item.parent().text(0).replace('📂 ', '')
+        preset_name = index.data()
         
         # Mostrar diálogo de confirmación
         reply = QMessageBox.question(
@@ -158,11 +241,9 @@ class PresetsPanel(QWidget):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            # Cargar el preset
-            preset_data = self.presets_manager.load_preset(
-                folder_name.lower().replace(' ', '_'), 
-                preset_name
-            )
+            # Cargar el preset (normalmente ya precargado al pasar el cursor)
+            bundle = self.get_preset_bundle(category_id, preset_id)
+            preset_data = bundle['data'] if bundle else None
             
             if preset_data:
                 # Agregar el nombre del preset a los datos antes de emitir la señal
@@ -444,6 +525,8 @@ class PresetsPanel(QWidget):
                 # Limitar a los espacios disponibles
                 files_to_process = file_paths[:remaining_slots]
                 
+                # PIL se importa al primer uso
+                Image = timed_import("PIL.Image")
                 for file_path in files_to_process:
                     try:
                         # Cargar y redimensionar la imagen
@@ -475,6 +558,7 @@ class PresetsPanel(QWidget):
                 loaded_count = len(files_to_process)
                 if loaded_count > 0:
                     QMessageBox.information(dialog, "Imágenes cargadas", f"Se cargaron {loaded_count} imagen(es) correctamente.")
+                    self.warn_duplicate_images(dialog, files_to_process)
         
         def clear_all_images():
             """Limpia todas las imágenes seleccionadas"""
@@ -543,8 +627,11 @@ class PresetsPanel(QWidget):
                 
                 if success:
                     QMessageBox.information(dialog, "Éxito", f"Preset '{preset_name}' guardado correctamente.")
-                    # Recargar la lista de presets
-                    self.load_presets()
+                    # Recargar solo la carpeta afectada
+                    self.presets_model.reload_folder(selected_folder)
+                    self.index_preset_names([selected_folder])
+                    if self.search_box.text().strip():
+                        self.filter_presets(self.search_box.text())
                     dialog.accept()
                 else:
                     QMessageBox.warning(dialog, "Error", "No se pudo guardar el preset.")
@@ -560,22 +647,17 @@ class PresetsPanel(QWidget):
 
     def show_context_menu(self, position):
         """Muestra menú contextual con vista previa de imágenes al hacer click derecho"""
-        item = self.presets_tree.itemAt(position)
-        if not item or item.parent() is None:
+        index = self.presets_tree.indexAt(position)
+        if self.get_preset_ids(index)[1] is None:
             # Es una carpeta o no hay item, no mostrar menú
             return
-            
-        # Obtener datos del preset
-        item_data = item.data(0, Qt.ItemDataRole.UserRole)
-        if not item_data or item_data.get('type') != 'preset':
-            return
         
         # Crear menú contextual
         context_menu = QMenu(self)
         
         # Acción para cargar preset
         load_action = QAction("🔄 Cargar Preset", self)
-        load_action.triggered.connect(lambda: self.load_selected_preset(item, 0))
+        load_action.triggered.connect(lambda: self.load_selected_preset(index))
         context_menu.addAction(load_action)
         
         # Separador
@@ -583,7 +665,7 @@ class PresetsPanel(QWidget):
         
         # Acción para vista previa (que mostrará el tooltip)
         preview_action = QAction("👁️ Vista Previa", self)
-        preview_action.triggered.connect(lambda: self.show_preset_preview(item, position))
+        preview_action.triggered.connect(lambda: self.show_preset_preview(position))
         context_menu.addAction(preview_action)
         
         # Mostrar menú en la posición del click
@@ -592,68 +674,28 @@ class PresetsPanel(QWidget):
 
     def show_preset_preview(self, position):
         """Muestra vista previa de imágenes del preset al hacer click derecho"""
-        print(f"DEBUG: show_preset_preview llamado en posición {position}")
-        
-        item = self.presets_tree.itemAt(position)
-        if not item or item.parent() is None:
-            print("DEBUG: No es un preset válido")
-            return
-            
-        # Obtener datos del preset
-        item_data = item.data(0, Qt.ItemDataRole.UserRole)
-        if not item_data or item_data.get('type') != 'preset':
-            print("DEBUG: Item no tiene datos de preset")
+        index = self.presets_tree.indexAt(position)
+        category_id, preset_id = self.get_preset_ids(index)
+        if preset_id is None:
             return
             
-        preset_data = item_data.get('preset_data', {})
-        preset_name = preset_data.get('name', 'Sin nombre')
-        categories_count = len(preset_data.get('categories', {}))
-        
-        print(f"DEBUG: Preset name: {preset_name}, categories: {categories_count}")
-        
-        # Cargar las rutas completas de las imágenes
-        category_id = item_data.get('category_id')
-        
-        # Usar el presets_manager para cargar las imágenes correctamente
-        full_preset_data = self.presets_manager.load_preset(category_id, preset_name)
-        images = full_preset_data.get('images', []) if full_preset_data else []
-        
-        print(f"DEBUG: Imágenes encontradas: {len(images)}")
+        # Contenido y miniaturas desde la precarga
+        bundle = self.get_preset_bundle(category_id, preset_id)
+        full_preset_data = bundle['data'] if bundle else None
+        preset_name = full_preset_data.get('name', 'Sin nombre') if full_preset_data else 'Sin nombre'
+        categories_count = len(full_preset_data.get('categories', {})) if full_preset_data else 0
+        thumbnails = bundle['thumbnails'] if bundle else []
         
         # Crear contenido del tooltip
         tooltip_html = f"""<div style='background-color: #2d2d2d; padding: 20px; border-radius: 10px; max-width: 600px; min-width: 400px; border: 3px solid #00ff00; box-shadow: 0 4px 8px rgba(0,0,0,0.5);'>
             <h3 style='color: #00ff00; margin: 0 0 15px 0; font-size: 18px; font-weight: bold; text-align: center;'>{preset_name}</h3>
             <p style='color: #ffffff; margin: 0 0 15px 0; font-size: 14px; text-align: center;'>📁 {categories_count} categorías</p>"""
         
-        if images:
-            print(f"DEBUG: Procesando {len(images)} imágenes")
-            # Cargar y mostrar hasta 4 imágenes en miniatura
+        if thumbnails:
+            # Mostrar hasta 4 miniaturas ya generadas
             images_html = "<div style='display: grid; grid-template-columns: repeat(2, 1fr); gap: 10px; margin-top: 15px;'>"
-            for i, image_path in enumerate(images[:4]):
-                print(f"DEBUG: Procesando imagen {i+1}: {image_path}")
-                if os.path.exists(image_path):
-                    try:
-                        # Cargar y redimensionar imagen
-                        pixmap = QPixmap(image_path)
-                        if not pixmap.isNull():
-                            # Redimensionar a 150x150 manteniendo aspecto
-                            scaled_pixmap = pixmap.scaled(150, 150, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                            
-                            # Convertir a base64 para HTML
-                            buffer = QBuffer()
-                            buffer.open(QBuffer.OpenModeFlag.WriteOnly)
-                            scaled_pixmap.save(buffer, "PNG")
-                            image_data = buffer.data().toBase64().data().decode()
-                            
-                            images_html += f"<img src='data:image/png;base64,{image_data}' style='width: 150px; height: 150px; border-radius: 8px; object-fit: cover; border: 2px solid #00ff00; box-shadow: 0 2px 4px rgba(0,255,0,0.3);'>"
-                            print(f"DEBUG: Imagen {i+1} procesada correctamente")
-                        else:
-                            print(f"DEBUG: Error: pixmap nulo para {image_path}")
-                    except Exception as e:
-                        print(f"DEBUG: Error cargando imagen {image_path}: {e}")
-                else:
-                    print(f"DEBUG: Imagen no existe: {image_path}")
-                    
+            for image_data in thumbnails:
+                images_html += f"<img src='data:image/png;base64,{image_data}' width='150' style='border-radius: 8px; border: 2px solid #00ff00;'>"
             images_html += "</div>"
             tooltip_html += images_html
         else:
@@ -666,59 +708,29 @@ class PresetsPanel(QWidget):
         global_pos.setX(global_pos.x() + 15)
         global_pos.setY(global_pos.y() - 15)
         
-        print(f"DEBUG: Posición global del tooltip: {global_pos}")
-        print(f"DEBUG: Contenido HTML del tooltip: {tooltip_html[:200]}...")
-        
         # Mostrar tooltip que permanecerá visible por 15 segundos
         QToolTip.showText(global_pos, tooltip_html, self.presets_tree, self.presets_tree.rect(), 15000)
-        print("DEBUG: QToolTip.showText ejecutado")
 
 
     def filter_presets(self, text):
         """Filtra los presets basado en el texto de búsqueda"""
         search_text = text.lower().strip()
+        self.presets_proxy.set_filter_text(search_text)
         
-        # Iterar por todos los elementos del árbol
-        root = self.presets_tree.invisibleRootItem()
-        for i in range(root.childCount()):
-            folder_item = root.child(i)
-            folder_visible = False
-            
-            # Verificar si el nombre de la carpeta coincide
-            if search_text in folder_item.text(0).lower():
-                folder_visible = True
-            
-            # Verificar presets dentro de la carpeta
-            for j in range(folder_item.childCount()):
-                preset_item = folder_item.child(j)
-                preset_name = preset_item.text(0).lower()
-                
-                if search_text == "" or search_text in preset_name:
-                    preset_item.setHidden(False)
-                    folder_visible = True
-                else:
-                    preset_item.setHidden(True)
-            
-            # Mostrar/ocultar carpeta basado en si tiene presets visibles
-            folder_item.setHidden(not folder_visible)
-            
-            # Expandir carpeta si hay coincidencias y texto de búsqueda
-            if folder_visible and search_text:
-                folder_item.setExpanded(True)
-            elif not search_text:
-                folder_item.setExpanded(False)
+        if not search_text:
+            self.presets_tree.collapseAll()
+            return
+        
+        # Expandir solo las carpetas con presets coincidentes
+        for category_id in self.presets_proxy.matched_folder_ids():
+            source_index = self.presets_model.folder_index(category_id)
+            self.presets_tree.setExpanded(self.presets_proxy.mapFromSource(source_index), True)
 
     def show_all_items(self):
         """Muestra todos los elementos del árbol"""
-        root = self.presets_tree.invisibleRootItem()
-        for i in range(root.childCount()):
-            folder_item = root.child(i)
-            folder_item.setHidden(False)
-            folder_item.setExpanded(False)
-            
-            for j in range(folder_item.childCount()):
-                preset_item = folder_item.child(j)
-                preset_item.setHidden(False)
+        self.search_box.clear()
+        self.presets_proxy.set_filter_text("")
+        self.presets_tree.collapseAll()
 
     def create_new_folder(self):
         """Crea una nueva carpeta para organizar presets"""
@@ -743,3 +755,160 @@ class PresetsPanel(QWidget):
                     self, "Error", f"No se pudo crear la carpeta: {str(e)}"
                 )
 
+    def get_image_index(self):
+        """Obtiene el índice de hashes de imágenes, actualizándolo con los cambios en disco
+        (solo desde el hilo del índice: ver run_image_task)"""
+        if self.image_index is None:
+            from logic.image_index import ImageHashIndex
+            self.image_index = ImageHashIndex()
+        self.image_index.refresh()
+        return self.image_index
+
+    def run_image_task(self, work, callback):
+        """Ejecuta work() en el hilo del índice y luego callback(resultado, error) en la interfaz"""
+        def run():
+            try:
+                result, error = work(), None
+            except Exception as e:
+                result, error = None, e
+            if self.closing:
+                return
+            try:
+                self.image_task_finished.emit(callback, result, error)
+            except RuntimeError:
+                pass  # El panel ya se destruyó
+        self.image_executor.submit(run)
+
+    def on_image_task_finished(self, callback, result, error):
+        callback(result, error)
+
+    def shutdown(self):
+        """Cancela la precarga y las tareas del índice pendientes al cerrar la aplicación
+        (la que esté en curso termina sin avisar al panel)"""
+        self.closing = True
+        self.prefetcher.shutdown()
+        self.image_executor.shutdown(wait=False, cancel_futures=True)
+
+    def dragEnterEvent(self, event):
+        """Acepta imágenes arrastradas para buscar presets parecidos"""
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+
+    def dropEvent(self, event):
+        """Busca presets parecidos a la primera imagen soltada"""
+        for url in event.mimeData().urls():
+            if url.isLocalFile():
+                self.search_similar_presets(url.toLocalFile())
+                break
+
+    def select_image_for_search(self):
+        """Selecciona una imagen del disco para buscar presets parecidos"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Buscar presets parecidos a...",
+            "",
+            "Archivos de imagen (*.png *.jpg *.jpeg *.bmp *.gif *.webp)"
+        )
+        if file_path:
+            self.search_similar_presets(file_path)
+
+    def search_similar_presets(self, image_path):
+        """Busca en segundo plano los presets y referencias visualmente parecidos a una imagen"""
+        def search():
+            results = self.get_image_index().search_similar(image_path)
+            # Las miniaturas de la lista también se generan fuera de la interfaz
+            for result in results:
+                result['thumb_path'] = self.image_index.thumbnails.get_thumbnail_path(result['path'])
+            return results
+
+        self.setCursor(Qt.CursorShape.BusyCursor)
+        self.run_image_task(search, lambda results, error: self.show_similar_presets(image_path, results, error))
+
+    def show_similar_presets(self, image_path, results, error):
+        """Muestra los resultados de search_similar_presets"""
+        self.unsetCursor()
+        if error is not None:
+            QMessageBox.warning(self, "Error", f"No se pudo analizar la imagen: {str(error)}")
+            return
+
+        if not results:
+            QMessageBox.information(self, "Sin resultados", "No se encontraron presets parecidos a esta imagen.")
+            return
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Presets parecidos")
+        dialog.resize(420, 480)
+        layout = QVBoxLayout(dialog)
+        layout.addWidget(QLabel(f"Imágenes parecidas a {os.path.basename(image_path)}:"))
+
+        results_list = QListWidget()
+        results_list.setIconSize(QSize(64, 64))
+        seen = set()
+        for result in results:
+            source = result['source']
+            if source.get('type') == 'preset':
+                key = (source['category_id'], source['preset_id'])
+                if key in seen:
+                    continue
+                seen.add(key)
+                label = f"{source['preset_id'].replace('_', ' ')}  ({source['category_id'].replace('_', ' ')})"
+            elif source.get('type') == 'reference':
+                label = f"Referencia: {source['name']}  ({source['category_id'].replace('_', ' ')})"
+            else:
+                label = result['key']
+            if result['duplicate']:
+                label = f"⚠️ Casi idéntica — {label}"
+            label += f"  · distancia {result['phash_distance']}"
+
+            list_item = QListWidgetItem(label)
+            if result['thumb_path']:
+                list_item.setIcon(QIcon(result['thumb_path']))
+            list_item.setData(Qt.ItemDataRole.UserRole, source)
+            results_list.addItem(list_item)
+
+        def open_result(list_item):
+            """Carga el preset elegido en la lista de resultados"""
+            source = list_item.data(Qt.ItemDataRole.UserRole) or {}
+            if source.get('type') != 'preset':
+                return
+            preset_data = self.presets_manager.load_preset(source['category_id'], source['preset_id'])
+            if preset_data:
+                preset_data['preset_display_name'] = preset_data.get('name', source['preset_id'])
+                self.preset_loaded.emit(preset_data)
+                dialog.accept()
+
+        results_list.itemDoubleClicked.connect(open_result)
+        layout.addWidget(results_list)
+
+        close_btn = QPushButton("Cerrar")
+        close_btn.clicked.connect(dialog.reject)
+        layout.addWidget(close_btn)
+        dialog.exec()
+
+    def warn_duplicate_images(self, parent, image_paths):
+        """Avisa (al terminar de comprobarlo en segundo plano) si alguna imagen adjunta ya existe
+        casi idéntica en otro preset"""
+        self.run_image_task(
+            lambda: self.get_image_index().find_duplicates_for(image_paths),
+            lambda duplicates, error: self.show_duplicate_images(parent, duplicates, error)
+        )
+
+    def show_duplicate_images(self, parent, duplicates, error):
+        """Muestra el aviso de warn_duplicate_images"""
+        if error is not None:
+            print(f"Error buscando imágenes duplicadas: {error}")
+            return
+
+        if not duplicates:
+            return
+
+        lines = []
+        for path, matches in duplicates.items():
+            source = matches[0]['source']
+            owner = source.get('preset_id') or source.get('name') or matches[0]['key']
+            lines.append(f"• {os.path.basename(path)} → {owner.replace('_', ' ')}")
+        QMessageBox.information(
+            parent if parent.isVisible() else self,
+            "Imágenes repetidas",
+            "Estas imágenes son casi idénticas a otras ya guardadas:\n\n" + "\n".join(lines)
+        )
@@ -2,18 +2,26 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QPushButton, QTextEdit, QFrame, QSizePolicy, QFileDialog, QListWidget)
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 from PyQt6.QtGui import QFont, QKeySequence, QShortcut, QIcon
-import pyperclip
 import json
 import os
+import queue
 from datetime import datetime
+from logic.startup_profile import timed_import
 from config.settings import AppSettings
 
 class PromptSectionFrame(QFrame):
+    # Emitida desde los hilos del cliente del backend; Qt la entrega en el hilo de la interfaz
+    backend_job_finished = pyqtSignal(object)
+    
     def __init__(self, prompt_generator):
         super().__init__()
         self.prompt_generator = prompt_generator
         self.settings = AppSettings()
         
+        # Cliente del backend de generación (se crea al enviar el primer prompt)
+        self.backend_client = None
+        self.backend_job_finished.connect(self.on_backend_job_finished)
+        
         # Inicializar popup de configuración
         self.config_popup = None
         
@@ -56,6 +64,17 @@ class PromptSectionFrame(QFrame):
         self.export_btn.clicked.connect(self.export_prompt)
         buttons_layout.addWidget(self.export_btn)
         
+        self.send_btn = QPushButton("Enviar")
+        self.send_btn.setFixedSize(100, 32)
+        self.send_btn.setToolTip("Enviar el prompt al backend de generación (A1111/ComfyUI)")
+        self.send_btn.clicked.connect(self.send_prompt)
+        buttons_layout.addWidget(self.send_btn)
+        
+        # Estadísticas del prompt (se calculan una vez por actualización)
+        self.stats_label = QLabel("")
+        self.stats_label.setStyleSheet("color: #a0a0a0; font-size: 11px;")
+        buttons_layout.addWidget(self.stats_label)
+        
         # Espacio flexible para empujar el botón de configuración a la derecha
         buttons_layout.addStretch()
         
@@ -208,7 +227,7 @@ class PromptSectionFrame(QFrame):
         """Copia el prompt al portapapeles"""
         prompt_content = self.prompt_text.toPlainText()
         if prompt_content and prompt_content != "Aquí aparecerá el prompt generado...":
-            pyperclip.copy(prompt_content)
+            timed_import("pyperclip").copy(prompt_content)
             self.show_feedback(self.copy_btn, "¡Copiado!")
 
 
@@ -265,6 +284,70 @@ class PromptSectionFrame(QFrame):
                 print(f"Error al exportar: {e}")
                 self.show_feedback(self.export_btn, "Error", error=True)
 
+    def get_backend_client(self):
+        """Cliente del backend configurado en settings (cola, concurrencia y reintentos)"""
+        if self.backend_client is None:
+            backend = timed_import("core.backend")
+            workflow = None
+            workflow_path = self.settings.get_setting("backend_workflow", "")
+            if workflow_path:
+                with open(workflow_path, 'r', encoding='utf-8') as f:
+                    workflow = json.load(f)
+            self.backend_client = backend.BackendClient(
+                url=self.settings.get_setting("backend_url", backend.DEFAULT_BACKEND_URL),
+                kind=self.settings.get_setting("backend_kind", "a1111"),
+                concurrency=self.settings.get_setting("backend_concurrency", backend.DEFAULT_CONCURRENCY),
+                queue_size=self.settings.get_setting("backend_queue_size", backend.DEFAULT_QUEUE_SIZE),
+                retries=self.settings.get_setting("backend_retries", backend.DEFAULT_RETRIES),
+                workflow=workflow
+            )
+        return self.backend_client
+
+    def send_prompt(self):
+        """Encola el prompt en el backend de generación sin bloquear la interfaz"""
+        prompt_content = self.prompt_text.toPlainText()
+        if not prompt_content or prompt_content == "Aquí aparecerá el prompt generado...":
+            return
+        
+        try:
+            client = self.get_backend_client()
+            client.submit(prompt_content, self.negative_text.toPlainText(),
+                          on_done=self.backend_job_finished.emit, block=False)
+        except queue.Full:
+            self.show_feedback(self.send_btn, "Cola llena", error=True)
+            return
+        except Exception as e:
+            print(f"Error al enviar al backend: {e}")
+            self.show_feedback(self.send_btn, "Error", error=True)
+            return
+        self.update_send_button()
+
+    def update_send_button(self):
+        """Muestra en el botón cuántos trabajos quedan pendientes"""
+        pending = self.backend_client.pending() if self.backend_client else 0
+        self.send_btn.setText(f"Enviando ({pending})" if pending else "Enviar")
+
+    def on_backend_job_finished(self, job):
+        """Resultado de un trabajo del backend (ya en el hilo de la interfaz)"""
+        if job.status == "done":
+            print(f"Backend: trabajo {job.id} listo en {job.total_ms:.0f} ms "
+                  f"(petición {job.latency_ms:.0f} ms, {job.attempts} intento(s))")
+        else:
+            print(f"Backend: trabajo {job.id} {job.status} tras {job.attempts} intento(s): {job.error}")
+            self.send_btn.setToolTip(f"Último error: {job.error}")
+        
+        self.update_send_button()
+        if self.send_btn.text() == "Enviar":
+            if job.status == "done":
+                self.show_feedback(self.send_btn, "¡Enviado!")
+            elif job.status == "failed":
+                self.show_feedback(self.send_btn, "Error", error=True)
+
+    def close_backend(self):
+        """Cancela los trabajos pendientes y cierra las conexiones del backend"""
+        if self.backend_client is not None:
+            self.backend_client.close()
+
     def show_feedback(self, button, text, error=False):
         """Muestra feedback visual en un botón"""
         original_text = button.text()
@@ -300,6 +383,12 @@ class PromptSectionFrame(QFrame):
 
     def restore_button(self, button, text, style):
         """Restaura el estado original de un botón"""
+        if button is self.send_btn:
+            # El texto guardado ("Enviando (3)") pudo quedar viejo mientras duraba el aviso, y con
+            # avisos encadenados el estilo guardado es el del aviso anterior: el botón no tiene estilo propio
+            button.setStyleSheet("")
+            self.update_send_button()
+            return
         button.setText(text)
         button.setStyleSheet(style)
 
@@ -307,8 +396,15 @@ class PromptSectionFrame(QFrame):
         """Actualiza el prompt generado"""
         if prompt_text:
             self.prompt_text.setPlainText(prompt_text)
+            # El prompt compilado ya está en el caché del generador: no se recalcula
+            stats = self.prompt_generator.get_prompt_statistics()
+            self.stats_label.setText(
+                f"{stats['total_terms']} términos · {stats['total_characters']} caracteres · "
+                f"~{stats['estimated_tokens']} tokens ({stats['chunks']} bloques de 75)"
+            )
         else:
             self.prompt_text.setPlainText("Aquí aparecerá el prompt generado...")
+            self.stats_label.setText("")
 
     def get_negative_prompt(self):
         """Obtiene el contenido del negative prompt"""
@@ -439,7 +535,7 @@ class PromptSectionFrame(QFrame):
             categories = self.load_categories_from_json()
             if categories:
                 formatted_text = self.format_categories_for_copy(categories)
-                pyperclip.copy(formatted_text)
+                timed_import("pyperclip").copy(formatted_text)
                 self.show_feedback(self.config_btn, "¡Copiado!", error=False)
                 print("Categorías copiadas al portapapeles")
             else:
@@ -538,15 +538,13 @@ class VariationDialog(QDialog):
             
             if success:
                 # Emitir señal de variación guardada si está disponible
-                if self.sidebar and hasattr(self.sidebar, 'variations_panel'):
+                if self.sidebar and getattr(self.sidebar, 'variations_panel', None) is not None:
                     print("🔄 Emitiendo señal variation_saved...")
                     self.sidebar.variations_panel.variation_saved.emit(character, variation)
-                    
-                    # FORZAR actualización directa como respaldo
-                    print("🔄 Forzando actualización directa...")
-                    self.sidebar.variations_panel.load_variations()
-                    print("✅ Actualización directa completada")
                     print(f"✅ Señal emitida para {character} - {variation}")
+                elif self.sidebar:
+                    # El panel de variaciones aún no se construyó (pestaña sin abrir)
+                    self.sidebar.on_variation_saved(character, variation)
                 
                 QMessageBox.information(
                     self, "Éxito", 
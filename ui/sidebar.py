@@ -3,19 +3,15 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QListWidget, QListWidgetItem, QLineEdit)
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 from PyQt6.QtGui import QFont, QPalette, QColor
-from ui.variations_panel import VariationsPanel
-from ui.presets_panel import PresetsPanel
-from ui.sugeprompt_panel import SugePromptPanel  # ← NUEVA IMPORTACIÓN
-from logic.variations_manager import VariationsManager
-import os
+from core import get_library
+from logic.startup_profile import measure, timed_import, get_records, format_record
 import json
-from datetime import datetime
 
 class SidebarFrame(QFrame):
     character_defaults_selected = pyqtSignal(dict)
     variation_applied = pyqtSignal(dict)
     
-    def __init__(self, prompt_generator, main_window=None):
+    def __init__(self, prompt_generator, main_window=None, deferred_load=False):
         super().__init__()
         self.prompt_generator = prompt_generator
         self.main_window = main_window  # ← Agregar referencia al MainWindow
@@ -23,17 +19,29 @@ class SidebarFrame(QFrame):
         self.expanded_width = 280
         self.collapsed_width = 60
         
-        # Inicializar el manager de variaciones
-        self.variations_manager = VariationsManager()
+        # Personajes, variaciones y presets vienen de la biblioteca sin interfaz (core)
+        self.library = get_library()
+        self.variations_manager = self.library.variations
+        # El de presets se comparte con el panel (el arranque lee las carpetas antes de construirlo)
+        self.presets_manager = self.library.presets
         
         # Sistema de tracking de cambios
         self.original_values_snapshot = {}
         self.changes_tracker = {}
         
+        # Con deferred_load las listas se llenan cuando el StartupLoader termina de leerlas
+        self.deferred_load = deferred_load
+        self.all_characters = []
+        # Datos del arranque que llegan antes de construir su panel: nombre de etapa -> datos
+        self.startup_data = {}
+        self.startup_pending = {"variaciones", "presets"} if deferred_load else set()
+        
         self.setup_ui()
         self.setup_styles()
-        self.setup_data()
-        self.connect_variation_signals()
+        if deferred_load:
+            self.show_loading_placeholder()
+        else:
+            self.setup_data()
 
     # En el método setup_ui(), después de la pestaña de Variaciones:
     def setup_ui(self):
@@ -108,19 +116,15 @@ class SidebarFrame(QFrame):
         self.setup_character_tab()
         self.tab_widget.addTab(self.character_tab, "Personajes")
         
-        # Pestaña de Variaciones
-        self.variations_panel = VariationsPanel(self.variations_manager, self.prompt_generator)
-        self.tab_widget.addTab(self.variations_panel, "Variaciones")
-        
-        # ← NUEVA PESTAÑA DE PRESETS
-        # En el método setup_ui(), cambiar la línea 114:
-        # Cambiar esta línea:
-        self.presets_panel = PresetsPanel(self.main_window)  # ← Pasar MainWindow en lugar de self
-        self.tab_widget.addTab(self.presets_panel, "Presets")
-        
-        # ← NUEVA PESTAÑA SUGEPROMPT
-        self.sugeprompt_panel = SugePromptPanel(self.main_window)
-        self.tab_widget.addTab(self.sugeprompt_panel, "SugePrompt")
+        # Pestañas secundarias: cada panel se construye (e importa) al activar su pestaña
+        self.variations_panel = None
+        self.presets_panel = None
+        self.sugeprompt_panel = None
+        self.lazy_tabs = {}  # índice -> (título, contenedor, fábrica)
+        self.add_lazy_tab("Variaciones", self.create_variations_panel)
+        self.add_lazy_tab("Presets", self.create_presets_panel)
+        self.add_lazy_tab("SugePrompt", self.create_sugeprompt_panel)
+        self.tab_widget.currentChanged.connect(self.build_lazy_tab)
         
         # Configurar tooltips para las pestañas
         self.tab_widget.setTabToolTip(0, "Gestión de Variaciones")
@@ -163,6 +167,96 @@ class SidebarFrame(QFrame):
         self.character_dropdown.view().doubleClicked.connect(self.load_selected_character)
     
         
+    def add_lazy_tab(self, title, factory):
+        """Agrega una pestaña vacía cuyo panel se crea con factory la primera vez que se activa"""
+        container = QWidget()
+        container_layout = QVBoxLayout(container)
+        container_layout.setContentsMargins(0, 0, 0, 0)
+        index = self.tab_widget.addTab(container, title)
+        self.lazy_tabs[index] = (title, container, factory)
+    
+    def build_lazy_tab(self, index):
+        """Construye el panel de una pestaña secundaria al activarla por primera vez"""
+        entry = self.lazy_tabs.pop(index, None)
+        if entry is None:
+            return
+        title, container, factory = entry
+        with measure("construcción", f"pestaña {title}"):
+            container.layout().addWidget(factory())
+        if getattr(self.main_window, "startup_report", False):
+            print(format_record(get_records()[-1]))
+    
+    def create_variations_panel(self):
+        VariationsPanel = timed_import("ui.variations_panel").VariationsPanel
+        self.variations_panel = VariationsPanel(self.variations_manager, self.prompt_generator, deferred_load=True)
+        self.connect_variation_signals()
+        self.fill_from_startup("variaciones")
+        return self.variations_panel
+    
+    def create_presets_panel(self):
+        PresetsPanel = timed_import("ui.presets_panel").PresetsPanel
+        self.presets_panel = PresetsPanel(self.main_window, deferred_load=True,
+                                          presets_manager=self.presets_manager)  # ← Pasar MainWindow en lugar de self
+        if self.main_window is not None:
+            self.presets_panel.preset_loaded.connect(self.main_window.apply_preset)
+        self.fill_from_startup("presets")
+        return self.presets_panel
+    
+    def create_sugeprompt_panel(self):
+        SugePromptPanel = timed_import("ui.sugeprompt_panel").SugePromptPanel
+        self.sugeprompt_panel = SugePromptPanel(self.main_window)
+        return self.sugeprompt_panel
+    
+    def fill_from_startup(self, name):
+        """Llena un panel recién construido con lo leído en el arranque (o lo lee ahora).
+        Si la lectura del arranque sigue en curso, apply_startup_data lo llenará al llegar"""
+        if name in self.startup_pending:
+            return
+        data = self.startup_data.pop(name, None)
+        if name == "variaciones":
+            self.variations_panel.load_variations(manifest=data)
+        else:
+            self.presets_panel.load_presets(data)
+    
+    def apply_startup_data(self, name, data):
+        """Recibe los datos de una etapa del StartupLoader; se guardan si su panel aún no existe"""
+        self.startup_pending.discard(name)
+        panel = self.variations_panel if name == "variaciones" else self.presets_panel
+        if data is not None:
+            self.startup_data[name] = data
+        if panel is not None:
+            self.fill_from_startup(name)
+    
+    def shutdown(self):
+        """Detiene los hilos de los paneles ya construidos"""
+        for panel in (self.presets_panel, self.variations_panel):
+            if panel is not None:
+                panel.shutdown()
+    
+    # Cambios externos en data/: se reenvían al panel si existe; si no, lo guardado del
+    # arranque quedó viejo y el panel leerá el disco al construirse
+    def on_preset_folder_changed(self, category_id):
+        if self.presets_panel is not None:
+            self.presets_panel.on_preset_folder_changed(category_id)
+        else:
+            self.startup_data.pop("presets", None)
+    
+    def on_preset_folders_changed(self):
+        if self.presets_panel is not None:
+            self.presets_panel.load_presets()
+        else:
+            self.startup_data.pop("presets", None)
+    
+    def on_variations_file_changed(self, folder):
+        if self.variations_panel is not None:
+            self.variations_panel.on_variations_file_changed(folder)
+        else:
+            self.startup_data.pop("variaciones", None)
+    
+    def on_character_file_changed(self, folder):
+        if self.variations_panel is not None:
+            self.variations_panel.on_character_file_changed(folder)
+    
     def connect_variation_signals(self):
         """Conecta las señales del panel de variaciones"""
         self.variations_panel.variation_loaded.connect(self.on_variation_loaded)
@@ -186,6 +280,11 @@ class SidebarFrame(QFrame):
                 if index >= 0:
                     self.character_dropdown.setCurrentIndex(index)
     
+    def track_category_changes(self, changes):
+        """Registra un conjunto de cambios {categoría: (valor_anterior, valor_nuevo)}"""
+        for category_name, (old_value, new_value) in changes.items():
+            self.track_category_change(category_name, old_value, new_value)
+
     def track_category_change(self, category_name, old_value, new_value):
         """Registra un cambio específico en una categoría"""
         if category_name not in self.original_values_snapshot:
@@ -218,11 +317,11 @@ class SidebarFrame(QFrame):
         # Actualizar la lista de personajes si es necesario
         self.refresh_characters()
         
-        # FORZAR actualización inmediata de variaciones
-        if hasattr(self, 'variations_panel'):
-            print("🔄 Actualizando variations_panel AHORA...")
-            self.variations_panel.load_variations()
-            print("✅ Actualización completada")
+        # Actualizar solo la fila de la variación guardada
+        if self.variations_panel is not None:
+            self.variations_panel.on_variation_saved(character_name, variation_name)
+        else:
+            self.startup_data.pop("variaciones", None)
         
         print(f"✅ Proceso completo para '{variation_name}' en {character_name}")
 
@@ -351,119 +450,32 @@ class SidebarFrame(QFrame):
 
     def setup_data(self):
         """Configura los datos de personajes desde archivos"""
-        # Cargar personajes desde la carpeta de personajes
-        characters_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "characters")
-        
-        # Asegurarse de que el directorio existe
-        if not os.path.exists(characters_dir):
-            os.makedirs(characters_dir)
-        
-        # Limpiar la lista y el array de personajes
-        self.character_list.clear()
-        self.all_characters = []
-        
-        # Cargar personajes desde la nueva estructura (carpetas)
-        for item in os.listdir(characters_dir):
-            item_path = os.path.join(characters_dir, item)
-            
-            # Verificar si es una carpeta (nueva estructura)
-            if os.path.isdir(item_path):
-                # Buscar el archivo JSON con el mismo nombre que la carpeta
-                json_filename = f"{item}.json"
-                json_path = os.path.join(item_path, json_filename)
-                
-                if os.path.exists(json_path):
-                    try:
-                        # Leer el archivo JSON para obtener metadatos
-                        with open(json_path, "r", encoding="utf-8") as f:
-                            character_data = json.load(f)
-                        
-                        # Obtener el nombre del personaje y fecha de creación
-                        if "metadata" in character_data and "character_name" in character_data["metadata"]:
-                            character_name = character_data["metadata"]["character_name"]
-                            
-                            # Obtener y formatear la fecha de creación
-                            if "created_date" in character_data["metadata"]:
-                                created_date_str = character_data["metadata"]["created_date"]
-                                try:
-                                    # Parsear la fecha ISO
-                                    created_date = datetime.fromisoformat(created_date_str.replace('Z', '+00:00'))
-                                    formatted_date = created_date.strftime("%d/%m/%Y")
-                                    display_text = f"{character_name} - {formatted_date}"
-                                except ValueError:
-                                    display_text = f"{character_name} - Fecha inválida"
-                            else:
-                                display_text = f"{character_name} - Sin fecha"
-                        else:
-                            # Fallback al nombre de la carpeta
-                            character_name = item.replace('_', ' ').title()
-                            display_text = f"{character_name} - Sin metadatos"
-                        
-                        # Agregar al array de personajes
-                        self.all_characters.append({
-                            'name': character_name,
-                            'display_text': display_text
-                        })
-                        
-                    except (json.JSONDecodeError, FileNotFoundError) as e:
-                        # En caso de error, usar el nombre de la carpeta
-                        character_name = item.replace('_', ' ').title()
-                        display_text = f"{character_name} - Error al cargar"
-                        self.all_characters.append({
-                            'name': character_name,
-                            'display_text': display_text
-                        })
-            
-            # También manejar archivos JSON directos (estructura antigua)
-            elif item.endswith('.json'):
-                json_path = os.path.join(characters_dir, item)
-                try:
-                    with open(json_path, "r", encoding="utf-8") as f:
-                        character_data = json.load(f)
-                    
-                    character_name = item[:-5].replace('_', ' ').title()
-                    display_text = f"{character_name} - Formato antiguo"
-                    
-                    self.all_characters.append({
-                        'name': character_name,
-                        'display_text': display_text
-                    })
-                    
-                except (json.JSONDecodeError, FileNotFoundError):
-                    pass
-        
-        # Ordenar personajes alfabéticamente
-        self.all_characters.sort(key=lambda x: x['name'])
-        
-        # Mostrar todos los personajes inicialmente
-        self.filter_characters("")
+        self.show_characters(self.read_characters())
+    
+    def read_characters(self):
+        """Lee los metadatos de los personajes (solo disco, se puede ejecutar en otro hilo)"""
+        return self.library.list_characters()
+    
+    def show_loading_placeholder(self):
+        """Marcador mientras se leen los personajes en segundo plano"""
+        item = QListWidgetItem("⏳ Cargando personajes...")
+        item.setFlags(Qt.ItemFlag.NoItemFlags)
+        self.character_list.addItem(item)
+    
+    def show_characters(self, characters):
+        """Muestra en la lista los personajes leídos por read_characters"""
+        self.all_characters = characters
+        self.filter_characters(self.search_filter.text())
 
     def on_character_change(self, character_name):
         """Maneja el cambio de personaje seleccionado"""
         if character_name and character_name != "Seleccionar personaje...":
-            # Buscar el archivo del personaje
-            characters_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "characters")
-            
-            # Intentar cargar desde la nueva estructura (carpeta)
-            character_folder = os.path.join(characters_dir, character_name.lower().replace(' ', '_'))
-            json_path = os.path.join(character_folder, f"{character_name.lower().replace(' ', '_')}.json")
-            
-            # Si no existe, intentar con la estructura antigua
-            if not os.path.exists(json_path):
-                json_path = os.path.join(characters_dir, f"{character_name.lower().replace(' ', '_')}.json")
-            
             try:
-                with open(json_path, "r", encoding="utf-8") as f:
-                    character_data = json.load(f)
-                
-                # Emitir los datos del personaje
-                if "metadata" in character_data and "categories" in character_data:
-                    # Nuevo formato con metadatos
-                    self.character_defaults_selected.emit(character_data["categories"])
-                else:
-                    # Formato antiguo sin estructura de metadatos
-                    self.character_defaults_selected.emit(character_data)
-                    
+                # Carpeta del personaje o, si no existe, el formato antiguo
+                categories = self.library.characters.load_categories(character_name)
+                if categories is None:
+                    raise FileNotFoundError(self.library.characters.character_file(character_name))
+                self.character_defaults_selected.emit(categories)
             except (json.JSONDecodeError, FileNotFoundError) as e:
                 print(f"Error al cargar {character_name}: {str(e)}")
         else:
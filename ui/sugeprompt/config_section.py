@@ -5,9 +5,11 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QEvent
 from PyQt6.QtGui import QPixmap, QCursor
-from PIL import Image  # Agregar esta línea
 import json
 import os
+from logic.json_store import update_json
+from logic.startup_profile import timed_import
+from logic.sugeprompt_data import read_sugeprompt_data
 
 class VisualTooltip(QWidget):
     """Tooltip que muestra opciones en cuadrícula con imágenes"""
@@ -328,7 +330,8 @@ class ImageTooltip(QWidget):
         """Optimiza y guarda la imagen"""
         target_path = os.path.join(target_dir, f"{option_id}.jpg")
         
-        # Abrir y optimizar con PIL
+        # Abrir y optimizar con PIL (se importa al primer uso)
+        Image = timed_import("PIL.Image")
         with Image.open(source_path) as img:
             # Convertir a RGB si es necesario
             if img.mode in ('RGBA', 'LA', 'P'):
@@ -348,22 +351,19 @@ class ImageTooltip(QWidget):
             json_path = os.path.join("data", "sugeprompt", "categories", f"{self.category}.json")
             
             if os.path.exists(json_path):
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                def set_image(data):
+                    # Buscar y actualizar la opción
+                    for option in data.get('options', []):
+                        if option.get('id') == self.option_id:
+                            # Usar ruta relativa con extensión .jpg (que es como se guarda realmente)
+                            rel_path = os.path.relpath(image_path, "data/sugeprompt")
+                            # Cambiar la extensión a .jpg ya que save_optimized_image siempre guarda como JPG
+                            rel_path = os.path.splitext(rel_path)[0] + '.jpg'
+                            option['image'] = rel_path.replace("\\", "/")
+                            break
                 
-                # Buscar y actualizar la opción
-                for option in data.get('options', []):
-                    if option.get('id') == self.option_id:
-                        # Usar ruta relativa con extensión .jpg (que es como se guarda realmente)
-                        rel_path = os.path.relpath(image_path, "data/sugeprompt")
-                        # Cambiar la extensión a .jpg ya que save_optimized_image siempre guarda como JPG
-                        rel_path = os.path.splitext(rel_path)[0] + '.jpg'
-                        option['image'] = rel_path.replace("\\", "/")
-                        break
-                
-                # Guardar cambios
-                with open(json_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
+                # Leer, modificar y guardar bajo el mismo bloqueo
+                update_json(json_path, set_image, default={})
                     
         except Exception as e:
             print(f"Error actualizando JSON: {e}")
@@ -565,45 +565,7 @@ class ConfigSection(QWidget):
     
     def load_data(self):
         """Carga los datos de categorías y opciones desde los archivos JSON"""
-        try:
-            # Cargar categorías principales
-            categories_path = os.path.join("data", "sugeprompt", "prompt_categories.json")
-            with open(categories_path, 'r', encoding='utf-8') as f:
-                self.categories_data = json.load(f)
-            
-            # Inicializar diccionario de opciones
-            self.options_data = {}
-            
-            # Cargar opciones desde archivos individuales de categorías
-            categories_dir = os.path.join("data", "sugeprompt", "categories")
-            if os.path.exists(categories_dir):
-                for filename in os.listdir(categories_dir):
-                    if filename.endswith('.json'):
-                        category_file_path = os.path.join(categories_dir, filename)
-                        try:
-                            with open(category_file_path, 'r', encoding='utf-8') as f:
-                                category_data = json.load(f)
-                                # Agregar las opciones de esta categoría al diccionario global
-                                if 'options' in category_data:
-                                    self.options_data.update(category_data['options'])
-                        except Exception as e:
-                            print(f"Error cargando archivo de categoría {filename}: {e}")
-            
-            # Fallback: cargar desde prompt_options.json si existe
-            options_path = os.path.join("data", "sugeprompt", "prompt_options.json")
-            if os.path.exists(options_path):
-                try:
-                    with open(options_path, 'r', encoding='utf-8') as f:
-                        fallback_options = json.load(f)
-                        # Agregar opciones que no estén ya cargadas
-                        for key, value in fallback_options.items():
-                            if key not in self.options_data:
-                                self.options_data[key] = value
-                except Exception as e:
-                    print(f"Error cargando opciones de fallback: {e}")
-                    
-        except Exception as e:
-            print(f"Error cargando datos principales: {e}")
+        self.categories_data, self.options_data = read_sugeprompt_data()
     
     def setup_ui(self):
         layout = QVBoxLayout(self)
@@ -5,9 +5,7 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QDrag, QPixmap, QPainter, QColor
 import os
-import json
-
-TAGS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "tags.json")
+from ui.utils.category_utils import update_tags_json
 
 class DraggableTagWidget(QFrame):
     """Widget de tag que se puede arrastrar para reordenar"""
@@ -253,14 +251,9 @@ class TagsDialog(QDialog):
             QMessageBox.warning(self, "Error", "El tag está vacío o ya existe.")
 
     def save_and_close(self):
-        # Guarda los tags en tags.json
-        with open(TAGS_PATH, "r+", encoding="utf-8") as f:
-            tags_data = json.load(f)
-            key = self.category_name.lower().replace(" ", "_")
-            tags_data[key] = self.tags
-            f.seek(0)
-            json.dump(tags_data, f, ensure_ascii=False, indent=2)
-            f.truncate()
+        # Guarda los tags en el shard de la categoría
+        key = self.category_name.lower().replace(" ", "_")
+        update_tags_json(key, self.tags)
             
         # Actualiza la tarjeta que abrió este diálogo
         parent_card = self.parent()
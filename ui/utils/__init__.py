@@ -1,5 +1,7 @@
 from .category_utils import (
     load_categories_and_tags,
+    load_category_tags,
+    get_tag_store,
     normalize_category,
     update_categories_json,
     update_tags_json,
@@ -7,12 +9,18 @@ from .category_utils import (
     DEFAULT_CARD_COLOR,
     CATEGORIES_PATH,
     TAGS_PATH,
+    TAGS_DIR,
     ICON_EDIT,
     ICON_SAVE
 )
+from .update_scheduler import UpdateScheduler, DEFAULT_UPDATE_DELAY_MS
+from .data_watcher import DataWatcher
+from .startup_loader import StartupLoader, STARTUP_WORKERS
 
 __all__ = [
     'load_categories_and_tags',
+    'load_category_tags',
+    'get_tag_store',
     'normalize_category', 
     'update_categories_json',
     'update_tags_json',
@@ -20,6 +28,12 @@ __all__ = [
     'DEFAULT_CARD_COLOR',
     'CATEGORIES_PATH',
     'TAGS_PATH',
+    'TAGS_DIR',
     'ICON_EDIT',
-    'ICON_SAVE'
+    'ICON_SAVE',
+    'UpdateScheduler',
+    'DEFAULT_UPDATE_DELAY_MS',
+    'DataWatcher',
+    'StartupLoader',
+    'STARTUP_WORKERS'
 ]
\ No newline at end of file
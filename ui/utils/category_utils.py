@@ -1,73 +1,72 @@
 import os
-import json
+from logic.json_store import read_json, update_json
+from logic.startup_snapshot import get_startup_snapshot
+from core import get_library
 
 # Constantes de rutas
 CATEGORIES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "categories.json")
 TAGS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "tags.json")
+TAGS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "tags")
 ICON_EDIT = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "assets", "icons", "edit.png")
 ICON_SAVE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "assets", "icons", "save.png")
 
 # Constantes de estilo
 DEFAULT_CARD_COLOR = "#252525"
 
-def load_categories_and_tags():
-    """Carga las categorías y sus tags asociados desde los archivos JSON"""
-    with open(CATEGORIES_PATH, "r", encoding="utf-8") as f:
-        categories = json.load(f)["categorias"]
-    with open(TAGS_PATH, "r", encoding="utf-8") as f:
-        tags = json.load(f)
+def get_tag_store():
+    """Almacén de tags compartido con la biblioteca (migra el tags.json único a shards la primera vez)"""
+    return get_library().tags
+
+def load_categories_and_tags(load_tags=True):
+    """Carga las categorías y sus tags asociados desde los archivos JSON.
+    Con load_tags=False los tags quedan en None y se leen por shard al mostrarse la tarjeta"""
+    categories = get_startup_snapshot().read_json(CATEGORIES_PATH)["categorias"]
+    tags = get_tag_store().get_many(categories) if load_tags else {}
     # Relaciona cada categoría con sus tags (o lista vacía si no hay)
     categories_real = [
-        {"name": cat.replace("_", " ").capitalize(), "icon": None, "tags": tags.get(cat, [])}
+        {"name": cat.replace("_", " ").capitalize(), "icon": None,
+         "tags": tags.get(cat, []) if load_tags else None}
         for cat in categories
     ]
     return categories_real
 
+def load_category_tags(key):
+    """Tags de una sola categoría (lee únicamente su shard)"""
+    return get_tag_store().get_tags(key)
+
 def normalize_category(name):
     """Normaliza el nombre de una categoría para búsquedas"""
     return name.lower().replace(" ", "").replace("(", "").replace(")", "").replace("_", "")
 
 def update_categories_json(name):
     """Actualiza el archivo categories.json con una nueva categoría"""
-    with open(CATEGORIES_PATH, "r+", encoding="utf-8") as f:
-        data = json.load(f)
-        if name not in data["categorias"]:
-            data["categorias"].append(name)
-            f.seek(0)
-            json.dump(data, f, ensure_ascii=False, indent=2)
-            f.truncate()
-            return True
-    return False
+    added = []
+    
+    def add(data):
+        if name in data["categorias"]:
+            return False
+        data["categorias"].append(name)
+        added.append(name)
+    
+    update_json(CATEGORIES_PATH, add)
+    return bool(added)
 
 def update_tags_json(name, tags):
-    """Actualiza el archivo tags.json con los tags de una categoría"""
-    with open(TAGS_PATH, "r+", encoding="utf-8") as f:
-        tags_data = json.load(f)
-        tags_data[name] = tags
-        f.seek(0)
-        json.dump(tags_data, f, ensure_ascii=False, indent=2)
-        f.truncate()
+    """Actualiza el shard de tags de una categoría"""
+    get_tag_store().set_tags(name, tags)
 
 def rename_category_in_files(old_name, new_name):
     """Renombra una categoría en todos los archivos JSON"""
     # Actualizar categories.json
-    with open(CATEGORIES_PATH, "r+", encoding="utf-8") as f:
-        data = json.load(f)
-        if old_name in data["categorias"]:
-            index = data["categorias"].index(old_name)
-            data["categorias"][index] = new_name
-            f.seek(0)
-            json.dump(data, f, ensure_ascii=False, indent=2)
-            f.truncate()
+    def rename_category(data):
+        if old_name not in data["categorias"]:
+            return False
+        index = data["categorias"].index(old_name)
+        data["categorias"][index] = new_name
+    
+    update_json(CATEGORIES_PATH, rename_category)
     
-    # Actualizar tags.json
+    # Renombrar el shard de tags
     old_key = old_name.lower().replace(" ", "_")
     new_key = new_name.lower().replace(" ", "_")
-    
-    with open(TAGS_PATH, "r+", encoding="utf-8") as f:
-        tags_data = json.load(f)
-        if old_key in tags_data:
-            tags_data[new_key] = tags_data.pop(old_key)
-            f.seek(0)
-            json.dump(tags_data, f, ensure_ascii=False, indent=2)
-            f.truncate()
\ No newline at end of file
+    get_tag_store().rename(old_key, new_key)
@@ -0,0 +1,159 @@
+import os
+from PyQt6.QtCore import QObject, QTimer, QFileSystemWatcher, pyqtSignal
+
+# Espera para agrupar ráfagas de eventos (un script suele escribir varios archivos seguidos)
+COALESCE_DELAY_MS = 200
+# Intervalo del sondeo por mtime cuando el sistema no ofrece notificaciones
+POLL_INTERVAL_MS = 2000
+
+
+class DataWatcher(QObject):
+    """Vigila la carpeta data/ (inotify vía QFileSystemWatcher, o sondeo por mtime como respaldo)
+    y traduce cada cambio en una invalidación puntual: un personaje, una carpeta de presets o los tags"""
+
+    tags_changed = pyqtSignal()                 # shards de data/tags, tags.json o categories.json
+    preset_folder_changed = pyqtSignal(str)     # contenido de una carpeta de presets
+    preset_folders_changed = pyqtSignal()       # alta/baja de carpetas de presets
+    character_changed = pyqtSignal(str)         # archivo base de un personaje (carpeta)
+    variations_changed = pyqtSignal(str)        # archivo de variaciones de un personaje (carpeta)
+    characters_changed = pyqtSignal()           # alta/baja de personajes
+
+    def __init__(self, data_dir, polling=False, parent=None):
+        super().__init__(parent)
+        self.data_dir = os.path.abspath(data_dir)
+        self.presets_dir = os.path.join(self.data_dir, "presets")
+        self.characters_dir = os.path.join(self.data_dir, "characters")
+        self.tags_dir = os.path.join(self.data_dir, "tags")
+
+        # Carpeta -> {nombre: mtime} de su último escaneo
+        self.listings = {}
+        self.pending = set()
+
+        self.coalesce_timer = QTimer(self)
+        self.coalesce_timer.setSingleShot(True)
+        self.coalesce_timer.timeout.connect(self.process_pending)
+
+        self.watcher = None
+        self.poll_timer = None
+        if not polling:
+            self.watcher = QFileSystemWatcher(self)
+            self.watcher.directoryChanged.connect(self.on_path_changed)
+            self.watcher.fileChanged.connect(self.on_path_changed)
+
+        for directory in self.watched_directories():
+            self.watch(directory)
+
+        if self.watcher is None:
+            self.start_polling()
+
+    def watched_directories(self):
+        """data/, data/tags, data/presets, data/characters y cada subcarpeta de estas dos"""
+        directories = [self.data_dir, self.tags_dir, self.presets_dir, self.characters_dir]
+        for parent in (self.presets_dir, self.characters_dir):
+            try:
+                directories.extend(entry.path for entry in os.scandir(parent) if entry.is_dir())
+            except OSError:
+                pass
+        return directories
+
+    def watch(self, directory):
+        """Toma la foto inicial de una carpeta y la registra en el watcher"""
+        self.listings[directory] = self.scan(directory)
+        if self.watcher is not None:
+            if not self.watcher.addPath(directory):
+                # Sin notificaciones para esta carpeta: pasar a sondeo
+                self.start_polling()
+            self.watch_files(directory)
+
+    def watch_files(self, directory):
+        """Vigila también los archivos JSON de la carpeta: editar un archivo no modifica la carpeta.
+        Un reemplazo atómico quita el archivo del watcher, así que se vuelve a agregar tras cada escaneo"""
+        if self.watcher is None:
+            return
+        watched = set(self.watcher.files())
+        paths = [os.path.join(directory, name) for name in self.listings.get(directory, {})
+                 if name.endswith(".json")]
+        missing = [path for path in paths if path not in watched]
+        if missing:
+            self.watcher.addPaths(missing)
+
+    def unwatch(self, directory):
+        self.listings.pop(directory, None)
+        if self.watcher is not None:
+            self.watcher.removePath(directory)
+
+    def start_polling(self):
+        if self.poll_timer is None:
+            self.poll_timer = QTimer(self)
+            self.poll_timer.timeout.connect(self.poll)
+            self.poll_timer.start(POLL_INTERVAL_MS)
+
+    def scan(self, directory):
+        """{nombre: mtime} de las entradas directas de una carpeta (solo stat, sin leer archivos)"""
+        listing = {}
+        try:
+            for entry in os.scandir(directory):
+                try:
+                    listing[entry.name] = entry.stat().st_mtime_ns
+                except OSError:
+                    pass
+        except OSError:
+            pass
+        return listing
+
+    def on_path_changed(self, path):
+        self.pending.add(path if path in self.listings else os.path.dirname(path))
+        self.coalesce_timer.start(COALESCE_DELAY_MS)
+
+    def poll(self):
+        self.pending.update(self.listings)
+        self.process_pending()
+
+    def process_pending(self):
+        """Compara cada carpeta afectada con su foto anterior y emite solo lo que cambió"""
+        pending, self.pending = self.pending, set()
+        events = []
+        for directory in pending:
+            if directory not in self.listings:
+                continue
+            before = self.listings[directory]
+            after = self.scan(directory)
+            self.listings[directory] = after
+            self.watch_files(directory)
+            for name in set(before) | set(after):
+                if before.get(name) != after.get(name):
+                    event = self.classify(directory, name, added=name not in before, removed=name not in after)
+                    # Varios archivos de una misma carpeta producen un solo aviso
+                    if event is not None and event not in events:
+                        events.append(event)
+        for signal, *args in events:
+            signal.emit(*args)
+
+    def classify(self, directory, name, added=False, removed=False):
+        """Traduce un cambio (carpeta, entrada) en (señal, argumentos) del recurso afectado"""
+        path = os.path.join(directory, name)
+        if directory == self.data_dir:
+            if name in ("tags.json", "categories.json"):
+                return (self.tags_changed,)
+        elif directory == self.tags_dir:
+            if not name.startswith(".") and name.endswith(".json"):
+                return (self.tags_changed,)
+        elif directory in (self.presets_dir, self.characters_dir):
+            signal = self.preset_folders_changed if directory == self.presets_dir else self.characters_changed
+            if added and os.path.isdir(path):
+                self.watch(path)
+                return (signal,)
+            if removed and path in self.listings:
+                self.unwatch(path)
+                return (signal,)
+        elif os.path.dirname(directory) == self.presets_dir:
+            # Temporales y bloqueos de las escrituras atómicas (archivos ocultos) no cuentan
+            if not name.startswith(".") and not name.endswith(".tmp"):
+                return (self.preset_folder_changed, os.path.basename(directory))
+        elif os.path.dirname(directory) == self.characters_dir:
+            folder = os.path.basename(directory)
+            if name == f"{folder}_variations.json":
+                return (self.variations_changed, folder)
+            if name == f"{folder}.json":
+                return (self.character_changed, folder)
+        return None
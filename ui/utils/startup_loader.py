@@ -0,0 +1,76 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, pyqtSignal
+
+# Hilos de lectura del arranque (las cargas son de disco, no de CPU)
+STARTUP_WORKERS = 4
+
+
+class StartupLoader(QObject):
+    """Orquestador del arranque: lee los datos de cada panel en paralelo en un pool de hilos
+    y aplica cada resultado en el hilo de la interfaz en cuanto llega, registrando los tiempos"""
+
+    # Emitida desde el hilo de lectura; Qt la entrega encolada en el hilo de la interfaz
+    stage_loaded = pyqtSignal(str, object, object, float)
+    stage_finished = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, workers=STARTUP_WORKERS, verbose=False, parent=None):
+        super().__init__(parent)
+        self.workers = workers
+        # Imprime el tiempo de cada etapa (ajuste startup_report); los errores se imprimen siempre
+        self.verbose = verbose
+        self.executor = None
+        self.stages = {}      # nombre -> (leer, aplicar)
+        self.pending = set()
+        self.timings = {}     # nombre -> {"load_ms", "apply_ms", "ready_ms"}
+        self.started_at = None
+        self.stage_loaded.connect(self.on_stage_loaded)
+
+    def add_stage(self, name, load, apply):
+        """Registra una etapa: load se ejecuta en el pool y apply(resultado) en la interfaz.
+        Si load falla, apply recibe None y debe cargar por su cuenta"""
+        self.stages[name] = (load, apply)
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self.pending = set(self.stages)
+        if not self.stages:
+            self.finished.emit()
+            return
+        self.executor = ThreadPoolExecutor(max_workers=min(self.workers, len(self.stages)),
+                                           thread_name_prefix="startup")
+        for name, (load, _) in self.stages.items():
+            self.executor.submit(self._run, name, load)
+
+    def _run(self, name, load):
+        started = time.perf_counter()
+        result, error = None, None
+        try:
+            result = load()
+        except Exception as e:
+            error = e
+        self.stage_loaded.emit(name, result, error, (time.perf_counter() - started) * 1000)
+
+    def on_stage_loaded(self, name, result, error, load_ms):
+        if error is not None:
+            print(f"Arranque: error leyendo '{name}' en segundo plano ({error}); se carga en la interfaz")
+        started = time.perf_counter()
+        try:
+            self.stages[name][1](result)
+        except Exception as e:
+            print(f"Arranque: error aplicando '{name}': {e}")
+        apply_ms = (time.perf_counter() - started) * 1000
+        ready_ms = (time.perf_counter() - self.started_at) * 1000
+        self.timings[name] = {"load_ms": load_ms, "apply_ms": apply_ms, "ready_ms": ready_ms}
+        if self.verbose:
+            print(f"Arranque: {name} leído en {load_ms:.1f} ms, aplicado en {apply_ms:.1f} ms "
+                  f"(listo a los {ready_ms:.1f} ms)")
+
+        self.pending.discard(name)
+        self.stage_finished.emit(name)
+        if not self.pending:
+            self.executor.shutdown(wait=False)
+            if self.verbose:
+                print(f"Arranque: {len(self.stages)} etapas completas en {ready_ms:.1f} ms")
+            self.finished.emit()
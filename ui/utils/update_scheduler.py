@@ -0,0 +1,65 @@
+import time
+from collections import deque
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+# Espera por defecto tras la última edición antes de regenerar el prompt
+DEFAULT_UPDATE_DELAY_MS = 300
+# Cantidad de mediciones de flush que se conservan
+FLUSH_HISTORY_SIZE = 100
+
+
+class UpdateScheduler(QObject):
+    """Planificador único de actualizaciones: acumula las categorías modificadas por
+    cualquier tarjeta y las entrega juntas en un solo flush"""
+
+    flushed = pyqtSignal(dict)  # {clave_snake_case: valor}
+
+    def __init__(self, delay_ms=DEFAULT_UPDATE_DELAY_MS, parent=None):
+        super().__init__(parent)
+        self.delay_ms = delay_ms
+        self.pending = {}
+        self.flush_timings = deque(maxlen=FLUSH_HISTORY_SIZE)  # (categorías, ms)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+
+    def set_delay(self, delay_ms):
+        """Cambia la espera de inactividad (0 = en la próxima vuelta del event loop)"""
+        self.delay_ms = max(0, int(delay_ms))
+
+    def mark_dirty(self, key, value):
+        """Registra el último valor de una categoría y reinicia la espera"""
+        self.pending[key] = value
+        self.timer.start(self.delay_ms)
+
+    def has_pending(self):
+        return bool(self.pending)
+
+    def pending_value(self, key, default=None):
+        """Valor aún no aplicado de una categoría"""
+        return self.pending.get(key, default)
+
+    def flush(self):
+        """Entrega todos los cambios pendientes de una vez y mide cuánto tarda"""
+        self.timer.stop()
+        if not self.pending:
+            return
+        values, self.pending = self.pending, {}
+
+        start = time.perf_counter()
+        self.flushed.emit(values)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.flush_timings.append((len(values), elapsed_ms))
+
+    def get_stats(self):
+        """Resumen de los últimos flushes para instrumentación"""
+        if not self.flush_timings:
+            return {"flushes": 0, "last_ms": 0.0, "avg_ms": 0.0, "max_ms": 0.0}
+        durations = [ms for _, ms in self.flush_timings]
+        return {
+            "flushes": len(durations),
+            "last_ms": durations[-1],
+            "avg_ms": sum(durations) / len(durations),
+            "max_ms": max(durations),
+        }
@@ -1,5 +1,5 @@
-import os
-import json
+from core import get_library, category_key, category_values
+from ui.utils.category_utils import get_tag_store
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
     QLabel, QScrollArea, QFrame, QMessageBox
@@ -28,8 +28,6 @@ class VariationChangesWidget(QWidget):
         if hasattr(self.parent(), 'selected_character'):
             selected_character = self.parent().selected_character
         
-        print(f"DEBUG: Personaje seleccionado: {selected_character}")  # DEBUG
-        
         if not selected_character:
             self.show_message("Selecciona un personaje para comparar los cambios.")
             return
@@ -38,8 +36,6 @@ class VariationChangesWidget(QWidget):
         try:
             changes = self.compare_with_character(selected_character)
             
-            print(f"DEBUG: Cambios detectados: {changes}")  # DEBUG
-            
             if changes:
                 self.changes_data = changes
                 self.display_changes(changes)
@@ -47,188 +43,63 @@ class VariationChangesWidget(QWidget):
                 self.show_no_changes()
                 
         except Exception as e:
-            print(f"DEBUG: Error en load_changes: {e}")  # DEBUG
             self.show_message(f"Error al comparar con {selected_character}: {str(e)}")
         
         # Emitir señal de que se actualizaron los cambios
         self.changes_updated.emit()
     
     def compare_with_character(self, character_name):
-        """Compara los valores actuales con los del personaje seleccionado"""
-        changes = {}
-        
-        # Obtener valores actuales y del personaje
-        current_values = self.get_current_values()
-        character_values = self.load_character_values(character_name)
+        """Compara los valores actuales con los del personaje seleccionado.
+        La base del personaje queda cacheada y solo se recalculan las categorías modificadas"""
+        if not self.category_grid:
+            return {}
         
-        print(f"DEBUG: Valores actuales: {current_values}")
-        print(f"DEBUG: Valores del personaje: {character_values}")
+        grid = self.category_grid
+        engine = grid.prompt_diff
+        # Las ediciones aún en el planificador también cuentan
+        grid.scheduler.flush()
         
-        # SOLUCIÓN: Normalizar nombres de categorías a minúsculas
-        for category_name in current_values.keys():
-            current_items = current_values.get(category_name, [])
-            
-            # Buscar la categoría en el personaje usando nombre normalizado
-            normalized_name = category_name.lower().replace(' ', '_')
-            original_items = character_values.get(normalized_name, [])
-            
-            print(f"DEBUG: Categoría {category_name}:")
-            print(f"  - Nombre normalizado: {normalized_name}")
-            print(f"  - Original: {original_items}")
-            print(f"  - Actual: {current_items}")
-            
-            category_changes = self.detect_category_changes(original_items, current_items)
-            print(f"  - Cambios detectados: {category_changes}")
-            print(f"  - Tiene cambios: {len(category_changes) > 0}")
-            
-            if category_changes and len(category_changes) > 0:
-                changes[category_name] = category_changes
-                print(f"  - ✅ Agregando {category_name} porque tiene {len(category_changes)} cambios")
-            else:
-                print(f"  - ❌ NO agregando {category_name} porque no tiene cambios")
+        baseline_id = self.get_baseline_id(character_name)
+        if not engine.has_baseline(baseline_id):
+            engine.set_baseline(baseline_id, self.load_character_values(character_name), self.get_current_values())
+            grid.change_tracker.clear("variation_diff")
+        else:
+            changes = grid.change_tracker.consume("variation_diff")
+            engine.update({
+                category_key(category_name): new_value
+                for category_name, (old_value, new_value) in changes.items()
+            })
         
+        changes = {}
+        for key, diff in engine.diff().items():
+            category = grid.categories_by_key.get(key)
+            category_name = category["name"] if category else key.replace("_", " ").capitalize()
+            changes[category_name] = self.format_category_changes(diff)
         return changes
     
-    def detect_category_changes(self, original_items, current_items):
-        """Detecta los cambios entre los elementos originales y actuales"""
-        changes = []
-        
-        # Convertir a listas si no lo son y limpiar
-        if isinstance(original_items, str):
-            original_items = [item.strip() for item in original_items.split(',') if item.strip()]
-        if isinstance(current_items, str):
-            current_items = [item.strip() for item in current_items.split(',') if item.strip()]
-        
-        # Asegurar que sean listas
-        if not isinstance(original_items, list):
-            original_items = []
-        if not isinstance(current_items, list):
-            current_items = []
-        
-        original_set = set(original_items)
-        current_set = set(current_items)
-        
-        # CAMBIO CLAVE: Si son exactamente iguales, retornar lista vacía inmediatamente
-        if original_set == current_set:
-            return []  # No hay cambios
-        
-        # Solo si hay diferencias, calcular los cambios
-        added = current_set - original_set
-        removed = original_set - current_set
-        
-        for item in added:
-            changes.append(f"➕ Agregado: {item}")
-        
-        for item in removed:
-            changes.append(f"➖ Eliminado: {item}")
-        
+    def format_category_changes(self, diff):
+        """Convierte el diff estructurado de una categoría en las líneas que muestra el widget"""
+        changes = [f"➕ Agregado: {item}" for item in diff["added"]]
+        changes += [f"➖ Eliminado: {item}" for item in diff["removed"]]
+        changes += [f"⚖️ Peso: {term} ({old:.2f} → {new:.2f})" for term, old, new in diff["reweighted"]]
+        changes += [f"↕️ Reordenado: {term}" for term in diff["reordered"]]
         return changes
     
     def get_current_values(self):
-        """Obtiene los valores actuales de todas las categorías"""
-        print(f"DEBUG get_current_values: category_grid = {self.category_grid}")  # DEBUG
-        
+        """Obtiene los valores actuales de todas las categorías ({clave_snake_case: texto})"""
         if not self.category_grid:
-            print("DEBUG: category_grid es None")
             return {}
         
-        current_values = {}
-        
-        print(f"DEBUG: category_grid.cards = {hasattr(self.category_grid, 'cards')}")  # DEBUG
-        
-        if hasattr(self.category_grid, 'cards'):
-            print(f"DEBUG: Número de cards: {len(self.category_grid.cards)}")  # DEBUG
-            
-            # Iterar sobre las cards del category_grid
-            for i, card in enumerate(self.category_grid.cards):
-                print(f"DEBUG: Card {i}: {card}")
-                print(f"DEBUG: Card {i} tiene category_name: {hasattr(card, 'category_name')}")
-                print(f"DEBUG: Card {i} tiene input_field: {hasattr(card, 'input_field')}")
-                
-                if hasattr(card, 'category_name'):
-                    print(f"DEBUG: Card {i} category_name: {card.category_name}")
-                
-                if hasattr(card, 'input_field'):
-                    print(f"DEBUG: Card {i} input_field.text(): {card.input_field.text()}")
-                
-                if hasattr(card, 'category_name') and hasattr(card, 'input_field'):
-                    category_name = card.category_name
-                    # Obtener el texto del input field
-                    text_value = card.input_field.text().strip()
-                    
-                    print(f"DEBUG: Procesando categoría {category_name} con valor: '{text_value}'")
-                    
-                    # Convertir el texto en una lista de elementos (separados por comas)
-                    if text_value:
-                        # Dividir por comas y limpiar espacios
-                        selected_items = [item.strip() for item in text_value.split(',') if item.strip()]
-                    else:
-                        selected_items = []
-                    
-                    current_values[category_name] = selected_items
-                    print(f"DEBUG: Agregado {category_name}: {selected_items}")
-        else:
-            print("DEBUG: category_grid no tiene atributo 'cards'")
-            # Intentar otros atributos posibles
-            print(f"DEBUG: Atributos de category_grid: {dir(self.category_grid)}")
-        
-        print(f"DEBUG: current_values final: {current_values}")
-        return current_values
+        # El grid virtualizado no construye todas las tarjetas: leer los valores del grid
+        return category_values(self.category_grid.get_current_values())
+    
+    def get_baseline_id(self, character_name):
+        """Identifica la base de un personaje por nombre y fecha de modificación del archivo"""
+        return (character_name, get_library().characters.get_stamp(character_name))
     
     def load_character_values(self, character_name):
-        """Carga los valores del personaje desde su archivo JSON"""
-        import os
-        import json
-        
-        # Construir la ruta al archivo del personaje
-        character_dir = os.path.join("data", "characters", character_name)
-        character_file = os.path.join(character_dir, f"{character_name}.json")
-        
-        print(f"DEBUG load_character_values: Buscando archivo: {character_file}")
-        
-        if not os.path.exists(character_file):
-            print(f"DEBUG: Archivo no encontrado: {character_file}")
-            return {}
-        
-        try:
-            with open(character_file, 'r', encoding='utf-8') as f:
-                character_data = json.load(f)
-                print(f"DEBUG: Datos cargados del JSON: {character_data}")
-            
-            # CAMBIO CLAVE: Acceder a los datos dentro de 'categories'
-            if 'categories' not in character_data:
-                print(f"DEBUG: No se encontró 'categories' en el JSON")
-                return {}
-            
-            categories_data = character_data['categories']
-            print(f"DEBUG: Datos de categories: {categories_data}")
-            
-            character_values = {}
-            
-            # Extraer valores de las categorías
-            for category_name, category_value in categories_data.items():
-                print(f"DEBUG: Procesando categoría {category_name} con valor: '{category_value}'")
-                
-                # Los valores en el JSON son strings separados por comas
-                if isinstance(category_value, str):
-                    # Dividir por comas y limpiar espacios
-                    if category_value.strip():  # Si no está vacío
-                        items = [item.strip() for item in category_value.split(',') if item.strip()]
-                    else:
-                        items = []  # Si está vacío
-                    print(f"DEBUG: Categoría {category_name} - items procesados: {items}")
-                else:
-                    items = []
-                    print(f"DEBUG: Categoría {category_name} - formato inesperado: {type(category_value)}")
-                
-                character_values[category_name] = items
-            
-            print(f"DEBUG: character_values final: {character_values}")
-            return character_values
-            
-        except Exception as e:
-            print(f"DEBUG: Error cargando {character_file}: {e}")
-            return {}
+        """Carga los valores del personaje desde su archivo JSON ({clave_snake_case: texto})"""
+        return get_library().characters.load_values(character_name)
     
     def show_message(self, message):
         """Muestra un mensaje en el área de cambios"""
@@ -464,46 +335,40 @@ class VariationChangesWidget(QWidget):
         return cleaned
     
     def _save_tag_to_json(self, category, tag_text):
-        """Guarda un tag en el archivo tags.json"""
+        """Guarda un tag en el shard de su categoría"""
         try:
             # Limpiar el texto del tag ANTES de todo
             cleaned_tag = self._clean_tag_text(tag_text)
             
-            tags_file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'tags.json')
-            
-            # Leer el archivo actual
-            with open(tags_file_path, 'r', encoding='utf-8') as f:
-                tags_data = json.load(f)
-            
             # Normalizar el nombre de la categoría
             normalized_category = category.lower().replace(' ', '_')
+            added = []
             
-            # Agregar el tag si no existe
-            if normalized_category not in tags_data:
-                tags_data[normalized_category] = []
+            def add_tag(tags):
+                # Verificar duplicados con el texto LIMPIO (sin duplicado no se reescribe el shard)
+                if cleaned_tag in tags:
+                    return False
+                tags.append(cleaned_tag)
+                added.append(cleaned_tag)
             
-            # Verificar duplicados con el texto LIMPIO
-            if cleaned_tag not in tags_data[normalized_category]:
-                tags_data[normalized_category].append(cleaned_tag)  # Guardar el texto limpio
-                
-                # Guardar el archivo
-                with open(tags_file_path, 'w', encoding='utf-8') as f:
-                    json.dump(tags_data, f, indent=2, ensure_ascii=False)
-                
+            # Leer, agregar y guardar el shard de la categoría bajo el mismo bloqueo
+            get_tag_store().update_tags(normalized_category, add_tag)
+            
+            if added:
                 print(f"DEBUG: Tag '{cleaned_tag}' guardado en categoría '{normalized_category}'")
                 self._show_auto_close_message(f"✅ Tag '{cleaned_tag}' guardado en {category}")
                 return True
             else:
                 # Tag ya existe - preguntar si quiere guardarlo de todas formas
                 print(f"DEBUG: Tag '{cleaned_tag}' ya existe en '{normalized_category}'")
-                return self._ask_duplicate_confirmation(category, cleaned_tag, tags_data, tags_file_path, normalized_category)
+                return self._ask_duplicate_confirmation(category, cleaned_tag, normalized_category)
                 
         except Exception as e:
             print(f"ERROR: No se pudo guardar el tag: {e}")
             self._show_error_message(f"Error al guardar: {e}")
             return False
     
-    def _ask_duplicate_confirmation(self, category, tag_text, tags_data, tags_file_path, normalized_category):
+    def _ask_duplicate_confirmation(self, category, tag_text, normalized_category):
         """Pregunta al usuario si quiere guardar un tag duplicado"""
         msg_box = QMessageBox()
         msg_box.setIcon(QMessageBox.Icon.Question)
@@ -516,11 +381,8 @@ class VariationChangesWidget(QWidget):
         
         if result == QMessageBox.StandardButton.Yes:
             # Usuario confirmó - guardar de todas formas (agregar duplicado)
-            tags_data[normalized_category].append(tag_text)
-            
             try:
-                with open(tags_file_path, 'w', encoding='utf-8') as f:
-                    json.dump(tags_data, f, indent=2, ensure_ascii=False)
+                get_tag_store().update_tags(normalized_category, lambda tags: tags.append(tag_text))
                 
                 print(f"DEBUG: Tag duplicado '{tag_text}' guardado en categoría '{normalized_category}'")
                 self._show_auto_close_message(f"✅ Tag '{tag_text}' guardado en {category} (duplicado)")
@@ -558,25 +420,22 @@ class VariationChangesWidget(QWidget):
                 self._show_auto_close_message(f"🗑️ Tag '{tag_text}' eliminado de {category}")
     
     def _remove_tag_from_json(self, category, tag_text):
-        """Elimina un tag del archivo tags.json"""
+        """Elimina un tag del shard de su categoría"""
         try:
-            tags_file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'tags.json')
-            
-            # Leer el archivo actual
-            with open(tags_file_path, 'r', encoding='utf-8') as f:
-                tags_data = json.load(f)
-            
             # Normalizar el nombre de la categoría
             normalized_category = category.lower().replace(' ', '_')
+            removed = []
             
-            # Eliminar el tag si existe
-            if normalized_category in tags_data and tag_text in tags_data[normalized_category]:
-                tags_data[normalized_category].remove(tag_text)
-                
-                # Guardar el archivo
-                with open(tags_file_path, 'w', encoding='utf-8') as f:
-                    json.dump(tags_data, f, indent=2, ensure_ascii=False)
-                
+            def remove_tag(tags):
+                # Eliminar el tag si existe (si no, no se reescribe el shard)
+                if tag_text not in tags:
+                    return False
+                tags.remove(tag_text)
+                removed.append(tag_text)
+            
+            get_tag_store().update_tags(normalized_category, remove_tag)
+            
+            if removed:
                 print(f"DEBUG: Tag '{tag_text}' eliminado de categoría '{normalized_category}'")
                 return True
             else:
@@ -613,25 +472,22 @@ class VariationChangesWidget(QWidget):
                 self._show_auto_close_message(f"🗑️ Tag '{tag_text}' eliminado de {category}")
     
     def _remove_tag_from_json(self, category, tag_text):
-        """Elimina un tag del archivo tags.json"""
+        """Elimina un tag del shard de su categoría"""
         try:
-            tags_file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'tags.json')
-            
-            # Leer el archivo actual
-            with open(tags_file_path, 'r', encoding='utf-8') as f:
-                tags_data = json.load(f)
-            
             # Normalizar el nombre de la categoría
             normalized_category = category.lower().replace(' ', '_')
+            removed = []
             
-            # Eliminar el tag si existe
-            if normalized_category in tags_data and tag_text in tags_data[normalized_category]:
-                tags_data[normalized_category].remove(tag_text)
-                
-                # Guardar el archivo
-                with open(tags_file_path, 'w', encoding='utf-8') as f:
-                    json.dump(tags_data, f, indent=2, ensure_ascii=False)
-                
+            def remove_tag(tags):
+                # Eliminar el tag si existe (si no, no se reescribe el shard)
+                if tag_text not in tags:
+                    return False
+                tags.remove(tag_text)
+                removed.append(tag_text)
+            
+            get_tag_store().update_tags(normalized_category, remove_tag)
+            
+            if removed:
                 print(f"DEBUG: Tag '{tag_text}' eliminado de categoría '{normalized_category}'")
                 return True
             else:
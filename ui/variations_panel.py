@@ -1,5 +1,5 @@
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QTreeWidget, QTreeWidgetItem,
+    QWidget, QVBoxLayout, QHBoxLayout, QTreeView,
     QPushButton, QLabel, QDialog, QLineEdit, QTextEdit, QComboBox,
     QSpinBox, QCheckBox, QDialogButtonBox, QMessageBox, QInputDialog,
     QSplitter, QGroupBox, QFormLayout, QListWidget, QScrollArea, QFrame
@@ -7,6 +7,8 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont, QIcon
 from logic.variations_manager import VariationsManager
+from logic.prefetch import Prefetcher
+from ui.models import VariationsTreeModel
 from datetime import datetime
 
 class VariationsPanel(QWidget):
@@ -14,14 +16,25 @@ class VariationsPanel(QWidget):
     variation_saved = pyqtSignal(str, str)  # Emite cuando se guarda (character, variation_name)
     character_changed = pyqtSignal(str)  # Emite cuando cambia el personaje
     
-    def __init__(self, variations_manager, prompt_generator):
+    def __init__(self, variations_manager, prompt_generator, deferred_load=False):
         super().__init__()
         self.variations_manager = variations_manager
         self.prompt_generator = prompt_generator
         self.current_character = None
+        # Precarga de variaciones al pasar el cursor o la selección
+        self.prefetcher = Prefetcher()
         self.setup_ui()
         self.setup_styles()
-        self.load_variations()
+        if deferred_load:
+            # Marcador hasta que el StartupLoader entregue el manifiesto
+            self.refresh_button.setText("⏳")
+            self.refresh_button.setEnabled(False)
+        else:
+            self.load_variations()
+
+    def shutdown(self):
+        """Cancela las precargas pendientes al cerrar la aplicación"""
+        self.prefetcher.shutdown()
 
     def setup_ui(self):
         """Configura la interfaz del panel de variaciones"""
@@ -87,31 +100,37 @@ class VariationsPanel(QWidget):
         header_layout.addWidget(self.delete_button)
         layout.addLayout(header_layout)
         
-        # Árbol de variaciones
-        self.variations_tree = QTreeWidget()
-        self.variations_tree.setHeaderLabels(["Personaje/Variación"])  # Solo una columna
+        # Árbol de variaciones (las variaciones se leen al expandir cada personaje)
+        self.variations_model = VariationsTreeModel(self.variations_manager, self)
+        self.variations_tree = QTreeView()
+        self.variations_tree.setModel(self.variations_model)
         self.variations_tree.setRootIsDecorated(True)
         self.variations_tree.setAlternatingRowColors(True)
-        self.variations_tree.itemDoubleClicked.connect(self.load_variation_on_double_click)
+        self.variations_tree.setUniformRowHeights(True)
+        self.variations_tree.doubleClicked.connect(self.load_variation_on_double_click)
+        # Precargar la variación bajo el cursor o la selección del teclado
+        self.variations_tree.setMouseTracking(True)
+        self.variations_tree.entered.connect(self.prefetch_variation)
+        self.variations_tree.selectionModel().currentChanged.connect(lambda current, _: self.prefetch_variation(current))
         layout.addWidget(self.variations_tree)
         
     def setup_styles(self):
         """Configura los estilos del panel"""
         self.setStyleSheet("""
-            QTreeWidget {
+            QTreeView {
                 background-color: #2b2b2b;
                 color: #ffffff;
                 border: 1px solid #555555;
                 border-radius: 4px;
             }
-            QTreeWidget::item {
+            QTreeView::item {
                 padding: 4px;
                 border-bottom: 1px solid #444444;
             }
-            QTreeWidget::item:selected {
+            QTreeView::item:selected {
                 background-color: #6366f1;
             }
-            QTreeWidget::item:hover {
+            QTreeView::item:hover {
                 background-color: #404040;
             }
             QPushButton {
@@ -130,46 +149,61 @@ class VariationsPanel(QWidget):
             }
         """)
 
-    def load_variations(self, character_name=None):
-        """Carga todas las variaciones en el árbol, opcionalmente filtrando por personaje"""
-        self.variations_tree.clear()
-        
+    def load_variations(self, character_name=None, manifest=None):
+        """Carga los personajes con variaciones desde el manifiesto, opcionalmente filtrando por personaje.
+        manifest es el manifiesto ya leído en segundo plano (si no, se lee aquí)"""
         try:
-            # Obtener todos los personajes que tienen variaciones
-            characters = self.variations_manager.get_all_characters_with_variations()
-            
-            # Si se especifica un personaje, filtrar solo ese
-            if character_name:
-                characters = [character_name] if character_name in characters else []
-            
-            for character in characters:
-                # Obtener datos del personaje
-                character_data = self.variations_manager.get_character_variations(character)
-                
-                # Acceder específicamente a las variaciones
-                variations = character_data.get("variations", {})
-                
-                if variations:  # Solo mostrar si tiene variaciones
-                    # Crear nodo padre para el personaje
-                    character_item = QTreeWidgetItem(self.variations_tree)
-                    character_item.setText(0, character)
-                    character_item.setText(1, f"{len(variations)} variaciones")
-                    character_item.setExpanded(True)
-                    
-                    # Agregar variaciones como hijos
-                    for variation_name, variation_data in variations.items():
-                        variation_item = QTreeWidgetItem(character_item)
-                        variation_item.setText(0, variation_name)
-                        
-                        # Guardar datos para fácil acceso
-                        variation_item.setData(0, Qt.ItemDataRole.UserRole, {
-                            'character': character,
-                            'variation_name': variation_name,
-                            'data': variation_data
-                        })
-                
+            self.prefetcher.invalidate()
+            self.variations_model.reload(character_name, manifest)
         except Exception as e:
             print(f"Error cargando variaciones: {e}")
+        self.refresh_button.setText("🔄")
+        self.refresh_button.setEnabled(True)
+
+    def on_variation_saved(self, character_name, variation_name):
+        """Actualiza solo la fila de la variación guardada"""
+        self.variations_model.upsert_variation(character_name, variation_name)
+
+    def on_variations_file_changed(self, folder):
+        """Un archivo de variaciones cambió fuera de la app: refrescar solo ese personaje"""
+        self.prefetcher.invalidate_matching(lambda key: self.variations_model._folder(key[0]) == folder)
+        self.variations_model.refresh_character(folder)
+
+    def on_character_file_changed(self, folder):
+        """El personaje base cambió: las variaciones delta precargadas de ese personaje quedan viejas"""
+        self.prefetcher.invalidate_matching(lambda key: self.variations_model._folder(key[0]) == folder)
+
+    def get_selected_variation(self, index=None):
+        """Devuelve {'character', 'variation_name', 'data'} de la variación seleccionada o None"""
+        if index is None:
+            index = self.variations_tree.currentIndex()
+        character, variation_name = self.variations_model.get_names(index)
+        if variation_name is None:
+            return None
+        
+        variation_data = self.prefetcher.get(
+            (character, variation_name),
+            lambda: self.variations_manager.load_variation(character, variation_name),
+            lambda: self.variations_manager.get_variation_stamp(character)
+        )
+        if variation_data is None:
+            return None
+        return {
+            'character': character,
+            'variation_name': variation_name,
+            'data': variation_data
+        }
+
+    def prefetch_variation(self, index):
+        """Precarga la variación de un índice (los personajes se ignoran)"""
+        character, variation_name = self.variations_model.get_names(index)
+        if variation_name is None:
+            return
+        self.prefetcher.prefetch(
+            (character, variation_name),
+            lambda: self.variations_manager.load_variation(character, variation_name),
+            lambda: self.variations_manager.get_variation_stamp(character)
+        )
 
     def get_variation_description(self, variation_data):
         """Genera una descripción breve de la variación"""
@@ -190,13 +224,12 @@ class VariationsPanel(QWidget):
 
     def load_variation(self):
         """Carga la variación seleccionada"""
-        current_item = self.variations_tree.currentItem()
-        if not current_item:
+        if not self.variations_tree.currentIndex().isValid():
             QMessageBox.information(self, "Información", "Selecciona una variación para cargar")
             return
         
         # Verificar que sea una variación (no un personaje)
-        variation_data = current_item.data(0, Qt.ItemDataRole.UserRole)
+        variation_data = self.get_selected_variation()
         if not variation_data:
             QMessageBox.information(self, "Información", "Selecciona una variación específica")
             return
@@ -210,28 +243,26 @@ class VariationsPanel(QWidget):
             f"Variación '{variation_data['variation_name']}' cargada"
         )
 
-    def load_variation_on_double_click(self, item, column):
+    def load_variation_on_double_click(self, index):
         """Carga variación al hacer doble clic"""
-        variation_data = item.data(0, Qt.ItemDataRole.UserRole)
+        if self.variations_model.get_names(index)[1] is None:
+            return  # Es un personaje: el doble clic solo expande
+        variation_data = self.get_selected_variation(index)
         if variation_data:
             self.variation_loaded.emit(variation_data['data'])
             self.character_changed.emit(variation_data['character'])
 
     def delete_variation(self):
         """Elimina la variación seleccionada"""
-        current_item = self.variations_tree.currentItem()
-        if not current_item:
+        if not self.variations_tree.currentIndex().isValid():
             QMessageBox.information(self, "Información", "Selecciona una variación para eliminar")
             return
         
-        variation_data = current_item.data(0, Qt.ItemDataRole.UserRole)
-        if not variation_data:
+        character, variation_name = self.variations_model.get_names(self.variations_tree.currentIndex())
+        if variation_name is None:
             QMessageBox.information(self, "Información", "Selecciona una variación específica")
             return
         
-        character = variation_data['character']
-        variation_name = variation_data['variation_name']
-        
         reply = QMessageBox.question(
             self, "Confirmar eliminación",
             f"¿Estás seguro de que quieres eliminar la variación '{variation_name}' de {character}?",
@@ -241,7 +272,7 @@ class VariationsPanel(QWidget):
         if reply == QMessageBox.StandardButton.Yes:
             success = self.variations_manager.delete_variation(character, variation_name)
             if success:
-                self.load_variations()  # Recargar la lista
+                self.variations_model.remove_variation(character, variation_name)
                 QMessageBox.information(
                     self, "Éxito", 
                     f"Variación '{variation_name}' eliminada"
@@ -254,12 +285,11 @@ class VariationsPanel(QWidget):
 
     def copy_variation(self):
         """Copia una variación a otro personaje"""
-        current_item = self.variations_tree.currentItem()
-        if not current_item:
+        if not self.variations_tree.currentIndex().isValid():
             QMessageBox.information(self, "Información", "Selecciona una variación para copiar")
             return
         
-        variation_data = current_item.data(0, Qt.ItemDataRole.UserRole)
+        variation_data = self.get_selected_variation()
         if not variation_data:
             QMessageBox.information(self, "Información", "Selecciona una variación específica")
             return
@@ -278,11 +308,16 @@ class VariationsPanel(QWidget):
                 new_variation_data['modified_at'] = datetime.now().isoformat()
                 
                 success = self.variations_manager.save_variation(
-                    target_character, new_name, new_variation_data
+                    target_character, new_name,
+                    new_variation_data.get('categories', {}),
+                    new_variation_data.get('description', ''),
+                    new_variation_data.get('tags', []),
+                    new_variation_data.get('notes', ''),
+                    new_variation_data.get('negative_prompt', '')
                 )
                 
                 if success:
-                    self.load_variations()
+                    self.variations_model.upsert_variation(target_character, new_name)
                     QMessageBox.information(
                         self, "Éxito", 
                         f"Variación copiada como '{new_name}' para {target_character}"
@@ -301,20 +336,17 @@ class VariationsPanel(QWidget):
 
     def show_delete_dialog(self):
         """Muestra diálogo simple para eliminar la variación seleccionada"""
-        current_item = self.variations_tree.currentItem()
-        if not current_item:
+        current_index = self.variations_tree.currentIndex()
+        if not current_index.isValid():
             QMessageBox.information(self, "Información", "Selecciona una variación para eliminar")
             return
         
         # Verificar si es una variación (no un personaje)
-        variation_data = current_item.data(0, Qt.ItemDataRole.UserRole)
-        if not variation_data:
+        character_name, variation_name = self.variations_model.get_names(current_index)
+        if variation_name is None:
             QMessageBox.information(self, "Información", "Selecciona una variación para eliminar")
             return
         
-        character_name = current_item.parent().text(0)
-        variation_name = variation_data['variation_name']
-        
         # Confirmar eliminación
         reply = QMessageBox.question(
             self, "Confirmar Eliminación",
@@ -326,16 +358,11 @@ class VariationsPanel(QWidget):
         if reply == QMessageBox.StandardButton.Yes:
             success = self.variations_manager.delete_variation(character_name, variation_name)
             if success:
+                self.variations_model.remove_variation(character_name, variation_name)
                 QMessageBox.information(self, "Éxito", "Variación eliminada correctamente")
-                self.load_variations()  # Recargar la lista
             else:
                 QMessageBox.warning(self, "Error", "No se pudo eliminar la variación")
 
-    def refresh_variations(self):
-        """Actualiza manualmente la lista de variaciones"""
-        print("🔄 Actualizando lista de variaciones...")
-        self.load_variations()
-        print("✅ Lista de variaciones actualizada")
 
 class SaveVariationDialog(QDialog):
     """Diálogo para guardar una nueva variación"""